@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Benchmarks that measure how JScribe scales. Every module in this package can be run as a
+script, i.e. {$bash python -m jscribe.benchmark.assembly $}
+@package jscribe.benchmark
+"""
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Measures cost of merging data collected from one file into documentation tree, depending on
+number of elements already collected. Per file cost should stay flat.
+
+Usage: {$bash python -m jscribe.benchmark.assembly --elements 100000 $}
+@module jscribe.benchmark.assembly
+"""
+
+import time
+import argparse
+
+from jscribe.core.docstringparser import DocStringParser
+from jscribe.conf.jstagsettings import TAG_SETTINGS
+from jscribe.conf import settings
+
+
+def make_file_records(file_number, elements_per_file):
+    """* Returns synthetic doc string records of one file, like ones returned by
+    {#jscribe.core.docstringparser.DocStringParser.get_file_records}.
+    @function jscribe.benchmark.assembly.make_file_records
+    @param file_number {{int}}
+    @param elements_per_file {{int}}
+    @return {{list}}
+    """
+    records = [{
+        'startline': 1,
+        'endline': 3,
+        'name': 'module{}'.format(file_number),
+        'type': 'module',
+        'alias_name': None,
+        'description': 'Module description.',
+        'attributes': {},
+    }]
+    for i in range(1, elements_per_file):
+        records.append({
+            'startline': i * 4,
+            'endline': i * 4 + 3,
+            'name': '.function{}'.format(i),
+            'type': 'function',
+            'alias_name': None,
+            'description': 'Function description.',
+            'attributes': {},
+        })
+    return records
+
+
+def run(max_elements, elements_per_file):
+    """* Runs benchmark and returns list of checkpoints.
+    @function jscribe.benchmark.assembly.run
+    @param max_elements {{int}} - Number of elements collected at the end of benchmark.
+    @param elements_per_file {{int}}
+    @return {{list}} - List of tuples: *elements collected*, *average time per file in seconds*.
+    """
+    dsp = DocStringParser(
+        TAG_SETTINGS, settings.DOC_STRING_REGEX, settings.TAG_REGEX, settings.IGNORE_INVALID_TAGS
+    )
+    checkpoints = []
+    checkpoint = 100
+    elapsed = 0.0
+    files = 0
+    for file_number in range(max_elements // elements_per_file):
+        records = make_file_records(file_number, elements_per_file)
+        start = time.time()
+        dsp.add_file_records('module{}.js'.format(file_number), records)
+        elapsed += time.time() - start
+        files += 1
+        elements = (file_number + 1) * elements_per_file
+        if elements >= checkpoint:
+            checkpoints.append((elements, elapsed / files))
+            checkpoint *= 10
+            elapsed = 0.0
+            files = 0
+    return checkpoints
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measures per file cost of documentation tree assembly.'
+    )
+    parser.add_argument('--elements', type=int, default=100000, help='Number of elements.')
+    parser.add_argument('--per-file', type=int, default=100, help='Number of elements per file.')
+    args = parser.parse_args()
+    print('{:>12} {:>16}'.format('elements', 'per file [ms]'))
+    for elements, per_file in run(args.elements, args.per_file):
+        print('{:>12} {:>16.3f}'.format(elements, per_file * 1000))
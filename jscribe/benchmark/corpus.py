@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Generates synthetic javascript project for benchmarks.
+
+Every file is a module, elements in it are nested up to given depth and named with absolute or
+relative (`..name`) namepaths. Descriptions have references to other elements and code snippets
+in languages from given language mix.
+
+Usage: {$bash python -m jscribe.benchmark.corpus path/to/corpus --files 1000 --doc-strings 20 $}
+@module jscribe.benchmark.corpus
+"""
+
+import os
+import json
+import random
+import argparse
+
+
+"""* Default corpus parameters.
+@attribute jscribe.benchmark.corpus.DEFAULT_PARAMETERS
+@valtype {{dict}}
+"""
+DEFAULT_PARAMETERS = {
+    'files': 1000,
+    'doc_strings': 20,
+    'depth': 4,
+    'relative_ratio': 0.5,
+    'reference_ratio': 0.3,
+    'snippet_ratio': 0.2,
+    'languages': ['javascript', 'python', 'bash'],
+    'code_lines': 5,
+    'files_per_package': 50,
+    'seed': 0,
+}
+
+# element types used for elements nested in modules, callable types get params and return value
+_ELEMENT_TYPES = ['class', 'function', 'method', 'object', 'number', 'string']
+_CALLABLE_TYPES = ('function', 'method')
+_SNIPPETS = {
+    'javascript': u'var result = {0}.call(this, arguments);',
+    'python': u'result = {0}(*args)',
+    'bash': u'echo "{0}"',
+}
+
+
+def make_parameters(**parameters):
+    """* Returns corpus parameters, defaults are used for parameters that are not given.
+    @function jscribe.benchmark.corpus.make_parameters
+    @param parameters {{dict}}
+    @return {{dict}}
+    """
+    corpus_parameters = dict(DEFAULT_PARAMETERS)
+    for key, value in parameters.iteritems():
+        if key not in DEFAULT_PARAMETERS:
+            raise ValueError(u'Unknown corpus parameter: {}'.format(key))
+        if value is not None:
+            corpus_parameters[key] = value
+    return corpus_parameters
+
+
+def make_file_source(file_number, parameters, rng, defined_namepaths):
+    """* Returns source of one corpus file.
+    @function jscribe.benchmark.corpus.make_file_source
+    @param file_number {{int}}
+    @param parameters {{dict}} - Corpus parameters.
+    @param rng {{random.Random}}
+    @param defined_namepaths {{list}} - Namepaths of elements defined so far, they are used as
+        reference targets, namepaths of elements from this file are appended.
+    @return {{unicode}}
+    """
+    module_namepath = u'corpus.pkg{}.mod{}'.format(
+        file_number // parameters['files_per_package'], file_number
+    )
+    lines = []
+    _add_doc_string(
+        lines, 0, u'Module number {}.'.format(file_number), u'@module {}'.format(module_namepath),
+        [], parameters, rng, defined_namepaths
+    )
+    defined_namepaths.append(module_namepath)
+    # namepaths of current element and its ancestors, index is depth of element
+    tree_path = [module_namepath]
+    # namepaths that relative names are resolved against, like in parser
+    relative_paths = [module_namepath]
+    for number in range(1, parameters['doc_strings']):
+        depth = rng.randint(1, min(parameters['depth'], len(tree_path)))
+        parent_namepath = tree_path[depth - 1]
+        element_type = rng.choice(_ELEMENT_TYPES)
+        name = u'{}{}'.format(element_type, number)
+        namepath = u'.'.join([parent_namepath, name])
+        if rng.random() < parameters['relative_ratio'] and parent_namepath in relative_paths:
+            level = relative_paths.index(parent_namepath)
+            element_name = u'.' * (level + 1) + name
+            relative_paths = relative_paths[:level + 1] + [namepath]
+        else:
+            element_name = namepath
+            relative_paths = [namepath]
+        tags = []
+        if element_type in _CALLABLE_TYPES:
+            tags.append(u'@param value {{{{{}}}}} - Value.'.format(
+                _make_type(parameters, rng, defined_namepaths)
+            ))
+            tags.append(u'@return {{{{{}}}}} - Result.'.format(
+                _make_type(parameters, rng, defined_namepaths)
+            ))
+        _add_doc_string(
+            lines, depth, u'Element number {} of module {}.'.format(number, file_number),
+            u'@{} {}'.format(element_type, element_name), tags, parameters, rng, defined_namepaths
+        )
+        defined_namepaths.append(namepath)
+        tree_path = tree_path[:depth] + [namepath]
+    return u'\n'.join(lines) + u'\n'
+
+
+def _make_type(parameters, rng, defined_namepaths):
+    if defined_namepaths and rng.random() < parameters['reference_ratio']:
+        return u'#' + rng.choice(defined_namepaths)
+    return u'Object'
+
+
+def _add_doc_string(lines, depth, title, element_tag, tags, parameters, rng, defined_namepaths):
+    indent = u'    ' * depth
+    description = [title]
+    if defined_namepaths and rng.random() < parameters['reference_ratio']:
+        description.append(u'See {{#{}}}.'.format(rng.choice(defined_namepaths)))
+    if rng.random() < parameters['snippet_ratio']:
+        language = rng.choice(parameters['languages'])
+        description.append(u'{{${} {} $}}'.format(
+            language, _SNIPPETS.get(language, u'{0}').format(title.split()[-1])
+        ))
+    lines.append(indent + u'/** ' + u' '.join(description))
+    for tag in [element_tag] + tags:
+        lines.append(indent + tag)
+    lines.append(indent + u'*/')
+    for number in range(parameters['code_lines']):
+        lines.append(indent + u'var value{0} = compute(value{0}, {1});'.format(number, depth))
+
+
+def make_settings(output_path):
+    """* Returns jscribe settings for generated corpus, paths are relative to corpus directory.
+    @function jscribe.benchmark.corpus.make_settings
+    @param output_path {{str}} - Path to documentation output directory.
+    @return {{dict}}
+    """
+    return {
+        'INPUT_PATHS': ['./src'],
+        'FILE_REGEX': '.*?[.]js$',
+        'DOCUMENTATION_OUTPUT_PATH': output_path,
+        'TAG_SETTINGS': 'jscribe.conf.jstagsettings',
+        'LANGUAGE': 'javascript',
+        'TEMPLATE_SETTINGS': {
+            'SHOW_LINE_NUMBER': True,
+            'FOOTER_TEXT': 'Benchmark',
+            'TITLE': 'Benchmark corpus',
+            'ELEMENT_TEMPLATES': {},
+        },
+    }
+
+
+def generate(path, **parameters):
+    """* Generates corpus in given directory. Source files are created in `src` subdirectory,
+    settings in `settings.json` and documentation output directory is `out`.
+    @function jscribe.benchmark.corpus.generate
+    @param path {{str}} - Corpus directory.
+    @param parameters {{dict}} - Corpus parameters, see
+        {#jscribe.benchmark.corpus.DEFAULT_PARAMETERS}.
+    @return {{dict}} - Parameters used to generate corpus.
+    """
+    parameters = make_parameters(**parameters)
+    rng = random.Random(parameters['seed'])
+    defined_namepaths = []
+    for file_number in range(parameters['files']):
+        dirpath = os.path.join(
+            path, 'src', 'pkg{}'.format(file_number // parameters['files_per_package'])
+        )
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        source = make_file_source(file_number, parameters, rng, defined_namepaths)
+        with open(os.path.join(dirpath, 'mod{}.js'.format(file_number)), 'wb') as f:
+            f.write(source.encode('utf-8'))
+            f.close()
+    # top level element must be defined
+    with open(os.path.join(path, 'src', 'corpus.js'), 'wb') as f:
+        f.write('/** Synthetic corpus.\n@package corpus\n*/\n')
+        f.close()
+    output_path = os.path.join(path, 'out')
+    if not os.path.isdir(output_path):
+        os.makedirs(output_path)
+    with open(os.path.join(path, 'settings.json'), 'w') as f:
+        json.dump(make_settings('./out/'), f, indent=4, sort_keys=True)
+        f.close()
+    return parameters
+
+
+def add_arguments(parser):
+    """* Adds corpus parameters to command line argument parser.
+    @function jscribe.benchmark.corpus.add_arguments
+    @param parser {{argparse.ArgumentParser}}
+    """
+    parser.add_argument('--files', type=int, help='Number of files.')
+    parser.add_argument('--doc-strings', type=int, help='Number of doc strings per file.')
+    parser.add_argument('--depth', type=int, help='Maximum nesting depth of elements.')
+    parser.add_argument(
+        '--relative-ratio', type=float, help='Part of elements named with relative namepaths.'
+    )
+    parser.add_argument(
+        '--reference-ratio', type=float, help='Part of doc strings with references.'
+    )
+    parser.add_argument(
+        '--snippet-ratio', type=float, help='Part of doc strings with code snippets.'
+    )
+    parser.add_argument(
+        '--languages', type=lambda value: value.split(','),
+        help='Comma separated languages of code snippets.'
+    )
+    parser.add_argument('--code-lines', type=int, help='Lines of code after every doc string.')
+    parser.add_argument('--seed', type=int, help='Random seed.')
+
+
+def get_parameters_from_arguments(args):
+    """* Returns corpus parameters from parsed command line arguments.
+    @function jscribe.benchmark.corpus.get_parameters_from_arguments
+    @param args {{argparse.Namespace}}
+    @return {{dict}}
+    """
+    return make_parameters(
+        files=args.files, doc_strings=args.doc_strings, depth=args.depth,
+        relative_ratio=args.relative_ratio, reference_ratio=args.reference_ratio,
+        snippet_ratio=args.snippet_ratio, languages=args.languages, code_lines=args.code_lines,
+        seed=args.seed,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates synthetic corpus for benchmarks.')
+    parser.add_argument('path', type=str, help='Corpus directory.')
+    add_arguments(parser)
+    args = parser.parse_args()
+    parameters = generate(args.path, **get_parameters_from_arguments(args))
+    print('Corpus with {} files generated in "{}".'.format(parameters['files'], args.path))
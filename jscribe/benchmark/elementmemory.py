@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Compares memory taken by documentation data made of dictionaries and by compact
+{#jscribe.core.element.Element} records.
+
+Usage: {$bash python -m jscribe.benchmark.elementmemory --elements 300000 $}
+@module jscribe.benchmark.elementmemory
+"""
+
+import sys
+import argparse
+
+from jscribe.benchmark import assembly
+from jscribe.core.docstringparser import DocStringParser
+from jscribe.core.element import Record
+from jscribe.conf.jstagsettings import TAG_SETTINGS
+from jscribe.conf import settings
+
+
+# fields that generators add to every defined element, with example values
+GENERATOR_FIELDS = {
+    'type_name': u'function',
+    'type_title': u'Functions',
+    'source_visible': True,
+    'is_callable': True,
+    'is_separate': False,
+    'namepath': u'module.function',
+    'description_html': u'<p>Function description.</p>',
+    'doc_element_path': u'module.html#function',
+    'doc_element_id': u'function',
+    'sourcepath': u'module.js.html',
+}
+
+
+def make_file_records(file_number, elements_per_file):
+    """* Returns synthetic doc string records of one file, made by
+    {#jscribe.benchmark.assembly.make_file_records}, with params and return values of functions.
+    @function jscribe.benchmark.elementmemory.make_file_records
+    @param file_number {{int}}
+    @param elements_per_file {{int}}
+    @return {{list}}
+    """
+    records = assembly.make_file_records(file_number, elements_per_file)
+    for record in records[1:]:
+        record['attributes'] = {
+            'params': [{
+                'name': u'arg',
+                'default': None,
+                'is_sequenced': None,
+                'type': {'type': u'int', 'ref': None},
+                'description': u'Argument.',
+            }],
+            'return': {
+                'type': {'type': u'#module.Result', 'ref': u'module.Result'},
+                'description': u'Result.',
+            },
+        }
+    return records
+
+
+def collect_data(elements, elements_per_file, compact_elements, generator_fields):
+    """* Returns documentation data with given number of elements.
+    @function jscribe.benchmark.elementmemory.collect_data
+    @param elements {{int}}
+    @param elements_per_file {{int}}
+    @param compact_elements {{boolean}}
+    @param generator_fields {{boolean}} - If `True` then fields added by generators are set too.
+    @return {{dict|#jscribe.core.element.Element}}
+    """
+    dsp = DocStringParser(
+        TAG_SETTINGS, settings.DOC_STRING_REGEX, settings.TAG_REGEX, settings.IGNORE_INVALID_TAGS,
+        compact_elements
+    )
+    for file_number in range(elements // elements_per_file):
+        dsp.add_file_records(
+            u'module{}.js'.format(file_number), make_file_records(file_number, elements_per_file)
+        )
+    if generator_fields:
+        for module in dsp.data['properties'].values():
+            for element in [module] + module['properties'].values():
+                for key, value in GENERATOR_FIELDS.iteritems():
+                    element[key] = value
+                for param in element['attributes'].get('params', []):
+                    param['description_html'] = u'<p>Argument.</p>'
+    return dsp.data
+
+
+def get_deep_size(obj, seen=None):
+    """* Returns memory taken by object and every object it refers to, shared objects are counted
+    once.
+    @function jscribe.benchmark.elementmemory.get_deep_size
+    @param obj {{object}}
+    @param seen=None {{set}} - Ids of already counted objects.
+    @return {{int}} - Size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif isinstance(obj, Record):
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return size
+
+
+def run(elements, elements_per_file, generator_fields):
+    """* Runs benchmark.
+    @function jscribe.benchmark.elementmemory.run
+    @param elements {{int}}
+    @param elements_per_file {{int}}
+    @param generator_fields {{boolean}}
+    @return {{dict}} - Size of data in bytes for both representations.
+    """
+    results = {}
+    for name, compact_elements in (('dict', False), ('compact', True)):
+        data = collect_data(elements, elements_per_file, compact_elements, generator_fields)
+        results[name] = get_deep_size(data)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compares memory taken by dictionaries and compact elements.'
+    )
+    parser.add_argument('--elements', type=int, default=300000, help='Number of elements.')
+    parser.add_argument('--per-file', type=int, default=100, help='Number of elements per file.')
+    parser.add_argument(
+        '--generator-fields', action='store_true', default=False,
+        help='Set also fields added by generators.'
+    )
+    args = parser.parse_args()
+    results = run(args.elements, args.per_file, args.generator_fields)
+    for name in ('dict', 'compact'):
+        print('{:>8}: {:>8.1f} MB, {:>6.0f} B per element'.format(
+            name, results[name] / 1048576.0, float(results[name]) / args.elements
+        ))
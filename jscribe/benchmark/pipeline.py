@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Measures time of every stage of documentation generation: discovery, parsing, assembly,
+conversion, rendering and writing, and peak memory usage after every stage. Results are printed
+as json, so they can be compared between releases.
+
+Benchmark can be run on generated corpus (see {#jscribe.benchmark.corpus}):
+{$bash python -m jscribe.benchmark.pipeline --files 1000 --doc-strings 20 --output results.json $}
+
+or on existing project, with its settings file:
+{$bash python -m jscribe.benchmark.pipeline --settings path/to/settings.json $}
+@module jscribe.benchmark.pipeline
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+import argparse
+from collections import OrderedDict
+
+try:
+    import resource
+except ImportError:
+    # not available on windows
+    resource = None
+
+from jscribe.benchmark import corpus
+from jscribe.conf import settings
+from jscribe.core.docgenerator import DocumentationGenerator, load_tag_settings
+from jscribe.core.docstringparser import DocStringParser
+from jscribe.core.generator import Generator
+from jscribe.utils.file import discover_files
+from jscribe.utils.filecontent import file_contents
+
+
+"""* Names of measured stages, in order.
+@attribute jscribe.benchmark.pipeline.STAGES
+@valtype {{tuple}}
+"""
+STAGES = ('discovery', 'parsing', 'assembly', 'conversion', 'rendering', 'writing', 'other')
+
+
+def get_peak_rss():
+    """* Returns peak memory used by this process so far.
+    @function jscribe.benchmark.pipeline.get_peak_rss
+    @return {{int|None}} - Peak resident set size in kilobytes, `None` if it can't be measured.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # bytes on mac os
+        peak_rss //= 1024
+    return peak_rss
+
+
+class PipelineTimer(object):
+    """* Collects time and peak memory of pipeline stages.
+    @class jscribe.benchmark.pipeline.PipelineTimer
+    """
+
+    def __init__(self):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        """
+        self.times = OrderedDict((stage, 0.0) for stage in STAGES)
+        self.peak_rss = OrderedDict()
+
+    def call(self, stage, function, *args, **kwargs):
+        """* Calls function and adds time of call to stage.
+        @method .call
+        @param self
+        @param stage {{str}}
+        @param function {{function}}
+        @return {{object}} - Value returned by function.
+        """
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.times[stage] += time.time() - start
+
+    def wrap(self, stage, function):
+        """* Returns function that adds time of every call to stage.
+        @method .wrap
+        @param self
+        @param stage {{str}}
+        @param function {{function}}
+        @return {{function}}
+        """
+        def timed_function(*args, **kwargs):
+            return self.call(stage, function, *args, **kwargs)
+        return timed_function
+
+    def end_stage(self, stage):
+        """* Records peak memory after stage.
+        @method .end_stage
+        @param self
+        @param stage {{str}}
+        """
+        self.peak_rss[stage] = get_peak_rss()
+
+
+def _make_render_to_file(timer, renderer):
+    # renders and writes file separately, so both can be measured
+    def render_to_file(template, context, filepath, encoding):
+        rendered = timer.call(
+            'rendering', lambda: renderer.env.get_template(template).render(context)
+        )
+
+        timer.call(
+            'writing', lambda: renderer.output_writer.write(filepath, rendered.encode(encoding))
+        )
+    return render_to_file
+
+
+def run(settings_path):
+    """* Generates documentation with settings from given file and measures every stage.
+    @function jscribe.benchmark.pipeline.run
+    @param settings_path {{str}}
+    @return {{dict}} - Results with number of files and elements, times of stages in seconds and
+        peak memory after stages in kilobytes.
+    """
+    timer = PipelineTimer()
+    settings.load(settings_path)
+    tag_settings = load_tag_settings(settings.TAG_SETTINGS)
+    file_contents.clear()
+    file_contents.max_size = settings.FILE_CONTENT_CACHE_SIZE
+    start = time.time()
+    # discovery
+    filepaths = timer.call(
+        'discovery', discover_files, settings.INPUT_PATHS, settings.FILE_REGEX,
+        ignore_paths_regex=settings.IGNORE_PATHS_REGEX, ignore_regex=settings.FILE_IGNORE_REGEX,
+        ignore_files=settings.IGNORE_FILES, cache_path=settings.DISCOVERY_CACHE_PATH,
+        backend=settings.DISCOVERY_BACKEND, threads=settings.DISCOVERY_THREADS
+    )
+    timer.end_stage('discovery')
+    # parsing, files are parsed in this process so parsing and assembly can be measured apart
+    dsp = DocStringParser(
+        tag_settings, settings.DOC_STRING_REGEX, settings.TAG_REGEX,
+        settings.IGNORE_INVALID_TAGS, settings.COMPACT_ELEMENTS
+    )
+    dsp.max_file_size = settings.MAX_FILE_SIZE
+    dsp.skip_binary_files = settings.SKIP_BINARY_FILES
+    files_records = [timer.call('parsing', dsp.get_file_records, path) for path in filepaths]
+    timer.end_stage('parsing')
+    # assembly
+    for path, records in zip(filepaths, files_records):
+        timer.call('assembly', dsp.add_file_records, path, records)
+    del files_records
+    timer.end_stage('assembly')
+    # conversion, rendering and writing are measured inside generator
+    generator_class = DocumentationGenerator.GENERATORS.get(settings.GENERATOR)
+    if generator_class is None:
+        raise Generator.InvalidGeneratorException(
+            'Invalid generator "{}". Maybe not supported yet.'.format(settings.GENERATOR)
+        )
+    template_generator = generator_class(
+        dsp.data, tag_settings, dsp.documentation_filepaths
+    ).create_template_generator()
+    template_generator._build_template_data = timer.wrap(
+        'conversion', template_generator._build_template_data
+    )
+    template_generator.renderer.render_to_file = _make_render_to_file(
+        timer, template_generator.renderer
+    )
+    generation_start = time.time()
+    template_generator.generate_documentation()
+    # everything else generator does, like highlighting source files
+    timer.times['other'] = time.time() - generation_start - sum(
+        timer.times[stage] for stage in ('conversion', 'rendering', 'writing')
+    )
+    timer.end_stage('generation')
+    return OrderedDict([
+        ('files', len(filepaths)),
+        ('documentation_files', len(dsp.documentation_filepaths)),
+        ('elements', sum(
+            1 for element in dsp.namepath_index.itervalues() if element.get('type') is not None
+        )),
+        ('total', time.time() - start),
+        ('times', timer.times),
+        ('peak_rss_kb', timer.peak_rss),
+    ])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measures time of every stage of documentation generation.'
+    )
+    parser.add_argument(
+        '--settings', type=str, default=None,
+        help='Settings file of project to benchmark, if not given then corpus is generated.'
+    )
+    parser.add_argument(
+        '--corpus-path', type=str, default=None,
+        help='Where corpus is generated, temporary directory is used by default and removed.'
+    )
+    parser.add_argument('--output', type=str, default=None, help='Json file for results.')
+    corpus.add_arguments(parser)
+    args = parser.parse_args()
+    results = OrderedDict([
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('date', time.strftime('%Y-%m-%dT%H:%M:%S')),
+    ])
+    if args.settings is not None:
+        results['settings'] = args.settings
+        results.update(run(args.settings))
+    else:
+        corpus_path = args.corpus_path
+        if corpus_path is None:
+            corpus_path = tempfile.mkdtemp(prefix='jscribe_benchmark_')
+        results['corpus'] = corpus.generate(
+            corpus_path, **corpus.get_parameters_from_arguments(args)
+        )
+        cwd = os.getcwd()
+        # paths in corpus settings are relative to corpus directory
+        os.chdir(corpus_path)
+        try:
+            results.update(run('settings.json'))
+        finally:
+            os.chdir(cwd)
+            if args.corpus_path is None:
+                shutil.rmtree(corpus_path)
+    output = json.dumps(results, indent=4)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            f.write(output)
+            f.close()
+    print(output)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Measures speed of getting data from doc strings (tags and their values).
+
+Usage: {$bash python -m jscribe.benchmark.taglexer --doc-strings 1000000 $}
+@module jscribe.benchmark.taglexer
+"""
+
+import time
+import argparse
+
+from jscribe.core.docstringparser import DocStringParser
+from jscribe.conf.jstagsettings import TAG_SETTINGS
+from jscribe.conf import settings
+
+
+DOC_STRING_TEMPLATES = [
+    u"""Creates new entity number {0}.
+Description has *markdown* and [link](#foo).
+@method .create{0}
+@param name {{{{str}}}} - Name of entity.
+@param options={{}} {{{{#core.Options}}}} - Options.
+@param args... - Rest of arguments.
+@return {{{{#core.Entity}}}} - New entity.
+@example usage #javascript {{$var entity = create{0}('foo');$}} Creates entity.
+@author Rafał Łużyński
+""",
+    u"""Number of created entities.
+@number .count{0}
+@valtype {{{{int=0}}}} - Counter.
+@private
+""",
+    u"""Entity class {0}.
+@class core.Entity{0} "Entity {0}"
+@inherits {{{{#core.Base}}}}
+@version 1.0
+@license MIT
+""",
+]
+
+
+def make_doc_strings(count):
+    """* Returns list of synthetic doc strings, like ones returned by
+    {#jscribe.core.docstringparser.DocStringParser._get_doc_strings_from_text}.
+    @function jscribe.benchmark.taglexer.make_doc_strings
+    @param count {{int}}
+    @return {{list}}
+    """
+    doc_strings = []
+    for i in range(count):
+        template = DOC_STRING_TEMPLATES[i % len(DOC_STRING_TEMPLATES)]
+        doc_strings.append((i * 10 + 1, i * 10 + 9, template.format(i)))
+    return doc_strings
+
+
+def run(count):
+    """* Runs benchmark.
+    @function jscribe.benchmark.taglexer.run
+    @param count {{int}} - Number of doc strings to parse.
+    @return {{float}} - Time of parsing all doc strings in seconds.
+    """
+    dsp = DocStringParser(
+        TAG_SETTINGS, settings.DOC_STRING_REGEX, settings.TAG_REGEX, settings.IGNORE_INVALID_TAGS
+    )
+    doc_strings = make_doc_strings(count)
+    start = time.time()
+    for doc_string in doc_strings:
+        dsp._parse_doc_string(doc_string)
+    return time.time() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures speed of parsing doc strings.')
+    parser.add_argument(
+        '--doc-strings', type=int, default=1000000, help='Number of doc strings.'
+    )
+    args = parser.parse_args()
+    elapsed = run(args.doc_strings)
+    print('{} doc strings parsed in {:.2f} s ({:.2f} us per doc string).'.format(
+        args.doc_strings, elapsed, elapsed / args.doc_strings * 1000000
+    ))
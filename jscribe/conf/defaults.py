@@ -9,6 +9,7 @@ INPUT_PATHS = ["./"]  # paths to source files that should be discovered
 IGNORE_PATHS_REGEX = []
 FILE_REGEX = r".*?[.]js$"
 FILE_IGNORE_REGEX = None
+IGNORE_FILES = []  # names of gitignore-style files, i.e. ".gitignore"
 DOCUMENTATION_OUTPUT_PATH = "./"
 DOC_STRING_REGEX = [r"[/][*][*]", r"(?<!\\)[*][/]"]
 TAG_REGEX = r"^\s*?[@](?P<tag>.*?)\s"
@@ -25,3 +26,20 @@ OUTPUT_ENCODING = "utf-8"
 LANGUAGE = "javascript"
 GENERATOR = "html"
 ALL_SOURCE_FILES = False
+PARSE_CACHE_PATH = None
+PAGE_DEPENDENCIES_PATH = None
+DISCOVERY_CACHE_PATH = None
+DISCOVERY_BACKEND = "filesystem"
+DISCOVERY_THREADS = 1
+JOBS = 1
+COMPACT_ELEMENTS = False
+MAX_FILE_SIZE = None
+SKIP_BINARY_FILES = True
+FILE_CONTENT_CACHE_SIZE = 67108864  # 64 MB
+HIGHLIGHT_CACHE_PATH = None
+HIGHLIGHT_CACHE_SIZE = 67108864  # 64 MB
+MARKUP_CACHE_PATH = None
+MARKUP_CACHE_SIZE = 16777216  # 16 MB
+TEMPLATE_CACHE_PATH = None
+COMPILED_TEMPLATES_PATH = None
+OUTPUT_MANIFEST_PATH = None
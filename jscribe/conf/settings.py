@@ -7,8 +7,10 @@
 """
 
 import sys
+import copy
 import json
 
+from jscribe.conf import defaults
 from jscribe.conf.defaults import *
 
 
@@ -25,6 +27,16 @@ def load(path):
         setattr(sys.modules[__name__], attr, value)
 
 
+def reset():
+    """* Restores default value of every setting, so settings can be loaded again from changed
+    file.
+    @function .reset
+    """
+    for attr in dir(defaults):
+        if attr.isupper():
+            setattr(sys.modules[__name__], attr, copy.deepcopy(getattr(defaults, attr)))
+
+
 # MANUAL - SETTINGS FILE
 """* You have to create your own settings file to generate documentation and
 pass path to it as first argument to {#jscribeit}.
@@ -39,6 +51,7 @@ Example settings file (defaults):
     "IGNORE_PATHS_REGEX": [],
     "FILE_REGEX": ".*?[.]js$",
     "FILE_IGNORE_REGEX": null,
+    "IGNORE_FILES": [],
     "DOCUMENTATION_OUTPUT_PATH": "./",
     "DOC_STRING_REGEX": ["[/][*][*]", "(?<!\\\\)[*][/]"],
     "TAG_REGEX": "^\\s*?[@](?P<tag>.*?)\\s",
@@ -54,7 +67,24 @@ Example settings file (defaults):
     "OUTPUT_ENCODING": "utf-8",
     "LANGUAGE": "javascript",
     "GENERATOR": "html",
-    "ALL_SOURCE_FILES": false
+    "ALL_SOURCE_FILES": false,
+    "PARSE_CACHE_PATH": null,
+    "PAGE_DEPENDENCIES_PATH": null,
+    "DISCOVERY_CACHE_PATH": null,
+    "DISCOVERY_BACKEND": "filesystem",
+    "DISCOVERY_THREADS": 1,
+    "JOBS": 1,
+    "COMPACT_ELEMENTS": false,
+    "MAX_FILE_SIZE": null,
+    "SKIP_BINARY_FILES": true,
+    "FILE_CONTENT_CACHE_SIZE": 67108864,
+    "HIGHLIGHT_CACHE_PATH": null,
+    "HIGHLIGHT_CACHE_SIZE": 67108864,
+    "MARKUP_CACHE_PATH": null,
+    "MARKUP_CACHE_SIZE": 16777216,
+    "TEMPLATE_CACHE_PATH": null,
+    "COMPILED_TEMPLATES_PATH": null,
+    "OUTPUT_MANIFEST_PATH": null
 }
 $}
 
@@ -63,9 +93,16 @@ $}
 - **INPUT_PATHS**: array of paths to directories that contains your source files you want to be
 discovered
 - **IGNORE_PATHS_REGEX**: array of regexes that match paths to directories that you want to exclude
-from your INPUT_PATHS, in example unit tests files.
+from your INPUT_PATHS, in example unit tests files. Subdirectories of excluded directory are excluded
+too, they are not even walked.
 - **FILE_REGEX**: regex that matches source file names that should be discovered
 - **FILE_IGNORE_REGEX**: regex that matches source file names that must not be discovered
+- **IGNORE_FILES**: array of names of gitignore-style files, in example `[".gitignore",
+    ".jscribeignore"]`. These files are read from every walked directory and from parent directories
+    of INPUT_PATHS up to the root of git repository, files and directories matched by their patterns
+    are not discovered. Patterns have the same syntax and precedence as in `.gitignore`, patterns
+    from file in deeper directory and from later file in this array win. By default no ignore files
+    are read.
 - **DOCUMENTATION_OUTPUT_PATH**: path to fir where you want to create documentation files
 - **DOC_STRING_REGEX**: array with two regexes, first match opening tag of doc string in source files,
     second matches closing tag, for javascript these tags are usually [`/**`, `*/`],
@@ -81,7 +118,9 @@ from your INPUT_PATHS, in example unit tests files.
 - **TEMPLATE**: name of template that is installed in `jscribe/templates/{generator_name}` package, in
     example `default` template, if generator is `html` points to `jscribe/templates/html/default/`
 - **TEMPLATE_SETTINGS**: settings that are different for every template, will be described in template
-    section
+    section. Default template renders navigation lists once and inserts them in every page, if its
+    `NAVIGATION_FILE` setting is `true` then navigation is written to one file shown by every page,
+    so size of pages doesn't depend on size of project and pages don't change when lists change
 - **TAG_SETTINGS**: path to file with your tag settings, this can be a path to python package or path
     to json file. You can use one of builtin tag settings: `jscribe.conf.pythontagsettings`,
     `jscribe.conf.jstagsettings` or your own, I admit that you create your own tag settings file.
@@ -94,6 +133,67 @@ from your INPUT_PATHS, in example unit tests files.
     supported
 - **ALL_SOURCE_FILES**: if `true` then source file documentation will be created for all discovered
     source files
+- **PARSE_CACHE_PATH**: path to file where data collected from source files will be cached, if set
+    then only files that changed since last run are parsed again, cache is invalidated when
+    DOC_STRING_REGEX, TAG_REGEX, IGNORE_INVALID_TAGS or tag settings change
+- **PAGE_DEPENDENCIES_PATH**: path to file where inputs of every generated page are stored
+    (elements shown on page, urls of referenced elements, navigation lists, templates and template
+    settings), if set then only pages with changed inputs are generated again and pages generated
+    last time, that are not generated anymore (i.e. pages of removed elements), are removed from
+    DOCUMENTATION_OUTPUT_PATH
+- **DISCOVERY_CACHE_PATH**: path to file where snapshot of walked directories will be cached, if
+    set then only directories that changed since last run are listed again, for others one `stat`
+    call is enough, this helps with big trees on network filesystems. Cache is invalidated when
+    FILE_REGEX, FILE_IGNORE_REGEX or IGNORE_FILES change
+- **DISCOVERY_BACKEND**: `"filesystem"` to walk INPUT_PATHS or `"git"` to list files from git index
+    of local repository (only local `git` binary is needed), then FILE_REGEX, FILE_IGNORE_REGEX and
+    IGNORE_PATHS_REGEX are applied to listed files. Files are listed in git order (sorted by path),
+    so elements with the same name may be listed in different order than with filesystem walk. If
+    git can't be used, then directories are walked. With parse cache, `--since <revision>`
+    argument of {#jscribeit} can be used to read only files changed since that revision
+- **DISCOVERY_THREADS**: number of threads that list directories during filesystem walk, values
+    greater than 1 help on network filesystems (i.e. NFS) where every directory listing waits for
+    server. Discovered files are the same and in the same order as with one thread
+- **JOBS**: number of processes used for parsing source files and rendering pages, it can be also
+    set with `--jobs` argument of {#jscribeit}, for small projects files are always parsed and
+    rendered in one process. If greater than 1, then documented source files are highlighted
+    while documentation data is still collected (unless PAGE_DEPENDENCIES_PATH is set)
+- **COMPACT_ELEMENTS**: if `true` then collected documentation data is kept in compact
+    {#jscribe.core.element.Element} records instead of dictionaries, use it for really big projects
+    to save memory
+- **MAX_FILE_SIZE**: discovered source files bigger than this number of bytes are skipped, if `null`
+    then size of source files is not limited
+- **SKIP_BINARY_FILES**: if `true` then discovered files that look like binary files (there is a
+    null byte near the beginning of file) are skipped
+- **FILE_CONTENT_CACHE_SIZE**: maximum memory in bytes taken by contents of source files kept
+    between parsing and creating source file documentation, so files don't have to be read and
+    decoded again, if `null` then it's not limited
+- **HIGHLIGHT_CACHE_PATH**: path to file where code highlighted by pygments (source files and code
+    blocks in descriptions) will be cached, if set then code that didn't change since last run is
+    not highlighted again. Cache is ignored when pygments version changes
+- **HIGHLIGHT_CACHE_SIZE**: maximum memory in bytes taken by highlighted code, least recently used
+    code is removed from cache first, if `null` then it's not limited. The same limit applies to
+    source files highlighted in processes (see JOBS) and kept until their pages are rendered
+- **MARKUP_CACHE_PATH**: path to file where descriptions converted from markdown to html will be
+    cached, if set then descriptions that didn't change since last run are not converted again.
+    Cache is ignored when markdown version changes
+- **MARKUP_CACHE_SIZE**: maximum memory in bytes taken by converted descriptions, least recently
+    used are removed from cache first, if `null` then it's not limited
+- **TEMPLATE_CACHE_PATH**: path to directory where bytecode of compiled templates will be cached,
+    if set then templates are not compiled again by every process and every run (i.e. in watch
+    mode), bytecode of changed template is ignored
+- **COMPILED_TEMPLATES_PATH**: path to directory where templates will be precompiled to python
+    modules, if set then templates are compiled only once and every process loads them from
+    modules. Templates are compiled again to new subdirectory when any of them changes, and
+    subdirectories of old templates are removed. If TEMPLATE_CACHE_PATH is set too, then templates
+    are loaded from modules and bytecode cache is used only for templates that can't be compiled,
+    so it usually stays empty
+- **OUTPUT_MANIFEST_PATH**: path to json file where paths of generated files (relative to
+    DOCUMENTATION_OUTPUT_PATH) will be saved after every generation, in lists `written`,
+    `unchanged` and `deleted`, so only changed files have to be deployed. Files whose content
+    didn't change are never written again, so their modification time stays the same. Files listed
+    in manifest of previous generation, that are not generated anymore (i.e. pages of removed
+    elements), are removed and listed as `deleted`
 
 **You don't have to set all properties in your settings because if you don't then default will be
 taken.**
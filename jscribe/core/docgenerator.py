@@ -6,12 +6,19 @@
 @author Rafał Łużyński
 """
 
+import os
 import json
+import logging
 import importlib
 
 from jscribe.utils.file import discover_files
+from jscribe.utils.filecontent import file_contents
+from jscribe.utils.highlightcache import highlight_cache
+from jscribe.utils.markupcache import markup_cache
+from jscribe.utils.gitfiles import GitException, get_commit, list_changed_files, list_git_files
 from jscribe.conf import settings
 from jscribe.core.docstringparser import DocStringParser
+from jscribe.core.parsecache import ParseCache
 from jscribe.core.htmldocgenerator import HTMLDocumentationGenerator
 from jscribe.core.generator import Generator
 
@@ -33,7 +40,7 @@ class DocumentationGenerator(object):
     GENERATORS = {
         'html': HTMLDocumentationGenerator,
     }
-    def __init__(self, settings_path):
+    def __init__(self, settings_path, jobs=None, since=None):
         """* Init. Internally calls
             {#jscribe.core.docgenerator.DocumentationGenerator._get_doc_data}
         so doc data is collected on initialize.
@@ -41,14 +48,23 @@ class DocumentationGenerator(object):
         @method .__init__
         @param self
         @param settings_path {{unicode}} - Path to settings file (json).
+        @param jobs=None {{int}} - Number of processes used for parsing, overrides `JOBS` setting.
+        @param since=None {{str}} - Git revision, if given then only files that changed since this
+            revision are read, records of other files are taken from parse cache.
         """
         # here documentation data will be collected
         self.doc_data = {}
         self.tag_settings = {}
         self.discovered_filepaths = []
+        self.since = since
+        self.source_highlighter = None
         # load settings from file into jscribe.conf.settings module
         settings.load(settings_path)
+        if jobs is not None:
+            settings.JOBS = jobs
         self._load_tag_settings(settings.TAG_SETTINGS)
+        # before parsing, so processes that highlight source files have cached code too
+        self._load_html_caches()
         # collect documentation data from discovered source files
         self._get_doc_data()
 
@@ -62,41 +78,206 @@ class DocumentationGenerator(object):
         @param tag_settings_path {{str}} - Path to json file or python module path.
         @private
         """
-        # check if file is json
-        if tag_settings_path.split('.')[-1] == 'json':
-            with open(tag_settings_path, 'r') as f:
-                self.tag_settings = json.load(f)
-                f.close()
-        else:
-            # if file is not json then assume it's a path to python module
-            self.tag_settings = getattr(
-                importlib.import_module(
-                    tag_settings_path
-                ),
-                'TAG_SETTINGS'
-            )
+        self.tag_settings = load_tag_settings(tag_settings_path)
 
-    def _get_doc_data(self):
-        """* Discovers source files paths (basing on paths and regexes in settings)
-            and collects documentation data from it.
-        @method ._get_doc_data
+    def _get_html_caches(self):
+        """* Returns caches of highlighted code and converted markup with their paths and sizes
+        from settings.
+        @method ._get_html_caches
         @param self
         @private
+        @return {{list}}
         """
-        # get list of source file paths
-        self.discovered_filepaths = discover_files(
+        return [
+            (highlight_cache, settings.HIGHLIGHT_CACHE_PATH, settings.HIGHLIGHT_CACHE_SIZE),
+            (markup_cache, settings.MARKUP_CACHE_PATH, settings.MARKUP_CACHE_SIZE),
+        ]
+
+    def _load_html_caches(self):
+        """* Sets sizes of highlight and markup caches and loads them from files, if set in
+        settings.
+        @method ._load_html_caches
+        @param self
+        @private
+        """
+        for cache, path, max_size in self._get_html_caches():
+            cache.max_size = max_size
+            if path is not None:
+                cache.load(path)
+
+    def _save_html_caches(self):
+        """* Saves highlight and markup caches to files, if set in settings.
+        @method ._save_html_caches
+        @param self
+        @private
+        """
+        if settings.HIGHLIGHT_CACHE_PATH is not None:
+            highlight_cache.save(settings.HIGHLIGHT_CACHE_PATH)
+            logging.info('Highlight cache: {} code blocks reused, {} highlighted.'.format(
+                highlight_cache.hits, highlight_cache.misses
+            ))
+        if settings.MARKUP_CACHE_PATH is not None:
+            markup_cache.save(settings.MARKUP_CACHE_PATH)
+            logging.info('Markup cache: {} descriptions reused, {} converted.'.format(
+                markup_cache.hits, markup_cache.misses
+            ))
+
+    def _get_changed_filepaths(self, cache, since, filepaths):
+        """* Returns paths of source files in input paths that changed since parse cache was saved.
+        Files are listed against git commit recorded in cache, path hashes in cache are valid
+        only for it. If it's not the same commit as given revision, then it's used instead.
+        Git doesn't report changes of files that it doesn't track (i.e. ignored files or files in
+        submodules), so every discovered file that is not tracked is treated as changed.
+        @method ._get_changed_filepaths
+        @param self
+        @param cache {{#jscribe.core.parsecache.ParseCache}}
+        @param since {{str}} - Git revision.
+        @param filepaths {{list}} - Paths of discovered files.
+        @private
+        @return {{set|None}} - `None` if changed files can't be listed, then every file is read.
+        """
+        changed_filepaths = set()
+        tracked_filepaths = set()
+        try:
+            for input_path in settings.INPUT_PATHS:
+                if not os.path.isdir(input_path):
+                    continue
+                revision = cache.revisions.get(input_path)
+                if revision is None:
+                    logging.info(
+                        u'Parse cache has no git revision of "{}", every file is read.'.format(
+                            input_path
+                        )
+                    )
+                    return None
+                commit, dirty_filepaths = revision
+                if get_commit(input_path, since) != commit:
+                    logging.info(u'Parse cache of "{}" was saved at {}, not at "{}", files changed '
+                                 u'since {} are read.'.format(input_path, commit, since, commit))
+                changed_filepaths.update(list_changed_files(input_path, commit))
+                # files that were not committed when cache was saved
+                changed_filepaths.update(dirty_filepaths)
+                tracked_filepaths.update(list_git_files(input_path))
+        except GitException as e:
+            logging.warning(u'Can\'t list files changed since "{}", every file is read. {}'.format(
+                since, e
+            ))
+            return None
+        logging.info('{} files changed since parse cache was saved.'.format(len(changed_filepaths)))
+        untracked_filepaths = [path for path in filepaths if path not in tracked_filepaths]
+        if untracked_filepaths:
+            logging.info('{} files not tracked by git are read.'.format(len(untracked_filepaths)))
+            changed_filepaths.update(untracked_filepaths)
+        return changed_filepaths
+
+    def _record_git_revisions(self, cache):
+        """* Records git commit checked out in every input path and files that differ from it in
+        parse cache, so files changed since cache is saved can be listed next time. It must be
+        called before files are parsed, so files changed in the meantime are listed next time.
+        @method ._record_git_revisions
+        @param self
+        @param cache {{#jscribe.core.parsecache.ParseCache}}
+        @private
+        """
+        cache.revisions = {}
+        for input_path in settings.INPUT_PATHS:
+            if not os.path.isdir(input_path):
+                continue
+            try:
+                commit = get_commit(input_path)
+                cache.revisions[input_path] = (commit, list_changed_files(input_path, commit))
+            except GitException as e:
+                logging.info(u'Git revision of "{}" not recorded in parse cache: {}'.format(
+                    input_path, e
+                ))
+
+    def _discover_files(self):
+        """* Returns paths of source files discovered with settings.
+        @method ._discover_files
+        @param self
+        @private
+        @return {{list}}
+        """
+        return discover_files(
             settings.INPUT_PATHS, settings.FILE_REGEX,
             ignore_paths_regex=settings.IGNORE_PATHS_REGEX,
-            ignore_regex=settings.FILE_IGNORE_REGEX
+            ignore_regex=settings.FILE_IGNORE_REGEX, ignore_files=settings.IGNORE_FILES,
+            cache_path=settings.DISCOVERY_CACHE_PATH, backend=settings.DISCOVERY_BACKEND,
+            threads=settings.DISCOVERY_THREADS
         )
-        # create file parser with settings given by user
+
+    def _create_parser(self):
+        """* Creates doc string parser with settings.
+        @method ._create_parser
+        @param self
+        @private
+        @return {{#jscribe.core.docstringparser.DocStringParser}}
+        """
         dsp = DocStringParser(
             self.tag_settings, settings.DOC_STRING_REGEX, settings.TAG_REGEX,
-            settings.IGNORE_INVALID_TAGS
+            settings.IGNORE_INVALID_TAGS, settings.COMPACT_ELEMENTS
+        )
+        dsp.max_file_size = settings.MAX_FILE_SIZE
+        dsp.skip_binary_files = settings.SKIP_BINARY_FILES
+        return dsp
+
+    def _create_source_highlighter(self):
+        """* Creates highlighter of source files, if generator supports it and there is more than
+        one job. It's not used with page dependencies, since then source pages of unchanged files
+        are not generated.
+        @method ._create_source_highlighter
+        @param self
+        @private
+        @return {{#jscribe.core.sourcehighlighter.SourceHighlighter}} - `None` if not used.
+        """
+        if settings.JOBS <= 1 or settings.PAGE_DEPENDENCIES_PATH is not None:
+            return None
+        create_source_highlighter = getattr(
+            self.GENERATORS.get(settings.GENERATOR), 'create_source_highlighter', None
         )
+        if create_source_highlighter is None:
+            return None
+        return create_source_highlighter(settings.JOBS)
+
+    def _get_doc_data(self):
+        """* Discovers source files paths (basing on paths and regexes in settings)
+            and collects documentation data from it.
+        @method ._get_doc_data
+        @param self
+        @private
+        """
+        # get list of source file paths
+        self.discovered_filepaths = self._discover_files()
+        # contents of files read by parser are kept for generators
+        file_contents.clear()
+        file_contents.max_size = settings.FILE_CONTENT_CACHE_SIZE
+        # create file parser with settings given by user
+        dsp = self._create_parser()
+        # source files are highlighted while data is collected and converted
+        self.source_highlighter = self._create_source_highlighter()
+        if self.source_highlighter is not None:
+            dsp.documented_file_callback = self.source_highlighter.submit
+        if settings.PARSE_CACHE_PATH is not None:
+            dsp.cache = ParseCache(settings.PARSE_CACHE_PATH, dsp.get_settings_hash())
+            if self.since is not None:
+                dsp.changed_filepaths = self._get_changed_filepaths(
+                    dsp.cache, self.since, self.discovered_filepaths
+                )
+                self._record_git_revisions(dsp.cache)
+        elif self.since is not None:
+            logging.info('Parse cache is not set, every file is read.')
         # parse every discovered source file
-        for filepath in self.discovered_filepaths:
-            dsp.parse_file(filepath)
+        try:
+            dsp.parse_files(self.discovered_filepaths, settings.JOBS)
+        except:
+            if self.source_highlighter is not None:
+                self.source_highlighter.terminate()
+            raise
+        if dsp.cache is not None:
+            dsp.cache.save()
+            logging.info('Parse cache: {} files reused, {} files parsed.'.format(
+                dsp.cache.hits, dsp.cache.misses
+            ))
         # get collected data
         self.doc_data = dsp.data
         # get filepaths from which source documentation will be created
@@ -111,12 +292,39 @@ class DocumentationGenerator(object):
         @param self
         """
         # get generator
+        generator_class = self._get_generator_class()
+        # make instance of generator and generate docs
+        generator = generator_class(self.doc_data, self.tag_settings, self.documentation_filepaths)
+        generator.source_highlighter = self.source_highlighter
+        generator.generate_documentation()
+        self._save_html_caches()
+
+    def _get_generator_class(self):
+        """* Returns class of generator from settings.
+        @method ._get_generator_class
+        @param self
+        @private
+        @return {{class}}
+        """
         generator_class = self.GENERATORS.get(settings.GENERATOR)
         if generator_class is None:
             raise Generator.InvalidGeneratorException(
                 'Invalid generator "{}". Maybe not supported yet.'.format(settings.GENERATOR)
             )
-        # make instance of generator and generate docs
-        generator = generator_class(self.doc_data, self.tag_settings, self.documentation_filepaths)
-        generator.generate_documentation()
+        return generator_class
+
 
+def load_tag_settings(tag_settings_path):
+    """* Returns tag settings from json file or python module.
+    @function jscribe.core.docgenerator.load_tag_settings
+    @param tag_settings_path {{str}} - Path to json file or python module path.
+    @return {{dict}}
+    """
+    # check if file is json
+    if tag_settings_path.split('.')[-1] == 'json':
+        with open(tag_settings_path, 'r') as f:
+            tag_settings = json.load(f)
+            f.close()
+        return tag_settings
+    # if file is not json then assume it's a path to python module
+    return getattr(importlib.import_module(tag_settings_path), 'TAG_SETTINGS')
@@ -6,13 +6,61 @@
 @author Rafał Łużyński
 """
 
+import os
 import re
-import codecs
 import json
+import bisect
+import logging
+import hashlib
+import sre_parse
+import sre_constants
+import multiprocessing
 from collections import OrderedDict
 
-from jscribe.utils.file import get_py_file_encoding
+from jscribe.utils.file import is_binary_content, is_ascii_compatible_encoding
+from jscribe.utils.filecontent import file_contents
 from jscribe.conf import settings
+from jscribe.core.parsecache import get_content_hash
+from jscribe.core.element import Element, to_plain_data
+
+# marks records missing in parse cache, None can't be used since it's a valid value
+_NOT_CACHED = object()
+# line breaks of decoded source file, the same as recognized by unicode.splitlines
+_UNICODE_LINE_BREAK_REGEX_OBJ = re.compile(u'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+# line breaks of not decoded source file
+_LINE_BREAK_REGEX_OBJ = re.compile('\n')
+# whitespaces matched by "\s" regex
+_WHITESPACES = ' \t\n\r\f\v'
+# zero width regex elements, they can be skipped when literal prefix of regex is searched
+_ZERO_WIDTH_OPCODES = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+# regexes used to get values from tag strings, compiled once
+_ALIAS_NAME_REGEX_OBJ = re.compile(r'"(?P<alias>.+?)"', flags=re.DOTALL)
+_REFERENCE_REGEX_OBJ = re.compile(r'^[{]#(?P<ref>.*?)[}]$')
+_AUTHOR_REGEX_OBJ = re.compile(r'\s*?(?P<author>.*?)$', flags=re.DOTALL)
+_RETURN_REGEX_OBJ = re.compile(
+    r'\s*?[{][{](?P<return_type>.*?)[}][}]\s-?[ ]?(?P<description>.*?)$',
+    flags=re.DOTALL
+)
+_PARAM_REGEX_OBJ = re.compile(
+    r'\s*?(?P<name>\w+)' +
+    r'(?:(?:=(?P<default>[^.]+?))|(?:(?P<seq>[.]{3}))|(?:))' +
+    r'(?:\s[{][{](?P<type>.+?)[}][}])?' +
+    r'(?:\s-?\s?(?P<desc>.*?))$',
+    flags=re.DOTALL
+)
+_VALTYPE_REGEX_OBJ = re.compile(
+    r'\s*?[{][{](?P<valtype>.*?)(?:=(?P<default>.+?))?[}][}](?:\s-?\s?(?P<desc>.*?))$',
+    flags=re.DOTALL
+)
+_INHERITS_REGEX_OBJ = re.compile(r'\s*?[{][{](?P<inherits>.*?)[}][}](\s|$)')
+_ACCESS_REGEX_OBJ = re.compile(r'\s*?(?P<access>.*?)(\s|$)')
+_VERSION_REGEX_OBJ = re.compile(r'\s*?(?P<version>.*?)$', flags=re.DOTALL)
+_LICENSE_REGEX_OBJ = re.compile(r'\s*?(?P<license>.*?)$', flags=re.DOTALL)
+_EXAMPLE_REGEX_OBJ = re.compile(
+    r'\s*?(?P<title>.+?)' +
+    r'(?:\s[#](?P<langid>\w+?))?\s[{][$](?P<code>.*?)[$][}](?:\s(?P<desc>.*?))$',
+    flags=re.DOTALL
+)
 
 
 class DocStringParser(object):
@@ -59,7 +107,15 @@ class DocStringParser(object):
         @exception .TagSettingsException
         """
 
-    def __init__(self, tag_settings, doc_string_regex, tag_regex, ignore_invalid_tags=False):
+    """* Minimal number of files to parse, for which
+    {#jscribe.core.docstringparser.DocStringParser.parse_files} starts process pool.
+    @attribute .PARALLEL_MIN_FILES
+    @valtype {{int}}
+    """
+    PARALLEL_MIN_FILES = 100
+
+    def __init__(self, tag_settings, doc_string_regex, tag_regex, ignore_invalid_tags=False,
+                 compact_elements=False):
         """* Initialization.
         @method .__init__
         @constructor
@@ -71,6 +127,9 @@ class DocStringParser(object):
         should not be matched.
         @param ignore_invalid_tags=False {{boolean}} - If `True` then invalid tag name won't raise
         error.
+        @param compact_elements=False {{boolean}} - If `True` then collected data is made of
+        {#jscribe.core.element.Element} instances instead of dictionaries, it takes much less
+        memory.
         """
         # map of tag property name and function to parse data from that tag string
         self.PROPERTY_TAGS = {
@@ -95,6 +154,7 @@ class DocStringParser(object):
         self._tag_regex_obj = None
         self.tag_regex = tag_regex
         self.ignore_invalid_tags = ignore_invalid_tags
+        self.compact_elements = compact_elements
         self._tag_alias_map = {}
         self._tag_settings = tag_settings
         self._create_tag_alias_map(tag_settings)
@@ -105,9 +165,49 @@ class DocStringParser(object):
         @valtype {{dict={'properties': {}}}}
         @attribute .data
         """
-        self.data = OrderedDict({'properties': OrderedDict({})})
+        self.data = self._create_root_element()
+        """* Flat index of every element in
+        {#jscribe.core.docstringparser.DocStringParser.data}, keys are namepaths of elements.
+        @valtype {{dict}}
+        @attribute .namepath_index
+        """
+        self.namepath_index = {}
         self.documentation_filepaths = []
         self._temp_data = OrderedDict({})
+        """* Parse cache, if set then doc string records of files that didn't change since last
+        run are taken from it instead of parsing these files again.
+        @valtype {{#jscribe.core.parsecache.ParseCache}}
+        @attribute .cache
+        """
+        self.cache = None
+        """* Paths of files that changed since last run, i.e. since some git revision. If set,
+        then records of other files are taken from
+        {#jscribe.core.docstringparser.DocStringParser.cache} by path, without reading these
+        files. If `None` then every file is checked.
+        @valtype {{set|None}}
+        @attribute .changed_filepaths
+        """
+        self.changed_filepaths = None
+        """* Function called once with path of every file added to `documentation_filepaths`, as
+        soon as it's known that file will be documented, i.e. to prepare its source page. With
+        `ALL_SOURCE_FILES` setting it's called for every file before parsing, otherwise when
+        records of file are parsed or taken from cache, in order in which files are parsed.
+        @valtype {{function|None}}
+        @attribute .documented_file_callback
+        """
+        self.documented_file_callback = None
+        self._notified_filepaths = set()
+        """* Files bigger than this number of bytes are skipped, if `None` then size of files is
+        not limited.
+        @valtype {{int|None}}
+        @attribute .max_file_size
+        """
+        self.max_file_size = None
+        """* If `True` then binary files (with null byte near the beginning) are skipped.
+        @valtype {{boolean}}
+        @attribute .skip_binary_files
+        """
+        self.skip_binary_files = True
 
     @property
     def doc_string_regex(self):
@@ -122,13 +222,9 @@ class DocStringParser(object):
             for doc string opening tag, second for closing.
         """
         self._doc_string_regex = doc_string_regex
-        # only whitespaces before opening tag
-        no_whitespace_regex = r'^\s*?'
         self._doc_string_open_regex_obj = re.compile(doc_string_regex[0])
-        self._doc_string_open_whitespaces_regex_obj = re.compile(
-            no_whitespace_regex + doc_string_regex[0]
-        )
         self._doc_string_close_regex_obj = re.compile(doc_string_regex[1])
+        self._doc_string_open_literal = get_regex_literal_prefix(doc_string_regex[0])
 
     @property
     def tag_regex(self):
@@ -158,27 +254,220 @@ class DocStringParser(object):
             for alias in aliases:
                 self._tag_alias_map[alias] = tag
 
+    def get_settings_hash(self):
+        """* Returns hash of parser settings that have impact on data collected from files.
+        @method .get_settings_hash
+        @param self
+        @return {{str}}
+        """
+        parser_settings = json.dumps(
+            [
+                self._doc_string_regex, self._tag_regex, self._tag_settings,
+                self.ignore_invalid_tags, self.max_file_size, self.skip_binary_files,
+            ],
+            sort_keys=True
+        )
+        return hashlib.sha1(parser_settings).hexdigest()
+
     def parse_file(self, path):
         """* Parses file from given path and collects documentation data from it.
         @method .parse_file
         @param self
         @param path {str} - path to source file
         """
-        # get coding of source file
-        source_coding = get_py_file_encoding(path)
+        self.add_file_records(path, self.get_file_records(path))
+
+    def get_file_records(self, path):
+        """* Returns data of every valid doc string found in file. Records are taken from
+        {#jscribe.core.docstringparser.DocStringParser.cache} if file didn't change.
+        @method .get_file_records
+        @param self
+        @param path {str} - path to source file
+        @return {{list|None}} - List of doc string data or `None` if there is no doc string in file.
+        """
+        if self.cache is None:
+            return self._parse_file_records(path)
+        if self._is_file_too_big(path):
+            return None
+        content_hash = self._get_file_content_hash(path)
+        records = self.cache.get(content_hash, _NOT_CACHED)
+        if records is _NOT_CACHED:
+            records = self._parse_file_records(path)
+            self.cache.set(content_hash, records)
+        return records
+
+    def _get_file_content_hash(self, path):
+        if self.changed_filepaths is not None and path not in self.changed_filepaths:
+            content_hash = self.cache.get_path_hash(path)
+            if content_hash is not None:
+                return content_hash
+        content_hash = get_content_hash(file_contents.get(path).content)
+        self.cache.set_path_hash(path, content_hash)
+        return content_hash
+
+    def parse_files(self, paths, jobs=1):
+        """* Parses files from given paths and collects documentation data from them.
+
+        If `jobs` is greater than 1, then files are parsed in a pool of `jobs` processes, biggest
+        files first. Collected data is always merged in order of given paths, so it's the same as
+        if every file was parsed with
+        {#jscribe.core.docstringparser.DocStringParser.parse_file}. If there are less than
+        {#jscribe.core.docstringparser.DocStringParser.PARALLEL_MIN_FILES} files to parse, then
+        they are parsed in this process, since starting pool would take longer.
+        @method .parse_files
+        @param self
+        @param paths {{list}} - paths to source files
+        @param jobs=1 {{int}} - number of processes
+        """
+        for path, records in zip(paths, self._iter_files_records(paths, jobs)):
+            self.add_file_records(path, records)
+
+    def get_files_records(self, paths, jobs=1):
+        """* Returns records of every given file, like
+        {#jscribe.core.docstringparser.DocStringParser.get_file_records}, but files can be parsed
+        in a pool of processes (see {#jscribe.core.docstringparser.DocStringParser.parse_files}).
+        @method .get_files_records
+        @param self
+        @param paths {{list}} - paths to source files
+        @param jobs=1 {{int}} - number of processes
+        @return {{list}} - Records of files, in order of paths.
+        """
+        return list(self._iter_files_records(paths, jobs))
+
+    def _iter_files_records(self, paths, jobs):
+        # yields records in order of paths, in one process every file is parsed just before its
+        # records are yielded
+        files_records = [_NOT_CACHED] * len(paths)
+        content_hashes = {}
+        if settings.ALL_SOURCE_FILES:
+            # every discovered file is documented
+            for path in paths:
+                self._notify_documented_file(path)
+        if self.cache is not None:
+            for index, path in enumerate(paths):
+                if self._is_file_too_big(path):
+                    files_records[index] = None
+                    continue
+                content_hashes[index] = self._get_file_content_hash(path)
+                files_records[index] = self.cache.get(content_hashes[index], _NOT_CACHED)
+                if files_records[index] not in (None, _NOT_CACHED):
+                    self._notify_documented_file(path)
+        pending = [index for index, records in enumerate(files_records) if records is _NOT_CACHED]
+        if jobs <= 1 or len(pending) < self.PARALLEL_MIN_FILES:
+            for index, path in enumerate(paths):
+                if files_records[index] is _NOT_CACHED:
+                    files_records[index] = self._parse_file_records(path)
+                    if self.cache is not None:
+                        self.cache.set(content_hashes[index], files_records[index])
+                    if files_records[index] is not None:
+                        self._notify_documented_file(path)
+                yield files_records[index]
+            return
+        # biggest files first, so no process is left with big file at the end
+        pending.sort(key=lambda index: os.path.getsize(paths[index]), reverse=True)
+        errors = {}
+        pool = multiprocessing.Pool(
+            min(jobs, len(pending)), _init_parser_process,
+            (
+                self._tag_settings, self._doc_string_regex, self._tag_regex,
+                self.ignore_invalid_tags, self.max_file_size, self.skip_binary_files,
+            )
+        )
+        try:
+            for index, records, error in pool.imap_unordered(
+                _parse_file_records_in_process, [(index, paths[index]) for index in pending]
+            ):
+                if error is not None:
+                    errors[index] = error
+                    continue
+                files_records[index] = records
+                if self.cache is not None:
+                    self.cache.set(content_hashes[index], records)
+                # file can be prepared while other files are still parsed
+                if records is not None:
+                    self._notify_documented_file(paths[index])
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        # error is raised on the same file as it would be without pool
+        for index in range(len(paths)):
+            if index in errors:
+                raise _unpack_process_error(errors[index])
+            yield files_records[index]
+
+    def _parse_file_records(self, path):
+        """* Parses file and returns data of every valid doc string found in it.
+        @method ._parse_file_records
+        @param self
+        @param path {str} - path to source file
+        @private
+        @return {{list|None}} - List of doc string data or `None` if there is no doc string in file.
+        """
+        if self._is_file_too_big(path):
+            return None
+        # file is read once, its content is shared with generators
+        file_content = file_contents.get(path)
+        if self.skip_binary_files and is_binary_content(file_content.content):
+            logging.info(u'Skipping binary file: {}'.format(path))
+            return None
+        # file that can't contain doc string opening tag is not decoded
+        if not self._may_contain_doc_strings(file_content.content, file_content.coding):
+            return None
         # get valid doc strings from file
-        doc_strings = self._get_doc_strings(path, source_coding)
-        if doc_strings:
+        doc_strings = self._get_doc_strings_from_text(file_contents.get_text(path))
+        if not doc_strings:
+            return None
+        records = []
+        # parse every doc string and get data from it
+        for doc_string in doc_strings:
+            doc_string_data = self._parse_doc_string(doc_string)
+            if doc_string_data is None:
+                # that doc string is not a proper doc string
+                continue
+            records.append(doc_string_data)
+        return records
+
+    def _is_file_too_big(self, path):
+        if self.max_file_size is None or os.path.getsize(path) <= self.max_file_size:
+            return False
+        logging.info(u'Skipping file bigger than {} bytes: {}'.format(self.max_file_size, path))
+        return True
+
+    def _may_contain_doc_strings(self, content, encoding):
+        """* Checks raw content of file for literal beginning of doc string opening tag. Content
+        is checked only if file encoding is ascii compatible (or file is not decoded at all),
+        otherwise it's assumed that file may contain doc strings.
+        @method ._may_contain_doc_strings
+        @param self
+        @param content {{str}} - Raw content of file.
+        @param encoding {{str|None}} - Encoding of file.
+        @private
+        @return {{boolean}}
+        """
+        if not self._doc_string_open_literal:
+            return True
+        if encoding is not None and not is_ascii_compatible_encoding(encoding):
+            return True
+        return self._doc_string_open_literal in content
+
+    def add_file_records(self, path, records):
+        """* Collects data of doc strings found in file into
+        {#jscribe.core.docstringparser.DocStringParser.data}.
+        @method .add_file_records
+        @param self
+        @param path {str} - path to source file
+        @param records {{list|None}} - Records returned by
+            {#jscribe.core.docstringparser.DocStringParser.get_file_records}.
+        """
+        if records is not None:
             # append file path to documentation_filepaths only if at least one valid doc string
             # was found
-            self.documentation_filepaths.append(path)
+            self._add_documentation_filepath(path)
             previous_elements_paths = []
-            # parse every doc string and get data from it
-            for doc_string in doc_strings:
-                doc_string_data = self._parse_doc_string(doc_string)
-                if doc_string_data is None:
-                    # that doc string is not a proper doc string
-                    continue
+            for doc_string_data in records:
                 doc_string_data['filepath'] = path
                 # adds collected data to temporary data collector from where data will be collected
                 # to self.data
@@ -187,33 +476,77 @@ class DocStringParser(object):
                 )
             # collect data from temporary collector to self.data
             self._assemble_data()
+        elif not settings.ALL_SOURCE_FILES:
+            # source file documentation won't be created for this file, so its content won't be
+            # needed anymore
+            file_contents.discard(path)
         # if user wants then all discovered filepaths will be used in documentation source
         # generation
         if settings.ALL_SOURCE_FILES:
-            self.documentation_filepaths.append(path)
+            self._add_documentation_filepath(path)
+
+    def _add_documentation_filepath(self, path):
+        self.documentation_filepaths.append(path)
+        self._notify_documented_file(path)
+
+    def _notify_documented_file(self, path):
+        if self.documented_file_callback is not None and path not in self._notified_filepaths:
+            self._notified_filepaths.add(path)
+            self.documented_file_callback(path)
 
     def _assemble_data(self):
         """* Method collects data from temporary collector and assembles it in `self.data`.
+        Temporary collector holds data of one file only and is cleared afterwards, so every
+        element is merged into `self.data` exactly once.
         @method ._assemble_data
         @param self
         @private
         """
-        for path, data in self._temp_data.iteritems():
-            path_parts = path.split('.')
-            current_element = self.data
-            for part in path_parts:
-                if current_element['properties'].get(part) is None:
-                    current_element['properties'][part] = {
-                        'properties': OrderedDict({}),
-                        'name': None,
-                        'type': None,
-                        'startline': None,
-                        'endline': None,
-                        'filepath': None,
-                    }
-                current_element = current_element['properties'].get(part)
-            for prop in data:
-                current_element[prop] = data[prop]
+        temp_data = self._temp_data
+        self._temp_data = OrderedDict({})
+        for path, data in temp_data.iteritems():
+            current_element = self.namepath_index.get(path)
+            if current_element is None:
+                path_parts = path.split('.')
+                current_element = self.data
+                for index, part in enumerate(path_parts):
+                    if current_element['properties'].get(part) is None:
+                        self._add_element(current_element, part)
+                        self.namepath_index['.'.join(path_parts[:index + 1])] = \
+                            current_element['properties'].get(part)
+                    current_element = current_element['properties'].get(part)
+            if self.compact_elements:
+                current_element.update_from_record(data)
+            else:
+                for prop in data:
+                    current_element[prop] = data[prop]
+
+    def _create_root_element(self):
+        if self.compact_elements:
+            return Element()
+        return OrderedDict({'properties': OrderedDict({})})
+
+    def _add_element(self, parent_element, name):
+        """* Adds new, not defined yet, element to properties of parent element.
+        @method ._add_element
+        @param self
+        @param parent_element {{dict|#jscribe.core.element.Element}}
+        @param name {{str}}
+        @private
+        """
+        if self.compact_elements:
+            parent_element.add_child(name, Element(
+                name=None, type=None, startline=None, endline=None, filepath=None
+            ))
+        else:
+            parent_element['properties'][name] = {
+                'properties': OrderedDict({}),
+                'name': None,
+                'type': None,
+                'startline': None,
+                'endline': None,
+                'filepath': None,
+            }
 
     def _add_temp_data(self, doc_string_data, previous_elements_paths):
         """* Adds collected data to temporary data collector from where data will be collected
@@ -283,36 +616,22 @@ class DocStringParser(object):
             'type': None,
             'attributes': {},
         }
-        # get description and tag strings
-        tag_strings = []
-        position_end = 0
-        position_start = 0
-        # while search position is less than doc string length
-        while position_end < len(doc_string[2]):
-            match_inst = self._tag_regex_obj.search(doc_string[2], position_end)
-            if match_inst is None:
-                # end of doc string
-                position_end = len(doc_string[2])
-                tag_strings.append(doc_string[2][position_start:])
-            else:
-                # found tag
-                tag_strings.append(doc_string[2][position_start:match_inst.start()])
-                position_start = match_inst.start()
-                position_end = match_inst.end()
-                # if tag has no value and is last in doc string
-                if position_end >= len(doc_string[2]):
-                    tag_strings.append(doc_string[2][position_start:position_end])
-
-        # if tag_strings has only one element or less, then it's not a doc string (no tags in there)
-        if len(tag_strings) < 2:
+        text = doc_string[2]
+        # find every tag in one pass, tag value lasts until next tag
+        tag_match_insts = list(self._tag_regex_obj.finditer(text))
+        # if there are no tags in there, then it's not a doc string
+        if not tag_match_insts:
             return None
-        # first element of tag_strings is a description of an element
-        doc_string_data['description'] = tag_strings.pop(0).strip(' ').strip('\n').strip(' ')
+        tag_ends = [match_inst.start() for match_inst in tag_match_insts[1:]]
+        tag_ends.append(len(text))
+        # text before first tag is a description of an element
+        doc_string_data['description'] = text[:tag_match_insts[0].start()].strip(' ').strip(
+            '\n'
+        ).strip(' ')
         # indicates if doc string has element tag, it must have exactly one to be a valid doc string
         has_element_tag = False
 
-        for tag_string in tag_strings:
-            match_inst = self._tag_regex_obj.search(tag_string)
+        for match_inst, tag_end in zip(tag_match_insts, tag_ends):
             tag_name = match_inst.group('tag')
             # check if tag type is valid
             ## check if tag is an element tag, check also aliases
@@ -327,34 +646,30 @@ class DocStringParser(object):
                 has_element_tag = True
                 if self._tag_settings.get(tag_name) is not None:
                     doc_string_data['type'] = tag_name
-                elif self._tag_alias_map.get(tag_name) is not None:
+                else:
                     doc_string_data['type'] = self._tag_alias_map.get(tag_name)
                 # first word after tag name is an element name
-                element_name, alias_name = self._get_element_name(tag_string)
+                element_name, alias_name = self._get_element_name(
+                    text[match_inst.start():tag_end]
+                )
                 doc_string_data['name'] = element_name
                 doc_string_data['alias_name'] = alias_name
             ## check if tag is a property tag
             elif self.PROPERTY_TAGS.get(tag_name) is not None:
                 # get value of property from tag string
-                tag_type, value = self.PROPERTY_TAGS.get(tag_name)(
-                    tag_string[match_inst.end():]
-                )
+                tag_type, value = self.PROPERTY_TAGS[tag_name](text[match_inst.end():tag_end])
                 # special case if tag is param
                 if tag_type == 'param':
-                    if doc_string_data['attributes'].get('params') is None:
-                        doc_string_data['attributes']['params'] = []
-                    doc_string_data['attributes']['params'].append(value)
+                    doc_string_data['attributes'].setdefault('params', []).append(value)
                 # special case if tag is example
                 elif tag_type == 'example':
-                    if doc_string_data['attributes'].get('examples') is None:
-                        doc_string_data['attributes']['examples'] = []
-                    doc_string_data['attributes']['examples'].append(value)
+                    doc_string_data['attributes'].setdefault('examples', []).append(value)
                 else:
                     doc_string_data['attributes'][tag_type] = value
             ## tag type is invalid, raise exception if ignore invalid tags setting is not True
             elif not self.ignore_invalid_tags:
                 raise self.InvalidTagException(
-                    'Invalid tag "{}" in doc string: "{}".'.format(tag_name, doc_string[2])
+                    'Invalid tag "{}" in doc string: "{}".'.format(tag_name, text)
                 )
 
         if not has_element_tag:
@@ -378,54 +693,66 @@ class DocStringParser(object):
         except IndexError:
             raise self.TagValueException('No element name.')
         alias_name = None
-        name_regex = r'"(?P<alias>.+?)"'
-        match_inst = re.search(name_regex, tag_string, flags=re.DOTALL)
+        match_inst = _ALIAS_NAME_REGEX_OBJ.search(tag_string)
         if match_inst is not None:
             alias_name = match_inst.group('alias')
         if element_name == '':
             raise self.TagValueException('No element name.')
         return element_name, alias_name
 
-    def _get_doc_strings(self, path, encoding):
+    def _get_doc_strings_from_text(self, text):
+        """* Returns doc strings found in text of source file. Text is searched for doc string tags
+        in one pass, lines are only used to strip indentation of doc string and to get its line
+        numbers from offsets.
+        @method ._get_doc_strings_from_text
+        @param self
+        @param text {{unicode|str}} - Content of source file.
+        @private
+        @return {{list}} - List of tuples: *start line*, *end line*, *doc string text*.
+        """
         doc_strings = []
-        # in doc string opening and closing tags
-        in_tag = False
-        doc_string_text = ''
-        # line with whitespaces before doc string opening tag
-        doc_string_intendation = 0
-        with codecs.open(path, 'r', encoding) as f:
-            for line_number, line in enumerate(f.readlines(), start=1):
-                # if not in doc string opening and closing tags
-                if not in_tag:
-                    # find opening doc string tag with only whitespaces preceding
-                    match_inst = self._doc_string_open_whitespaces_regex_obj.search(line)
-                    if match_inst is not None:
-                        # if opening tag is found, get position of opening tag without whitespaces
-                        match_inst = self._doc_string_open_regex_obj.search(line)
-                        in_tag = True
-                        start_line = line_number
-                        doc_string_intendation = match_inst.start()
-                        doc_string_text += line[match_inst.end():].strip(' \t')
-                    continue
-                else:
-                    # find closing doc string tag
-                    match_inst = self._doc_string_close_regex_obj.search(line)
-                    if match_inst is not None:
-                        in_tag = False
-                        end_line = line_number
-                        text_line = line[:match_inst.start()]
-                        text_line = text_line[doc_string_intendation:]
-                        doc_string_text += text_line
-                        doc_strings.append((start_line, end_line, doc_string_text))
-                        doc_string_text = ''
-                    else:
-                        text_line = line
-                        text_line = text_line[doc_string_intendation:]
-                        if text_line == '':
-                            text_line = '\n'
-                        doc_string_text += text_line
-                        continue
-            f.close()
+        # offsets of line beginnings, line number of offset is found with bisect
+        if isinstance(text, unicode):
+            line_break_regex_obj = _UNICODE_LINE_BREAK_REGEX_OBJ
+        else:
+            line_break_regex_obj = _LINE_BREAK_REGEX_OBJ
+        line_starts = [0]
+        line_starts.extend(match_inst.end() for match_inst in line_break_regex_obj.finditer(text))
+        line_starts.append(len(text))
+        position = 0
+        while True:
+            open_match_inst = self._doc_string_open_regex_obj.search(text, position)
+            if open_match_inst is None:
+                break
+            start_line_index = bisect.bisect_right(line_starts, open_match_inst.start()) - 1
+            line_start = line_starts[start_line_index]
+            # next line, doc string can't be closed in the same line it was opened
+            position = line_starts[start_line_index + 1]
+            # only whitespaces can precede opening tag
+            if text[line_start:open_match_inst.start()].strip(_WHITESPACES) != '':
+                continue
+            close_match_inst = self._doc_string_close_regex_obj.search(text, position)
+            if close_match_inst is None:
+                break
+            end_line_index = bisect.bisect_right(line_starts, close_match_inst.start()) - 1
+            # line with whitespaces before doc string opening tag
+            doc_string_intendation = open_match_inst.start() - line_start
+            text_parts = [text[open_match_inst.end():position].strip(' \t')]
+            for line_index in range(start_line_index + 1, end_line_index):
+                line_end = line_starts[line_index + 1]
+                text_line = text[min(line_starts[line_index] + doc_string_intendation, line_end):
+                                 line_end]
+                if not text_line:
+                    text_line = '\n'
+                text_parts.append(text_line)
+            text_parts.append(text[
+                min(line_starts[end_line_index] + doc_string_intendation, close_match_inst.start()):
+                close_match_inst.start()
+            ])
+            doc_strings.append((
+                start_line_index + 1, end_line_index + 1, text[:0].join(text_parts)
+            ))
+            position = line_starts[end_line_index + 1]
         return doc_strings
 
     def clear_data(self):
@@ -434,32 +761,29 @@ class DocStringParser(object):
         @param self
         """
         self._temp_data = OrderedDict({})
-        self.data = OrderedDict({'properties': OrderedDict({})})
+        self.data = self._create_root_element()
+        self.namepath_index = {}
 
 
     def data_json(self):
-        return json.dumps(self.data)
+        return json.dumps(self.data, default=to_plain_data)
 
     def _get_element_reference_from_value(self, val):
         ref = None
-        ref_re_inst = re.search(r'^[{]#(?P<ref>.*?)[}]$', val)
+        ref_re_inst = _REFERENCE_REGEX_OBJ.search(val)
         if ref_re_inst is not None:
             ref = ref_re_inst.group('ref')
         return ref
 
     def _get_author_from_tag_string(self, tag_string):
-        re_inst = re.search(r'\s*?(?P<author>.*?)$', tag_string, flags=re.DOTALL)
+        re_inst = _AUTHOR_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             return 'author', re_inst.group('author').strip('\n').strip(' ')
         else:
             return 'author', ''
 
     def _get_return_from_tag_string(self, tag_string):
-        re_inst = re.search(
-            r'\s*?[{][{](?P<return_type>.*?)[}][}]\s-?[ ]?(?P<description>.*?)$',
-            tag_string,
-            flags=re.DOTALL
-        )
+        re_inst = _RETURN_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             ref = None
             if re_inst.group('return_type') is not None:
@@ -476,14 +800,7 @@ class DocStringParser(object):
             return 'return', None
 
     def _get_param_from_tag_string(self, tag_string):
-        re_inst = re.search(
-            r'\s*?(?P<name>\w+)' +
-            r'(?:(?:=(?P<default>[^.]+?))|(?:(?P<seq>[.]{3}))|(?:))' +
-            r'(?:\s[{][{](?P<type>.+?)[}][}])?' +
-            r'(?:\s-?\s?(?P<desc>.*?))$',
-            tag_string,
-            flags=re.DOTALL
-        )
+        re_inst = _PARAM_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             ref = None
             if re_inst.group('type') is not None:
@@ -503,11 +820,7 @@ class DocStringParser(object):
             raise self.TagValueException('Wrong data passed to param tag: "{}"'.format(tag_string))
 
     def _get_valtype_from_tag_string(self, tag_string):
-        re_inst = re.search(
-            r'\s*?[{][{](?P<valtype>.*?)(?:=(?P<default>.+?))?[}][}](?:\s-?\s?(?P<desc>.*?))$',
-            tag_string,
-            flags=re.DOTALL
-        )
+        re_inst = _VALTYPE_REGEX_OBJ.search(tag_string)
         val_brackets = '{' + re_inst.group('valtype') + '}'
         ref = self._get_element_reference_from_value(val_brackets)
         if re_inst is not None:
@@ -523,7 +836,7 @@ class DocStringParser(object):
             )
 
     def _get_inherits_from_tag_string(self, tag_string):
-        re_inst = re.search(r'\s*?[{][{](?P<inherits>.*?)[}][}](\s|$)', tag_string)
+        re_inst = _INHERITS_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             val_brackets = '{' + re_inst.group('inherits') + '}'
             ref = self._get_element_reference_from_value(val_brackets)
@@ -537,7 +850,7 @@ class DocStringParser(object):
             )
 
     def _get_access_from_tag_string(self, tag_string):
-        re_inst = re.search(r'\s*?(?P<access>.*?)(\s|$)', tag_string)
+        re_inst = _ACCESS_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             return 'access', re_inst.group('access')
         else:
@@ -546,26 +859,21 @@ class DocStringParser(object):
             )
 
     def _get_version_from_tag_string(self, tag_string):
-        re_inst = re.search(r'\s*?(?P<version>.*?)$', tag_string, flags=re.DOTALL)
+        re_inst = _VERSION_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             return 'version', re_inst.group('version').strip('\n').strip(' ')
         else:
             return 'version', None
 
     def _get_license_from_tag_string(self, tag_string):
-        re_inst = re.search(r'\s*?(?P<license>.*?)$', tag_string, flags=re.DOTALL)
+        re_inst = _LICENSE_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             return 'license', re_inst.group('license').strip('\n').strip(' ')
         else:
             return 'license', None
 
     def _get_example_from_tag_string(self, tag_string):
-        re_inst = re.search(
-            r'\s*?(?P<title>.+?)' +
-            r'(?:\s[#](?P<langid>\w+?))?\s[{][$](?P<code>.*?)[$][}](?:\s(?P<desc>.*?))$',
-            tag_string,
-            flags=re.DOTALL
-        )
+        re_inst = _EXAMPLE_REGEX_OBJ.search(tag_string)
         if re_inst is not None:
             return 'example', {
                 'code': re_inst.group('code'),
@@ -579,6 +887,78 @@ class DocStringParser(object):
             )
 
 
+# parser used by process from pool started in DocStringParser.parse_files
+_process_parser = None
+
+
+def _init_parser_process(
+    tag_settings, doc_string_regex, tag_regex, ignore_invalid_tags, max_file_size,
+    skip_binary_files
+):
+    global _process_parser
+    _process_parser = DocStringParser(
+        tag_settings, doc_string_regex, tag_regex, ignore_invalid_tags
+    )
+    _process_parser.max_file_size = max_file_size
+    _process_parser.skip_binary_files = skip_binary_files
+
+
+def _parse_file_records_in_process(job):
+    index, path = job
+    try:
+        return index, _process_parser._parse_file_records(path), None
+    except Exception as e:
+        return index, None, _pack_process_error(e)
+    finally:
+        # contents read in process are not shared with main process
+        file_contents.discard(path)
+
+
+def _pack_process_error(error):
+    # exceptions defined inside DocStringParser can't be pickled, so only name and args are passed
+    if getattr(DocStringParser, type(error).__name__, None) is type(error):
+        return type(error).__name__, error.args
+    return None, error
+
+
+def _unpack_process_error(packed_error):
+    name, error = packed_error
+    if name is None:
+        return error
+    return getattr(DocStringParser, name)(*error)
+
+
+def get_regex_literal_prefix(regex):
+    """* Returns ascii text that every match of regex starts with. It is used to quickly reject
+    files that can't contain doc strings.
+    @function jscribe.core.docstringparser.get_regex_literal_prefix
+    @param regex {{str}}
+    @return {{str}} - Literal prefix, empty if regex doesn't start with literal characters or if it
+        ignores case.
+    """
+    parsed_regex = sre_parse.parse(regex)
+    if parsed_regex.pattern.flags & sre_constants.SRE_FLAG_IGNORECASE:
+        return ''
+    prefix = []
+    for opcode, value in parsed_regex:
+        if opcode == sre_constants.LITERAL:
+            code = value
+        elif (
+            opcode == sre_constants.IN and len(value) == 1 and
+            value[0][0] == sre_constants.LITERAL
+        ):
+            # one character class, like [*]
+            code = value[0][1]
+        elif opcode in _ZERO_WIDTH_OPCODES:
+            continue
+        else:
+            break
+        if code >= 128:
+            break
+        prefix.append(chr(code))
+    return ''.join(prefix)
+
+
 def get_tag_type_property(tag_settings, tag_type, property_name):
     """* Gets tag property from settings.
     @function jscribe.core.docstringparser.get_tag_type_property
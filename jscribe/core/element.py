@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Compact representation of collected documentation data.
+
+Every record here can be read and modified like a dictionary, so generators and templates work
+with it the same way as with data made of dictionaries.
+@module jscribe.core.element
+@author Rafał Łużyński
+"""
+
+from collections import OrderedDict
+
+
+class Record(object):
+    """* Base class of compact records. Values of fields listed in
+    {#jscribe.core.element.Record.FIELDS} are kept in slots, values under other keys are kept in
+    dictionary that is created only when first such value is set.
+    @class jscribe.core.element.Record
+    """
+    __slots__ = ('_extra', )
+
+    """* Names of fields kept in slots.
+    @attribute .FIELDS
+    @valtype {{tuple}}
+    """
+    FIELDS = ()
+
+    """* Map of field names and record classes that dictionary values of these fields are
+    converted to.
+    @attribute .FIELD_RECORDS
+    @valtype {{dict}}
+    """
+    FIELD_RECORDS = {}
+
+    def __init__(self, **values):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param values {{dict}} - Initial values.
+        """
+        self._extra = None
+        for key, value in values.iteritems():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, values):
+        """* Creates record from dictionary, dictionaries under fields from
+        {#jscribe.core.element.Record.FIELD_RECORDS} are converted to records too.
+        @method .from_dict
+        @param cls
+        @param values {{dict}}
+        @return {{#jscribe.core.element.Record}}
+        """
+        record = cls()
+        for key, value in values.iteritems():
+            record_class = cls.FIELD_RECORDS.get(key)
+            if record_class is not None and isinstance(value, dict):
+                value = record_class.from_dict(value)
+            record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        keys = [key for key in self.FIELDS if hasattr(self, key)]
+        if self._extra is not None:
+            keys.extend(self._extra.keys())
+        return keys
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def to_dict(self):
+        """* Returns data of record as dictionary, records in values are converted too.
+        @method .to_dict
+        @param self
+        @return {{dict}}
+        """
+        return dict((key, to_plain_data(value)) for key, value in self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, repr(self.to_dict()))
+
+
+class TypeRef(Record):
+    """* Type of param or return value.
+    @class jscribe.core.element.TypeRef
+    @inherits {{#jscribe.core.element.Record}}
+    """
+    __slots__ = ('type', 'ref', 'ref_html')
+    FIELDS = __slots__
+
+
+class Param(Record):
+    """* Param of callable element.
+    @class jscribe.core.element.Param
+    @inherits {{#jscribe.core.element.Record}}
+    """
+    __slots__ = ('name', 'default', 'is_sequenced', 'type', 'description', 'description_html')
+    FIELDS = __slots__
+    FIELD_RECORDS = {'type': TypeRef}
+
+
+class Return(Record):
+    """* Return value of callable element.
+    @class jscribe.core.element.Return
+    @inherits {{#jscribe.core.element.Record}}
+    """
+    __slots__ = ('type', 'description', 'description_html')
+    FIELDS = __slots__
+    FIELD_RECORDS = {'type': TypeRef}
+
+
+class Valtype(Record):
+    """* Type of element value.
+    @class jscribe.core.element.Valtype
+    @inherits {{#jscribe.core.element.Record}}
+    """
+    __slots__ = ('valtype', 'ref', 'default', 'description', 'description_html', 'ref_html')
+    FIELDS = __slots__
+
+
+class _EmptyProperties(OrderedDict):
+    # shared by all elements without children, so it must not be modified
+
+    def __setitem__(self, key, value, *args, **kwargs):
+        raise TypeError('Use Element.add_child to add children to element.')
+
+    def __delitem__(self, key, *args, **kwargs):
+        raise KeyError(key)
+
+
+_EMPTY_PROPERTIES = _EmptyProperties()
+
+
+class Element(Record):
+    """* Documented element (or element that is only a part of namepath of documented element).
+
+    Children of element are available under `properties` key, like in data made of dictionaries,
+    but mapping for them is created only when first child is added.
+    @class jscribe.core.element.Element
+    @inherits {{#jscribe.core.element.Record}}
+    """
+
+    """* Fields of element. First fields are collected from doc strings, rest are set by generators
+    for templates.
+    @attribute .FIELDS
+    @valtype {{tuple}}
+    """
+    FIELDS = (
+        'name', 'type', 'startline', 'endline', 'filepath', 'description', 'alias_name',
+        'attributes',
+        'namepath', 'type_name', 'type_title', 'source_visible', 'is_callable', 'is_separate',
+        'description_html', 'doc_element_path', 'doc_element_id', 'sourcepath',
+    )
+    __slots__ = FIELDS + ('_properties', )
+
+    def __init__(self, **values):
+        self._properties = None
+        super(Element, self).__init__(**values)
+
+    def __getitem__(self, key):
+        if key == 'properties':
+            if self._properties is None:
+                return _EMPTY_PROPERTIES
+            return self._properties
+        return super(Element, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if key == 'properties':
+            self._properties = value
+        else:
+            super(Element, self).__setitem__(key, value)
+
+    def __contains__(self, key):
+        return key == 'properties' or super(Element, self).__contains__(key)
+
+    @property
+    def properties(self):
+        """* Children of element.
+        @property .properties
+        @valtype {{OrderedDict}}
+        """
+        return self['properties']
+
+    def keys(self):
+        keys = super(Element, self).keys()
+        keys.append('properties')
+        return keys
+
+    def add_child(self, name, element):
+        """* Adds child element.
+        @method .add_child
+        @param self
+        @param name {{str}}
+        @param element {{#jscribe.core.element.Element}}
+        """
+        if self._properties is None:
+            self._properties = OrderedDict()
+        self._properties[name] = element
+
+    def update_from_record(self, record):
+        """* Sets values from doc string data collected by
+        {#jscribe.core.docstringparser.DocStringParser}. Params, return and valtype attributes are
+        converted to records.
+        @method .update_from_record
+        @param self
+        @param record {{dict}}
+        """
+        for key, value in record.iteritems():
+            if key == 'attributes':
+                value = make_attributes(value)
+            self[key] = value
+
+    def to_dict(self):
+        data = super(Element, self).to_dict()
+        data['properties'] = OrderedDict(
+            (name, to_plain_data(element)) for name, element in self['properties'].iteritems()
+        )
+        return data
+
+
+def make_attributes(attributes):
+    """* Returns element attributes where params, return and valtype are converted to records.
+    @function jscribe.core.element.make_attributes
+    @param attributes {{dict}} - Attributes collected from doc string.
+    @return {{dict}}
+    """
+    attributes = dict(attributes)
+    if attributes.get('params') is not None:
+        attributes['params'] = [Param.from_dict(param) for param in attributes['params']]
+    if attributes.get('return') is not None:
+        attributes['return'] = Return.from_dict(attributes['return'])
+    if attributes.get('valtype') is not None:
+        attributes['valtype'] = Valtype.from_dict(attributes['valtype'])
+    return attributes
+
+
+def to_plain_data(value):
+    """* Returns value with every record in it converted to dictionary.
+    @function jscribe.core.element.to_plain_data
+    @param value {{object}}
+    @return {{object}}
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, OrderedDict):
+        return OrderedDict((key, to_plain_data(val)) for key, val in value.iteritems())
+    if isinstance(value, dict):
+        return dict((key, to_plain_data(val)) for key, val in value.iteritems())
+    if isinstance(value, list):
+        return [to_plain_data(val) for val in value]
+    return value
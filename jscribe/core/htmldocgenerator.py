@@ -6,9 +6,11 @@
 @author Rafał Łużyński
 """
 
+import copy
 import importlib
 
 from jscribe.conf import settings
+from jscribe.core.sourcehighlighter import SourceHighlighter
 
 
 class HTMLDocumentationGenerator(object):
@@ -30,23 +32,35 @@ class HTMLDocumentationGenerator(object):
         self.tag_settings = tag_settings
         self._template_settings = {}
         self._template_generator = None
+        """* Highlighter of source files started before documentation data was collected, passed
+        to template generator.
+        @valtype {{#jscribe.core.sourcehighlighter.SourceHighlighter}}
+        @attribute .source_highlighter
+        """
+        self.source_highlighter = None
         self._load_template_settings()
 
     def _load_template_settings(self):
-        # load template settings from python module in template
-        template_settings = importlib.import_module(
-            'jscribe.templates.{}.{}.settings'.format(settings.GENERATOR, settings.TEMPLATE)
-        )
-        # first update default element templates with user element templates
-        template_settings.TEMPLATE_SETTINGS['ELEMENT_TEMPLATES'].update(
-            settings.TEMPLATE_SETTINGS.get('ELEMENT_TEMPLATES', {})
+        self._template_settings, self._template_generator = load_template_settings()
+
+    @classmethod
+    def create_source_highlighter(cls, processes):
+        """* Creates highlighter of source files, if template generator supports it (has
+        `get_source_highlight_function` class method that returns function and its arguments).
+        @method .create_source_highlighter
+        @param cls
+        @param processes {{int}} - Number of processes.
+        @return {{#jscribe.core.sourcehighlighter.SourceHighlighter}} - `None` if not supported.
+        """
+        template_settings, template_generator = load_template_settings()
+        template_generator_class = import_template_generator(template_generator)
+        get_source_highlight_function = getattr(
+            template_generator_class, 'get_source_highlight_function', None
         )
-        settings.TEMPLATE_SETTINGS['ELEMENT_TEMPLATES'] = template_settings.TEMPLATE_SETTINGS[
-            'ELEMENT_TEMPLATES'
-        ]
-        template_settings.TEMPLATE_SETTINGS.update(settings.TEMPLATE_SETTINGS)
-        self._template_settings = template_settings.TEMPLATE_SETTINGS
-        self._template_generator = template_settings.GENERATOR
+        if get_source_highlight_function is None:
+            return None
+        function, args = get_source_highlight_function(template_settings)
+        return SourceHighlighter(function, args, processes, settings.HIGHLIGHT_CACHE_SIZE)
 
     def generate_documentation(self):
         """* Generates documentation in HTML format using generator from template settings
@@ -54,20 +68,60 @@ class HTMLDocumentationGenerator(object):
         @method .generate_documentation
         @param self
         """
-        # import template generator
-        module = importlib.import_module(
-            self._template_generator[0]
-        )
-        # get class attr from attr path, i.e. foo.bar.HTMLGenerator where foo and bar are also
-        # classes
-        current_attr = module
-        for attr in self._template_generator[1].split('.'):
-            current_attr = getattr(
-                current_attr,
-                attr
-            )
-        template_generator_class = current_attr
+        template_generator = self.create_template_generator()
+        template_generator.generate_documentation()
+
+    def create_template_generator(self):
+        """* Creates instance of generator from template settings.
+        @method .create_template_generator
+        @param self
+        @return {{#jscribe.core.generator.Generator}}
+        """
+        template_generator_class = import_template_generator(self._template_generator)
         template_generator = template_generator_class(
             self._template_settings, self.doc_data, self.tag_settings, self.filepaths
         )
-        template_generator.generate_documentation()
+        template_generator.source_highlighter = self.source_highlighter
+        return template_generator
+
+
+def load_template_settings():
+    """* Loads settings of template from settings module in template package, user template
+    settings override them. Settings of module are copied, so settings removed by user (i.e. in
+    watch mode) are not left from previous load.
+    @function jscribe.core.htmldocgenerator.load_template_settings
+    @return {{tuple}} - Template settings and path to template generator (module path, class).
+    """
+    # load template settings from python module in template
+    template_settings = importlib.import_module(
+        'jscribe.templates.{}.{}.settings'.format(settings.GENERATOR, settings.TEMPLATE)
+    )
+    merged_settings = copy.deepcopy(template_settings.TEMPLATE_SETTINGS)
+    # first update default element templates with user element templates
+    merged_settings['ELEMENT_TEMPLATES'].update(
+        settings.TEMPLATE_SETTINGS.get('ELEMENT_TEMPLATES', {})
+    )
+    settings.TEMPLATE_SETTINGS['ELEMENT_TEMPLATES'] = merged_settings['ELEMENT_TEMPLATES']
+    merged_settings.update(settings.TEMPLATE_SETTINGS)
+    return merged_settings, template_settings.GENERATOR
+
+
+def import_template_generator(template_generator):
+    """* Imports class of template generator.
+    @function jscribe.core.htmldocgenerator.import_template_generator
+    @param template_generator {{tuple}} - Module path and class path.
+    @return {{class}}
+    """
+    # import template generator
+    module = importlib.import_module(
+        template_generator[0]
+    )
+    # get class attr from attr path, i.e. foo.bar.HTMLGenerator where foo and bar are also
+    # classes
+    current_attr = module
+    for attr in template_generator[1].split('.'):
+        current_attr = getattr(
+            current_attr,
+            attr
+        )
+    return current_attr
@@ -6,29 +6,81 @@
 @author Rafał Łużyński
 """
 
-from jinja2 import Environment, PackageLoader
+import os
+import re
+import shutil
+import hashlib
+
+from jinja2 import (
+    Environment, PackageLoader, ModuleLoader, ChoiceLoader, FileSystemBytecodeCache,
+    __version__ as jinja2_version
+)
+
+from jscribe.utils.outputwriter import OutputWriter
+
+
+# name of directory with compiled templates: jinja version and hash of templates
+_COMPILED_TEMPLATES_DIR_REGEX_OBJ = re.compile(r'^[^-]+-[0-9a-f]{40}$')
 
 
 class JinjaTemplateRenderer(object):
     """* Jinja template renderer.
     Creates html files basing on templates with Jinja2 syntax.
+
+    Templates are compiled from source for every renderer, unless bytecode cache or precompiled
+    templates are used. Bytecode cache is checked against source of template, so it can be shared
+    by every process and run. Templates are precompiled to python modules in subdirectory named
+    after hash of templates sources, so modules compiled from old templates are never loaded,
+    subdirectories of old templates are removed. If both are used, then precompiled templates are
+    loaded and bytecode cache is used only for templates that couldn't be precompiled.
     @class jscribe.core.jinjatemplaterenderer.JinjaTemplateRenderer
     """
-    def __init__(self, template_package, global_context):
+    def __init__(
+        self, template_package, global_context, bytecode_cache_path=None,
+        compiled_templates_path=None
+    ):
         """* HTML format generator.
         @method .__init__
         @param self
         @param template_package {{str}} - Python path to template package
         @param global_context {{dict}} - Dictionary with values that will be available everywhere
             in templates.
+        @param bytecode_cache_path=None {{str}} - Directory where bytecode of compiled templates
+            is cached.
+        @param compiled_templates_path=None {{str}} - Directory where templates are precompiled
+            to python modules, templates are loaded from these modules.
         @constructor
         """
+        self.source_loader = PackageLoader(template_package, 'templates')
+        bytecode_cache = None
+        if bytecode_cache_path is not None:
+            if not os.path.isdir(bytecode_cache_path):
+                os.makedirs(bytecode_cache_path)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_path)
         # setup jinja template engine
         self.env = Environment(
-            loader=PackageLoader(template_package, 'templates'),
-            extensions=['jinja2.ext.i18n']
+            loader=self.source_loader,
+            extensions=['jinja2.ext.i18n'],
+            bytecode_cache=bytecode_cache
         )
+        if compiled_templates_path is not None:
+            # templates that can't be compiled are loaded from source
+            self.env.loader = ChoiceLoader([
+                ModuleLoader(self.compile_templates(compiled_templates_path)), self.source_loader
+            ])
         self.env.globals = global_context
+        """* Hashes of files written by this renderer, if set then file with the same content as
+        the last time is not written again.
+        @valtype {{dict|None}}
+        @attribute .written_hashes
+        """
+        self.written_hashes = None
+        self.skipped_files = 0
+        """* Writer of rendered files, it records written and unchanged files.
+        @valtype {{#jscribe.utils.outputwriter.OutputWriter}}
+        @attribute .output_writer
+        """
+        self.output_writer = OutputWriter()
 
     def update_globals(self, new_globals):
         """* Update template globals dictionary with new dict.
@@ -39,7 +91,8 @@ class JinjaTemplateRenderer(object):
         self.env.globals.update(new_globals)
 
     def render_to_file(self, template, context, filepath, encoding):
-        """* Creates new html file with given parameteres.
+        """* Creates new html file with given parameteres. File that already has the same content
+        is not written again.
         @method .render_to_file
         @param self
         @param template {{str}} - template file in choosen template package
@@ -47,7 +100,67 @@ class JinjaTemplateRenderer(object):
         @param filepath {{str}} - Where new file will be created
         @param encoding {{str}} - Encoding in which new file will be encoded
         """
-        self.env.get_template(template).stream(context).dump(filepath, encoding=encoding)
+        content = self.env.get_template(template).render(context).encode(encoding)
+        content_hash = None
+        if self.written_hashes is not None:
+            content_hash = hashlib.sha1(content).hexdigest()
+            # file doesn't have to be read to know it's the same
+            if self.written_hashes.get(filepath) == content_hash and os.path.isfile(filepath):
+                self.skipped_files += 1
+                self.output_writer.mark_unchanged(filepath)
+                return
+        if not self.output_writer.write(filepath, content):
+            self.skipped_files += 1
+        if content_hash is not None:
+            self.written_hashes[filepath] = content_hash
+
+    def load_templates(self):
+        """* Loads and compiles every template in template package, so rendering doesn't wait for
+        it later.
+        @method .load_templates
+        @param self
+        """
+        for name in self.source_loader.list_templates():
+            self.env.get_template(name)
+
+    def compile_templates(self, path):
+        """* Compiles every template in template package to python modules, unless they are
+        already compiled from the same sources. Modules compiled from other templates are removed.
+        @method .compile_templates
+        @param self
+        @param path {{str}} - Directory with compiled templates.
+        @return {{str}} - Directory with modules compiled from current templates.
+        """
+        target = os.path.join(path, '{}-{}'.format(jinja2_version, self.get_templates_hash()))
+        if os.path.isdir(target):
+            return target
+        temp_target = '{}.{}.tmp'.format(target, os.getpid())
+        self.env.compile_templates(temp_target, zip=None)
+        try:
+            os.rename(temp_target, target)
+        except OSError:
+            # compiled by other process in the meantime
+            shutil.rmtree(temp_target)
+        # modules compiled from old templates or by other jinja version won't be loaded again
+        for name in os.listdir(path):
+            dirpath = os.path.join(path, name)
+            if dirpath != target and _COMPILED_TEMPLATES_DIR_REGEX_OBJ.match(name):
+                shutil.rmtree(dirpath, ignore_errors=True)
+        return target
+
+    def get_templates_hash(self):
+        """* Returns hash of sources of every template in template package, it changes whenever
+        any template changes.
+        @method .get_templates_hash
+        @param self
+        @return {{str}}
+        """
+        templates_hash = hashlib.sha1()
+        for name in self.source_loader.list_templates():
+            source = self.source_loader.get_source(self.env, name)[0]
+            templates_hash.update(name.encode('utf-8'))
+            templates_hash.update(source.encode('utf-8'))
+        return templates_hash.hexdigest()
 
     def render(self, template, context):
         """* Returns rendered template.
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""*
+@module jscribe.core.pagedependencies
+@author Rafał Łużyński
+"""
+
+import os
+import json
+import hashlib
+import logging
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from jscribe.utils.outputwriter import write_file
+
+
+class PageDependencies(object):
+    """* Persistent record of inputs that every generated page depends on.
+
+    Generator describes inputs of every page as a dictionary of input names and hashes (see
+    {#jscribe.core.pagedependencies.get_data_hash}), i.e. hash of elements shown on the page,
+    hash of urls of referenced elements or hash of templates. Page that has the same inputs as in
+    the last run and still exists doesn't have to be rendered again. Pages generated in the last
+    run, but not in this one (i.e. pages of removed elements) are stale and can be removed.
+    Whole record is dropped if output path is different than the one that record was created for.
+    Without path of record file, inputs are kept only in memory, so the same record can be used for
+    every run of long-running process (i.e. {#jscribe.core.watcher.DocumentationWatcher}).
+
+    Example usage:
+
+    {$python
+    dependencies = PageDependencies('.jscribepages', 'docs/')
+    inputs = {'elements': get_data_hash(elements), 'templates': templates_hash}
+    if dependencies.is_changed('foo.html', inputs):
+        render_page('docs/foo.html')
+    dependencies.set('foo.html', inputs)
+    dependencies.remove_stale_pages()
+    dependencies.save()
+    $}
+    @class jscribe.core.pagedependencies.PageDependencies
+    """
+
+    """* Version of file format. Increase it whenever format of stored inputs changes.
+    @attribute .VERSION
+    @valtype {{int}}
+    """
+    VERSION = 1
+
+    def __init__(self, path, output_path):
+        """* Initialization. Loads record file if it exists.
+        @method .__init__
+        @constructor
+        @param self
+        @param path {{str|None}} - Path to record file, if `None` then record is kept only in
+            memory.
+        @param output_path {{str}} - Directory where pages are generated, page paths are relative
+            to it.
+        """
+        self.path = path
+        self.output_path = output_path
+        self._pages = {}
+        self._used_pages = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """* Loads inputs of pages from record file. Invalid or outdated file is ignored.
+        @method ._load
+        @param self
+        @private
+        """
+        if self.path is None or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                record_data = pickle.load(f)
+                f.close()
+        except Exception as e:
+            logging.info('Ignoring invalid page dependencies "{}": {}'.format(self.path, e))
+            return
+        if record_data.get('version') != self.VERSION or \
+                record_data.get('output_path') != self.output_path:
+            return
+        self._pages = record_data.get('pages', {})
+
+    def is_changed(self, page_path, inputs):
+        """* Checks if page has to be generated again.
+        @method .is_changed
+        @param self
+        @param page_path {{str}} - Path of page relative to output path.
+        @param inputs {{dict}} - Current inputs of page, names of inputs and their hashes.
+        @return {{boolean}} - `True` if any input changed since last run or page file is missing.
+        """
+        if self._pages.get(page_path) != inputs or \
+                not os.path.isfile(os.path.join(self.output_path, page_path)):
+            self.misses += 1
+            return True
+        self.hits += 1
+        return False
+
+    def get_changed_inputs(self, page_path, inputs):
+        """* Returns names of inputs that changed since last run.
+        @method .get_changed_inputs
+        @param self
+        @param page_path {{str}} - Path of page relative to output path.
+        @param inputs {{dict}} - Current inputs of page.
+        @return {{list}} - Sorted names of inputs, every input if page was not generated before.
+        """
+        last_inputs = self._pages.get(page_path, {})
+        return sorted(name for name, value in inputs.iteritems() if last_inputs.get(name) != value)
+
+    def set(self, page_path, inputs):
+        """* Stores inputs of page generated in this run.
+        @method .set
+        @param self
+        @param page_path {{str}} - Path of page relative to output path.
+        @param inputs {{dict}} - Names of inputs and their hashes.
+        """
+        self._used_pages[page_path] = inputs
+
+    def remove_stale_pages(self):
+        """* Removes pages that were generated in the last run, but not in this one.
+        @method .remove_stale_pages
+        @param self
+        @return {{list}} - Paths of removed pages, relative to output path.
+        """
+        removed_pages = []
+        for page_path in sorted(set(self._pages) - set(self._used_pages)):
+            filepath = os.path.join(self.output_path, page_path)
+            if os.path.isfile(filepath):
+                os.remove(filepath)
+                removed_pages.append(page_path)
+        return removed_pages
+
+    def save(self):
+        """* Saves inputs of pages generated in this run to file, if path of record file is set.
+        Saved inputs become inputs of the last run, so record can be used for next run.
+        @method .save
+        @param self
+        """
+        self._pages = self._used_pages
+        self._used_pages = {}
+        if self.path is None:
+            return
+        record_data = {
+            'version': self.VERSION,
+            'output_path': self.output_path,
+            'pages': self._pages,
+        }
+        write_file(self.path, pickle.dumps(record_data, pickle.HIGHEST_PROTOCOL))
+
+
+def get_data_hash(data):
+    """* Returns hash of data that can be dumped to json. Keys of dictionaries are sorted, so
+    order of items matters only in lists.
+    @function jscribe.core.pagedependencies.get_data_hash
+    @param data {{object}} - Data to hash.
+    @return {{str}}
+    """
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=repr).encode('utf-8')
+    ).hexdigest()
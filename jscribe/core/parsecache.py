@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""*
+@module jscribe.core.parsecache
+@author Rafał Łużyński
+"""
+
+import os
+import hashlib
+import logging
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from jscribe.utils.outputwriter import write_file
+
+
+class ParseCache(object):
+    """* Persistent cache of doc string records extracted from source files.
+
+    Records are stored under hash of file content, so unchanged files don't have to be parsed
+    again. Hash of last content of every file is stored under its path too, so files that are
+    known to be unchanged (see {#jscribe.core.docstringparser.DocStringParser.changed_filepaths})
+    don't have to be even read. Such files are listed with git, against commit that was checked
+    out when cache was saved (see {#jscribe.core.parsecache.ParseCache.revisions}). Whole cache is
+    dropped if settings hash (see
+    {#jscribe.core.docstringparser.DocStringParser.get_settings_hash}) is different than the one
+    that cache was created with.
+
+    Example usage:
+
+    {$python
+    dsp = DocStringParser(tag_settings, doc_string_regex, tag_regex)
+    dsp.cache = ParseCache('.jscribecache', dsp.get_settings_hash())
+    for path in filepaths:
+        dsp.parse_file(path)
+    dsp.cache.save()
+    $}
+    @class jscribe.core.parsecache.ParseCache
+    """
+
+    """* Version of cache file format. Increase it whenever format of stored records changes.
+    @attribute .VERSION
+    @valtype {{int}}
+    """
+    VERSION = 3
+
+    def __init__(self, path, settings_hash):
+        """* Initialization. Loads cache file if it exists.
+        @method .__init__
+        @constructor
+        @param self
+        @param path {{str}} - Path to cache file.
+        @param settings_hash {{str}} - Hash of settings that have impact on parsing results.
+        """
+        self.path = path
+        self.settings_hash = settings_hash
+        self._records = {}
+        self._used_records = {}
+        self._paths = {}
+        self._used_paths = {}
+        self.hits = 0
+        self.misses = 0
+        """* Git commit checked out in every input path when cache was saved and paths of files
+        that differed from it, by input paths. Path hashes are valid only for these revisions.
+        @valtype {{dict}}
+        @attribute .revisions
+        """
+        self.revisions = {}
+        self._load()
+
+    def _load(self):
+        """* Loads records from cache file. Invalid or outdated cache file is ignored.
+        @method ._load
+        @param self
+        @private
+        """
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                cache_data = pickle.load(f)
+                f.close()
+        except Exception as e:
+            logging.info('Ignoring invalid parse cache "{}": {}'.format(self.path, e))
+            return
+        if cache_data.get('version') != self.VERSION or \
+                cache_data.get('settings_hash') != self.settings_hash:
+            return
+        self._records = cache_data.get('records', {})
+        self._paths = cache_data.get('paths', {})
+        self.revisions = cache_data.get('revisions', {})
+
+    def get(self, content_hash, default=None):
+        """* Returns cached doc string records for file content with given hash.
+        @method .get
+        @param self
+        @param content_hash {{str}}
+        @param default=None - Returned if there is no entry for given hash.
+        @return {{list|None}} - Cached doc string records.
+        """
+        pickled_records = self._records.get(content_hash)
+        if pickled_records is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._used_records[content_hash] = pickled_records
+        # records are kept pickled, so every caller gets its own copy that can be modified
+        return pickle.loads(pickled_records)
+
+    def set(self, content_hash, records):
+        """* Stores doc string records for file content with given hash.
+        @method .set
+        @param self
+        @param content_hash {{str}}
+        @param records {{list|None}}
+        """
+        pickled_records = pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+        self._records[content_hash] = pickled_records
+        self._used_records[content_hash] = pickled_records
+
+    def get_path_hash(self, path):
+        """* Returns hash of file content that was stored for given path.
+        @method .get_path_hash
+        @param self
+        @param path {{str}}
+        @return {{str|None}} - `None` if there is no entry for given path.
+        """
+        content_hash = self._paths.get(path)
+        if content_hash is not None:
+            self._used_paths[path] = content_hash
+        return content_hash
+
+    def set_path_hash(self, path, content_hash):
+        """* Stores hash of file content for given path.
+        @method .set_path_hash
+        @param self
+        @param path {{str}}
+        @param content_hash {{str}}
+        """
+        self._used_paths[path] = content_hash
+
+    def save(self):
+        """* Saves cache to file. Only records used in this run are saved, so entries of removed
+        or changed files don't pile up.
+        @method .save
+        @param self
+        """
+        cache_data = {
+            'version': self.VERSION,
+            'settings_hash': self.settings_hash,
+            'records': self._used_records,
+            'paths': self._used_paths,
+            'revisions': self.revisions,
+        }
+        write_file(self.path, pickle.dumps(cache_data, pickle.HIGHEST_PROTOCOL))
+
+
+def get_content_hash(content):
+    """* Returns hash of file content.
+    @function jscribe.core.parsecache.get_content_hash
+    @param content {{str}} - Raw file content.
+    @return {{str}}
+    """
+    return hashlib.sha1(content).hexdigest()
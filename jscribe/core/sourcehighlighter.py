@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""*
+@module jscribe.core.sourcehighlighter
+@author Rafał Łużyński
+"""
+
+import logging
+import multiprocessing
+
+from jscribe.utils.highlightcache import highlight_cache
+
+
+class SourceHighlighter(object):
+    """* Highlights source files in a pool of processes while documentation data is still being
+    collected and converted.
+
+    Source pages depend only on content of source file (and navigation that is rendered on every
+    page), so highlighting, which takes most of the time, can start as soon as file is known to
+    be documented. Generator takes highlighted sources with
+    {#jscribe.core.sourcehighlighter.SourceHighlighter.get_results} just before pages are rendered,
+    files that were not highlighted (i.e. because of errors) are highlighted by generator.
+
+    Example usage:
+
+    {$python
+    highlighter = SourceHighlighter(highlight_source_file, ('javascript', True), 4)
+    dsp.documented_file_callback = highlighter.submit
+    dsp.parse_files(paths)
+    highlighted_sources = highlighter.get_results()
+    $}
+    @class jscribe.core.sourcehighlighter.SourceHighlighter
+    """
+
+    def __init__(self, function, args, processes, max_size=None):
+        """* Initialization. Pool of processes is started when first file is submitted.
+        @method .__init__
+        @constructor
+        @param self
+        @param function {{function}} - Function that takes path of source file and `args` and
+            returns highlighted source, it must be importable from module.
+        @param args {{tuple}} - Additional arguments of function, i.e. language.
+        @param processes {{int}} - Number of processes.
+        @param max_size=None {{int}} - Maximum memory taken by highlighted sources in bytes,
+            highlighted sources are kept in memory until generator takes them, so sources that
+            arrive after this limit is reached are dropped and files submitted after it are not
+            highlighted at all.
+        """
+        self.function = function
+        self.args = args
+        self.processes = processes
+        self.max_size = max_size
+        self.size = 0
+        self._pool = None
+        self._submitted_paths = set()
+        # results are collected by thread of pool, as soon as they arrive
+        self._highlighted_sources = {}
+        self._highlighted = []
+        self._errors = {}
+
+    def submit(self, path):
+        """* Starts highlighting of source file in one of processes.
+        @method .submit
+        @param self
+        @param path {{str}} - Path to source file.
+        """
+        if path in self._submitted_paths or self._is_full():
+            return
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.processes, _init_highlighter_process)
+        self._submitted_paths.add(path)
+        self._pool.apply_async(
+            _highlight_in_process, (self.function, path, self.args), callback=self._add_result
+        )
+
+    def _is_full(self):
+        return self.max_size is not None and self.size >= self.max_size
+
+    def _add_result(self, result):
+        # called in thread of pool, only this method changes size
+        path, highlighted_source, highlighted, error = result
+        self._highlighted.append(highlighted)
+        if error is not None:
+            self._errors[path] = error
+            return
+        size = len(highlighted_source)
+        if self.max_size is not None and self.size + size > self.max_size:
+            # generator highlights this file
+            self.size = self.max_size
+            return
+        self.size += size
+        self._highlighted_sources[path] = highlighted_source
+
+    def get_results(self):
+        """* Waits for every submitted file and stops pool of processes.
+        @method .get_results
+        @param self
+        @return {{dict}} - Highlighted sources by paths of source files.
+        """
+        if self._pool is None:
+            return {}
+        self._pool.close()
+        try:
+            self._pool.join()
+        except:
+            self._pool.terminate()
+            self._pool.join()
+            raise
+        finally:
+            self._pool = None
+        # code highlighted in processes is cached by main process
+        for highlighted in self._highlighted:
+            highlight_cache.add_new_entries(highlighted)
+        for path, error in self._errors.iteritems():
+            # generator highlights this file again and reports error
+            logging.info(u'Source file "{}" not highlighted: {}'.format(path, error))
+        highlighted_sources = self._highlighted_sources
+        self._clear()
+        return highlighted_sources
+
+    def terminate(self):
+        """* Stops pool of processes without waiting for submitted files.
+        @method .terminate
+        @param self
+        """
+        if self._pool is None:
+            return
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        self._clear()
+
+    def _clear(self):
+        self.size = 0
+        self._submitted_paths = set()
+        self._highlighted_sources = {}
+        self._highlighted = []
+        self._errors = {}
+
+
+def _init_highlighter_process():
+    highlight_cache.record_new_entries()
+
+
+def _highlight_in_process(function, path, args):
+    try:
+        highlighted_source = function(path, *args)
+    except Exception as e:
+        # exceptions can't be always pickled
+        return (
+            path, None, highlight_cache.take_new_entries(), u'{}: {}'.format(type(e).__name__, e)
+        )
+    return path, highlighted_source, highlight_cache.take_new_entries(), None
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Watch mode, documentation is generated again whenever source files change.
+@module jscribe.core.watcher
+@author Rafał Łużyński
+"""
+
+import time
+import logging
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from jscribe.conf import settings
+from jscribe.core.docgenerator import DocumentationGenerator
+from jscribe.core.pagedependencies import PageDependencies
+from jscribe.utils.filecontent import file_contents, get_file_signature
+
+
+class DocumentationWatcher(DocumentationGenerator):
+    """* Documentation generator that keeps doc string records of every source file in memory and
+    polls source files for changes. When files are changed, added or removed, only these files
+    are parsed again, documentation data is assembled from records kept in memory and only pages
+    with changed inputs are rendered again (see
+    {#jscribe.core.pagedependencies.PageDependencies}, it's kept in memory if
+    `PAGE_DEPENDENCIES_PATH` is not set). Source pages of changed files are written first.
+
+    When settings file or tag settings file (if it's json file) changes, then settings are loaded
+    again and every file is parsed again. Update that failed (i.e. because of invalid doc string)
+    is not repeated until settings or source files change again.
+
+    Example usage:
+
+    {$python
+    watcher = DocumentationWatcher('settings.json')
+    watcher.watch()
+    $}
+    @class jscribe.core.watcher.DocumentationWatcher
+    @inherits {{#jscribe.core.docgenerator.DocumentationGenerator}}
+    """
+
+    def __init__(self, settings_path, jobs=None, interval=1.0):
+        """* Initialization. Generates documentation for the first time.
+        @method .__init__
+        @constructor
+        @param self
+        @param settings_path {{str}} - Path to settings file (json).
+        @param jobs=None {{int}} - Number of processes used for parsing, overrides `JOBS` setting.
+        @param interval=1.0 {{float}} - Seconds between checks for changes.
+        """
+        self.settings_path = settings_path
+        self.jobs = jobs
+        self.interval = interval
+        # source file path: signature, pickled records
+        self._files = {}
+        self._changed_filepaths = []
+        self._removed_files = False
+        self._settings_signatures = {}
+        # settings and source files signatures of last failed update
+        self._failed_signatures = None
+        self._file_signatures = None
+        self._written_hashes = {}
+        self._page_dependencies = None
+        self.builds = 0
+        self.parsed_files = 0
+        self.skipped_pages = 0
+        super(DocumentationWatcher, self).__init__(settings_path, jobs=jobs)
+        self._settings_signatures = self._get_settings_signatures()
+
+    def watch(self):
+        """* Generates documentation whenever something changes, until interrupted with Ctrl+C.
+        @method .watch
+        @param self
+        """
+        self.generate_documentation()
+        logging.info('Watching for changes, press Ctrl+C to stop.')
+        try:
+            while True:
+                time.sleep(self.interval)
+                try:
+                    if self.update():
+                        self.generate_documentation()
+                except Exception as e:
+                    # errors in edited files shouldn't stop watching, they are fixed in next edit
+                    logging.error(u'Documentation not generated: {}'.format(e))
+        except KeyboardInterrupt:
+            logging.info('Stopped watching.')
+
+    def update(self):
+        """* Checks if settings or source files changed and updates documentation data.
+        @method .update
+        @param self
+        @return {{boolean}} - `True` if something changed, then documentation must be generated
+            again.
+        """
+        settings_signatures = self._get_settings_signatures()
+        if self._failed_signatures is not None and \
+                self._failed_signatures[0] == settings_signatures:
+            # settings weren't loaded or files are the same, so it would fail again
+            failed_file_signatures = self._failed_signatures[1]
+            if failed_file_signatures is None or \
+                    failed_file_signatures == self._get_file_signatures(self._discover_files()):
+                return False
+        self._file_signatures = None
+        try:
+            changed = self._update(settings_signatures)
+        except:
+            self._failed_signatures = (settings_signatures, self._file_signatures)
+            raise
+        self._failed_signatures = None
+        return changed
+
+    def _update(self, settings_signatures):
+        """* Updates documentation data, settings are loaded again if they changed.
+        @method ._update
+        @param self
+        @param settings_signatures {{list}} - Current signatures of settings files.
+        @private
+        @return {{boolean}} - `True` if something changed.
+        """
+        if settings_signatures != self._settings_signatures:
+            logging.info('Settings changed, parsing every file again.')
+            self._files = {}
+            settings.reset()
+            settings.load(self.settings_path)
+            if self.jobs is not None:
+                settings.JOBS = self.jobs
+            self._load_tag_settings(settings.TAG_SETTINGS)
+            self._load_html_caches()
+            self._page_dependencies = None
+            self._get_doc_data()
+            # set after successful update, so failed one is repeated
+            self._settings_signatures = settings_signatures
+            return True
+        self._get_doc_data()
+        return bool(self._changed_filepaths) or self._removed_files
+
+    def _get_settings_signatures(self):
+        """* Returns signatures of settings file and tag settings file, if it's json file.
+        @method ._get_settings_signatures
+        @param self
+        @private
+        @return {{list}}
+        """
+        paths = [self.settings_path]
+        if settings.TAG_SETTINGS.split('.')[-1] == 'json':
+            paths.append(settings.TAG_SETTINGS)
+        return [get_file_signature(path) for path in paths]
+
+    def _get_doc_data(self):
+        """* Parses files that changed since last check and assembles documentation data from
+        records of every file.
+        @method ._get_doc_data
+        @param self
+        @private
+        """
+        self.discovered_filepaths = self._discover_files()
+        file_contents.max_size = settings.FILE_CONTENT_CACHE_SIZE
+        signatures = self._file_signatures = self._get_file_signatures(self.discovered_filepaths)
+        self._changed_filepaths = []
+        for path in self.discovered_filepaths:
+            if path not in signatures:
+                continue
+            cached = self._files.get(path)
+            if cached is None or cached[0] != signatures[path]:
+                self._changed_filepaths.append(path)
+        self.discovered_filepaths = [
+            path for path in self.discovered_filepaths if path in signatures
+        ]
+        removed_filepaths = set(self._files) - set(signatures)
+        for path in removed_filepaths:
+            del self._files[path]
+            file_contents.discard(path)
+        self._removed_files = bool(removed_filepaths)
+        if not self._changed_filepaths and not removed_filepaths and self.builds:
+            return
+        if self._changed_filepaths:
+            logging.info('Parsing {} changed files.'.format(len(self._changed_filepaths)))
+            dsp = self._create_parser()
+            files_records = dsp.get_files_records(self._changed_filepaths, settings.JOBS)
+            for path, records in zip(self._changed_filepaths, files_records):
+                # records are kept pickled, since generators modify assembled data
+                self._files[path] = (
+                    signatures[path], pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+                )
+            self.parsed_files += len(self._changed_filepaths)
+        # assemble data from records of every file, in order of discovery
+        dsp = self._create_parser()
+        for path in self.discovered_filepaths:
+            dsp.add_file_records(path, pickle.loads(self._files[path][1]))
+        self.doc_data = dsp.data
+        # source pages of changed files are generated first
+        changed_filepaths = set(self._changed_filepaths)
+        self.documentation_filepaths = [
+            path for path in dsp.documentation_filepaths if path in changed_filepaths
+        ] + [path for path in dsp.documentation_filepaths if path not in changed_filepaths]
+
+    def _get_file_signatures(self, filepaths):
+        """* Returns signatures of files, see {#jscribe.utils.filecontent.get_file_signature}.
+        @method ._get_file_signatures
+        @param self
+        @param filepaths {{list}}
+        @private
+        @return {{dict}} - Signatures by paths, files removed after discovery are skipped.
+        """
+        signatures = {}
+        for path in filepaths:
+            try:
+                signatures[path] = get_file_signature(path)
+            except OSError:
+                # removed after discovery
+                continue
+        return signatures
+
+    def generate_documentation(self):
+        """* Generates documentation, pages that didn't change since last generation are not
+        written.
+        @method .generate_documentation
+        @param self
+        """
+        generator_class = self._get_generator_class()
+        generator = generator_class(self.doc_data, self.tag_settings, self.documentation_filepaths)
+        template_generator = generator.create_template_generator()
+        template_generator.renderer.written_hashes = self._written_hashes
+        if self._page_dependencies is None:
+            self._page_dependencies = PageDependencies(
+                settings.PAGE_DEPENDENCIES_PATH, settings.DOCUMENTATION_OUTPUT_PATH
+            )
+        template_generator.page_dependencies = self._page_dependencies
+        hits = self._page_dependencies.hits
+        try:
+            template_generator.generate_documentation()
+        except:
+            # inputs of pages recorded before error don't match generated pages
+            self._page_dependencies = None
+            raise
+        self._save_html_caches()
+        self.builds += 1
+        # pages with unchanged inputs are not rendered, rendered pages may be not written
+        self.skipped_pages = (
+            self._page_dependencies.hits - hits + template_generator.renderer.skipped_files
+        )
+        logging.info('Documentation generated, {} unchanged pages not written.'.format(
+            self.skipped_pages
+        ))
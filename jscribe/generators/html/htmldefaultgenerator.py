@@ -7,21 +7,28 @@
 
 import os
 import re
-import codecs
 import logging
+import hashlib
 import importlib
-import shutil
+import traceback
+import multiprocessing
 from collections import OrderedDict
 
-from markdown import markdown
+from markdown import Markdown
+from markdown.extensions import Extension
+from markdown.preprocessors import Preprocessor
+from markdown.inlinepatterns import InlineProcessor
 from pygments import highlight
 from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 
-from jscribe.utils.file import get_py_file_encoding
+from jscribe.utils.filecontent import file_contents
+from jscribe.utils.highlightcache import highlight_cache
+from jscribe.utils.markupcache import markup_cache
 from jscribe.core.generator import Generator
 from jscribe.conf import settings
 from jscribe.core.jinjatemplaterenderer import JinjaTemplateRenderer
+from jscribe.core.pagedependencies import PageDependencies, get_data_hash
 from jscribe.core.docstringparser import DocStringParser, get_tag_type_property
 
 
@@ -31,6 +38,21 @@ class HTMLDefaultGenerator(Generator):
     @class jscribe.generators.html.htmldefaultgenerator.HTMLDefaultGenerator
     @inherits {{#jscribe.core.generator.Generator}}
     """
+
+    """* Minimal number of pages to render, for which process pool is started (if `JOBS` setting
+    is greater than 1).
+    @attribute .PARALLEL_MIN_PAGES
+    @valtype {{int}}
+    """
+    PARALLEL_MIN_PAGES = 100
+
+    """* Name of file with navigation lists, that is written if `NAVIGATION_FILE` template setting
+    is `true`.
+    @attribute .NAVIGATION_FILENAME
+    @valtype {{str}}
+    """
+    NAVIGATION_FILENAME = 'navigation-lists.html'
+
     def __init__(self, template_settings, doc_data, tag_settings, discovered_filepaths):
         """* Initialization.
         @method .__init__
@@ -45,6 +67,41 @@ class HTMLDefaultGenerator(Generator):
         self.template_settings = template_settings
         self.discovered_filepaths = discovered_filepaths
         self.renderer = self.create_renderer()
+        self._url_table = {}
+        self._broken_references = []
+        """* Inputs of generated pages, `None` unless `PAGE_DEPENDENCIES_PATH` setting is set or
+        record is given before generation (i.e. by watcher), then only pages with changed inputs
+        are rendered.
+        @valtype {{#jscribe.core.pagedependencies.PageDependencies}}
+        @attribute .page_dependencies
+        """
+        self.page_dependencies = None
+        # hashes of elements data before conversion and urls of references, by element id
+        self._element_hashes = {}
+        self._element_references = {}
+        # inputs shared by every page
+        self._common_page_inputs = {}
+        # pages to render, collected while walking documentation data
+        self._page_jobs = None
+        self._page_elements = None
+        """* Highlighter that started highlighting source files while documentation data was
+        collected, see {#jscribe.core.sourcehighlighter.SourceHighlighter}.
+        @valtype {{#jscribe.core.sourcehighlighter.SourceHighlighter}}
+        @attribute .source_highlighter
+        """
+        self.source_highlighter = None
+        self._highlighted_sources = {}
+
+    @classmethod
+    def get_source_highlight_function(cls, template_settings):
+        """* Returns function that highlights source files for source pages, with its additional
+        arguments, so source files can be highlighted before generator is created.
+        @method .get_source_highlight_function
+        @param cls
+        @param template_settings {{dict}}
+        @return {{tuple}} - Function and tuple of its arguments.
+        """
+        return highlight_source_file, (settings.LANGUAGE, template_settings['SHOW_LINE_NUMBER'])
 
     def get_template_for_element(self, tag_type_name):
         return self.template_settings['ELEMENT_TEMPLATES'].get(
@@ -100,6 +157,94 @@ class HTMLDefaultGenerator(Generator):
             url = '#'.join([url, anchor_url])
         return url, anchor_url
 
+    def _build_url_table(self):
+        """* Computes url and anchor of every defined element in one pass through documentation
+        tree, using the same rules as `_make_url_from_namepath`, so references can be resolved
+        without walking the tree from the root every time. Must be called after elements data is
+        prepared.
+        @method ._build_url_table
+        @param self
+        @private
+        """
+        self._url_table = {}
+        self._add_urls_to_table(self.doc_data, '', '', '', None)
+
+    def _add_urls_to_table(self, element, namepath, name_url, anchor_url, separate_url):
+        for part, child in element['properties'].iteritems():
+            if namepath:
+                child_namepath = '.'.join([namepath, part])
+                child_name_url = '_'.join([name_url, part])
+            else:
+                child_namepath = part
+                child_name_url = part
+            child_anchor_url = anchor_url
+            child_separate_url = separate_url
+            is_defined = self._is_element_defined(child)
+            if not is_defined:
+                child_anchor_url = ''
+                child_separate_url = child_name_url
+            elif not child['is_separate']:
+                if child_anchor_url:
+                    child_anchor_url = '_'.join([child_anchor_url, part])
+                else:
+                    child_anchor_url = part
+            else:
+                child_anchor_url = ''
+                child_separate_url = child_name_url
+            if is_defined and child_separate_url is not None:
+                url = '.'.join([child_separate_url, 'html'])
+                if child_anchor_url:
+                    url = '#'.join([url, child_anchor_url])
+                self._url_table[child_namepath] = (url, child_anchor_url)
+            self._add_urls_to_table(
+                child, child_namepath, child_name_url, child_anchor_url, child_separate_url
+            )
+
+    def _get_url_from_namepath(self, namepath):
+        """* Returns url and anchor of element from precomputed table. If namepath is not there
+        then it is resolved by walking the tree, which raises exception describing the problem.
+        @method ._get_url_from_namepath
+        @param self
+        @param namepath {{str}}
+        @return {{tuple}} - Url and anchor.
+        @private
+        """
+        url = self._url_table.get(namepath)
+        if url is None:
+            return self._make_url_from_namepath(namepath)
+        return url
+
+    def _get_reference_link(self, element, namepath):
+        """* Returns link to referenced element or `None` if reference is broken. Broken references
+        are collected and reported all at once when template data is built.
+        @method ._get_reference_link
+        @param self
+        @param element {{dict}} - Element with reference.
+        @param namepath {{str}} - Referenced namepath.
+        @return {{str}}
+        @private
+        """
+        try:
+            url, url_id = self._get_url_from_namepath(namepath)
+        except (DocStringParser.InvalidElementPathException, Generator.GeneratorException) as e:
+            self._broken_references.append((element, e))
+            return None
+        if self.page_dependencies is not None:
+            self._element_references.setdefault(id(element), []).append((namepath, url))
+        return self._make_link(url, namepath)
+
+    def _raise_broken_references(self):
+        if not self._broken_references:
+            return
+        report = [u'Found {} broken references:'.format(len(self._broken_references))]
+        for element, exception in self._broken_references:
+            report.append(u'{} ({}:{}): {}'.format(
+                element.get('namepath'), element.get('filepath'), element.get('startline'),
+                exception
+            ))
+        self._broken_references = []
+        raise DocStringParser.InvalidElementPathException(u'\n'.join(report))
+
     def get_path_to_sourcefile(self, filepath):
         return '.'.join([filepath.replace(os.path.sep, '_')[1:], 'html'])
 
@@ -107,14 +252,31 @@ class HTMLDefaultGenerator(Generator):
         return '.'.join(['list_{}'.format(list_type), 'html'])
 
     def generate_documentation(self):
+        if self.page_dependencies is None and settings.PAGE_DEPENDENCIES_PATH is not None:
+            self.page_dependencies = PageDependencies(
+                settings.PAGE_DEPENDENCIES_PATH, settings.DOCUMENTATION_OUTPUT_PATH
+            )
+        if self.page_dependencies is not None:
+            # record can be used for many runs
+            hits, misses = self.page_dependencies.hits, self.page_dependencies.misses
         # get documentation data for templates
-        self._build_template_data()
+        try:
+            self._build_template_data()
+        except:
+            if self.source_highlighter is not None:
+                self.source_highlighter.terminate()
+            raise
         # sort lists by order
         self.doc_data['lists'] = OrderedDict(
             sorted(self.doc_data['lists'].items(), key=lambda v: v[1]['order'])
         )
-        # add lists to the global context so its always available to mainframe
-        self.renderer.update_globals({'lists': self.doc_data['lists']})
+        # add lists and rendered navigation to the global context so its always available to
+        # mainframe
+        self._update_navigation_globals()
+        if self.page_dependencies is not None:
+            self._common_page_inputs = self._get_common_page_inputs()
+        # pages are collected first and rendered at once, in a pool of processes if there are many
+        self._page_jobs = []
         # create source doc files (source code with line numbers and anchors)
         self.generate_source_files_for_documentation()
         # create list files
@@ -124,13 +286,165 @@ class HTMLDefaultGenerator(Generator):
             # check if element is defined in documentation
             if not self._is_element_defined(element):
                 self._check_if_properties_are_separate(element)
+                continue
             # check if element is separate, only then create file
             if element.get('is_separate'):
                 self.generate_element_file(element)
             else:
                 self._check_if_properties_are_separate(element)
+        page_jobs = self._page_jobs
+        self._page_jobs = None
+        if self.source_highlighter is not None:
+            self._highlighted_sources = self.source_highlighter.get_results()
+        self.render_pages(page_jobs, settings.JOBS)
+        self._highlighted_sources = {}
+        if self._get_navigation_path() is not None:
+            self.generate_navigation_file()
         # copy style file
         self._copy_template_style_file()
+        if self.page_dependencies is not None:
+            for page_path in self.page_dependencies.remove_stale_pages():
+                self.renderer.output_writer.mark_deleted(
+                    os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, page_path)
+                )
+                logging.info('Removed: {}'.format(page_path))
+            self.page_dependencies.save()
+            logging.info('Page dependencies: {} pages unchanged, {} pages generated.'.format(
+                self.page_dependencies.hits - hits, self.page_dependencies.misses - misses
+            ))
+        output_writer = self.renderer.output_writer
+        if settings.OUTPUT_MANIFEST_PATH is not None:
+            # pages generated last time, that are not generated anymore
+            output_writer.remove_stale_files(
+                settings.OUTPUT_MANIFEST_PATH, settings.DOCUMENTATION_OUTPUT_PATH
+            )
+            output_writer.save_manifest(
+                settings.OUTPUT_MANIFEST_PATH, settings.DOCUMENTATION_OUTPUT_PATH
+            )
+        logging.info('Output files: {} written, {} unchanged, {} deleted.'.format(
+            len(output_writer.written), len(output_writer.unchanged), len(output_writer.deleted)
+        ))
+
+    def _get_common_page_inputs(self):
+        """* Returns inputs that every page depends on: navigation lists (rendered on every page),
+        templates and settings. Must be called after lists are sorted.
+        @method ._get_common_page_inputs
+        @param self
+        @return {{dict}} - Names of inputs and their hashes.
+        @private
+        """
+        navigation = [
+            (list_type, _list['path'], [
+                (
+                    element.get('doc_element_path'), element.get('namepath'),
+                    element.get('name'), element.get('alias_name'),
+                ) for element in _list['elements']
+            ]) for list_type, _list in self.doc_data['lists'].iteritems()
+        ]
+        inputs = {
+            'templates': self.renderer.get_templates_hash(),
+            'settings': get_data_hash([
+                self.template_settings, self.tag_settings, settings.LANGUAGE,
+                settings.OUTPUT_ENCODING,
+            ]),
+        }
+        # pages that show navigation from shared file don't change with lists
+        if self._get_navigation_path() is None:
+            inputs['lists'] = get_data_hash(navigation)
+        return inputs
+
+    def _get_navigation_path(self):
+        """* Returns path of file with navigation lists, relative to output path.
+        @method ._get_navigation_path
+        @param self
+        @return {{str}} - `None` if navigation is rendered in every page.
+        @private
+        """
+        if self.template_settings.get('NAVIGATION_FILE'):
+            return self.NAVIGATION_FILENAME
+        return None
+
+    def _update_navigation_globals(self):
+        """* Adds navigation lists to global context of templates. Navigation is rendered only
+        once, pages insert it as ready html or show it from shared file.
+        @method ._update_navigation_globals
+        @param self
+        @private
+        """
+        navigation_path = self._get_navigation_path()
+        self.renderer.update_globals({
+            'lists': self.doc_data['lists'], 'navigation_path': navigation_path,
+        })
+        if navigation_path is None:
+            self.renderer.update_globals({
+                'navigation': self.renderer.render('navigation.html', {}),
+            })
+
+    def generate_navigation_file(self):
+        """* Writes navigation lists to shared file, that is shown by every page.
+        @method .generate_navigation_file
+        @param self
+        """
+        self.renderer.render_to_file(
+            'navigationframe.html',
+            {'navigation': self.renderer.render('navigation.html', {})},
+            os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, self._get_navigation_path()),
+            settings.OUTPUT_ENCODING
+        )
+        logging.info('Created: {}'.format(self._get_navigation_path()))
+
+    def _is_page_changed(self, page_path, inputs):
+        """* Records inputs of page and checks if page has to be generated again.
+        @method ._is_page_changed
+        @param self
+        @param page_path {{str}} - Path of page relative to output path.
+        @param inputs {{dict}} - Inputs specific to this page, common inputs are added.
+        @return {{boolean}}
+        @private
+        """
+        inputs.update(self._common_page_inputs)
+        changed = self.page_dependencies.is_changed(page_path, inputs)
+        if not changed:
+            self.renderer.output_writer.mark_unchanged(
+                os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, page_path)
+            )
+        else:
+            logging.debug('Changed inputs of {}: {}'.format(
+                page_path, ', '.join(self.page_dependencies.get_changed_inputs(page_path, inputs))
+            ))
+        self.page_dependencies.set(page_path, inputs)
+        return changed
+
+    def _get_element_page_inputs(self, element_data):
+        """* Returns inputs of element page: data of elements rendered on that page (element and
+        its properties that are not separate) before conversion, links to separate properties and
+        urls of referenced elements.
+        @method ._get_element_page_inputs
+        @param self
+        @param element_data {{dict}}
+        @return {{dict}}
+        @private
+        """
+        elements = []
+        references = []
+        self._collect_page_elements(element_data, elements, references)
+        return {'elements': get_data_hash(elements), 'references': get_data_hash(references)}
+
+    def _collect_page_elements(self, element_data, elements, references):
+        elements.append((
+            element_data.get('namepath'), element_data.get('doc_element_path'),
+            self._element_hashes.get(id(element_data)),
+        ))
+        references.append(self._element_references.get(id(element_data), []))
+        for prop, element in element_data.get('properties').iteritems():
+            if element.get('is_separate'):
+                # only link to separate element is rendered
+                elements.append((
+                    element.get('namepath'), element.get('doc_element_path'), element.get('type'),
+                    element.get('name'), element.get('alias_name'),
+                ))
+            else:
+                self._collect_page_elements(element, elements, references)
 
     def _is_element_defined(self, element):
         if element.get('type') is None:
@@ -147,7 +461,9 @@ class HTMLDefaultGenerator(Generator):
                 'render_element_contents': self.render_element_contents,
                 'FOOTER_TEXT': self.template_settings['FOOTER_TEXT'],
                 'TITLE': self.template_settings['TITLE'],
-            }
+            },
+            bytecode_cache_path=settings.TEMPLATE_CACHE_PATH,
+            compiled_templates_path=settings.COMPILED_TEMPLATES_PATH
         )
         return renderer
 
@@ -163,13 +479,15 @@ class HTMLDefaultGenerator(Generator):
         style_dst_path = os.path.join(
             settings.DOCUMENTATION_OUTPUT_PATH, css_style_name
         )
-        shutil.copy(style_path, style_dst_path)
+        self.renderer.output_writer.copy(style_path, style_dst_path)
 
     def _build_template_data(self):
         lists = {}
         namepath = ''
         # prepare elements data before converting
         self._prepare_element_data(self.doc_data)
+        # compute urls of all defined elements at once
+        self._build_url_table()
         # convert elements data
         for prop, element in self.doc_data.get('properties').iteritems():
             # set namepath for element
@@ -180,6 +498,8 @@ class HTMLDefaultGenerator(Generator):
             element['namepath'] = namepath
             element, lists = self._convert_element_data(element, lists)
             self._get_element_template_data(element, namepath, lists)
+        # report every broken reference found during conversion
+        self._raise_broken_references()
         lists = self._sort_list_elements(lists)
         self.doc_data = {'root_element': self.doc_data, 'lists': lists}
 
@@ -198,6 +518,12 @@ class HTMLDefaultGenerator(Generator):
     def _prepare_element_data(self, element):
         for element in element.get('properties').values():
             if self._is_element_defined(element):
+                if self.page_dependencies is not None:
+                    # data is hashed before conversion, converted data depends on the same inputs
+                    self._element_hashes[id(element)] = get_data_hash(
+                        dict((key, value) for key, value in element.iteritems()
+                             if key != 'properties')
+                    )
                 # get element tag type settings
                 tag_type_name = element.get('type')
                 tag_type = self.tag_settings.get(tag_type_name)
@@ -234,16 +560,14 @@ class HTMLDefaultGenerator(Generator):
 
     def _convert_element_data(self, element, lists):
         if self._is_element_defined(element):
-            # convert references to elements, to html links
+            # convert references to elements in attributes, to html links
             element = self._convert_references(element)
-            # convert inline code blocks into html parsed code
-            element = self._convert_element_code_blocks(element)
-            # convert markup in description into html, THIS MUST BE DONE AFTER CONVERTING REST
-            # "PARTS" OF DESCRIPTION, LIKE REFERENCES OR CODE BLOCKS
+            # convert markup in description into html, references and inline code blocks are
+            # converted together with markup
             element = self._convert_element_descriptions_markup(element)
             # convert code examples
             element = self._convert_code_examples(element)
-            output_path, url_id = self._make_url_from_namepath(element.get('namepath'))
+            output_path, url_id = self._get_url_from_namepath(element.get('namepath'))
             element['doc_element_path'] = output_path
             element['doc_element_id'] = url_id
             # get element tag type settings
@@ -276,7 +600,10 @@ class HTMLDefaultGenerator(Generator):
 
     def _convert_element_descriptions_markup(self, element):
         # convert element description from markdown to html
-        element['description_html'] = self._convert_markup(element['description'])
+        element['description_html'] = self._convert_markup(
+            element['description'], self._get_description_references(element),
+            (settings.LANGUAGE, self.template_settings['SHOW_LINE_NUMBER'])
+        )
         # convert parameter descriptions if are set
         if element['attributes'].get('params') is not None:
             for param in element['attributes']['params']:
@@ -297,65 +624,43 @@ class HTMLDefaultGenerator(Generator):
                 example['description_html'] = self._convert_markup(example['description'])
         return element
 
-    def _convert_element_code_blocks(self, element):
-        description = element['description']
-        matches = re.finditer(
-            r'(?P<wrap>[{][$](?P<lang>\w*?)\s(?P<code>.*?)[$][}])', description, flags=re.DOTALL
-        )
-        len_diff = 0
-        for match in matches:
-            code = match.group('code')
-            lang = match.group('lang')
-            langid = settings.LANGUAGE
-            if lang:
-                langid = lang
-            code_html = self._convert_code(u'\t\r\n' + code, langid)
-            description = (
-                description[0:match.start('wrap') + len_diff] +
-                code_html +
-                description[match.end('wrap') + len_diff:]
-            )
-            len_diff -= match.end('wrap') - match.start('wrap')
-            len_diff += len(code_html)
-        element['description'] = description
-        return element
+    def _get_description_references(self, element):
+        """* Returns links to elements referenced in description of element.
+        @method ._get_description_references
+        @param self
+        @param element {{dict}}
+        @return {{dict}} - Links by referenced namepaths, `None` if reference is broken.
+        @private
+        """
+        references = {}
+        for match in _reference_regex.finditer(element['description']):
+            namepath = match.group('ref')
+            if namepath not in references:
+                references[namepath] = self._get_reference_link(element, namepath)
+        return references
 
     def _convert_references(self, element):
-        description = element['description']
-        matches = re.finditer(r'(?P<wrap>[{]#(?P<ref>.*?)[}])', description)
-        len_diff = 0
-        for match in matches:
-            url, url_id = self._make_url_from_namepath(match.group('ref'))
-            link = self._make_link(url, match.group('ref'))
-            description = (
-                description[0:match.start('wrap') + len_diff] +
-                link +
-                description[match.end('wrap') + len_diff:]
-            )
-            len_diff -= match.end('wrap') - match.start('wrap')
-            len_diff += len(link)
-        element['description'] = description
         params = element['attributes'].get('params')
         if params is not None:
             for param in params:
                 if param['type']['ref'] is not None:
-                    url, url_id = self._make_url_from_namepath(param['type']['ref'])
-                    param['type']['ref_html'] = self._make_link(url, param['type']['ref'])
+                    param['type']['ref_html'] = self._get_reference_link(
+                        element, param['type']['ref']
+                    )
         inherits = element['attributes'].get('inherits')
         if inherits is not None:
             if inherits['ref'] is not None:
-                url, url_id = self._make_url_from_namepath(inherits['ref'])
-                inherits['ref_html'] = self._make_link(url, inherits['ref'])
+                inherits['ref_html'] = self._get_reference_link(element, inherits['ref'])
         returns = element['attributes'].get('return')
         if returns is not None:
             if returns['type']['ref'] is not None:
-                url, url_id = self._make_url_from_namepath(returns['type']['ref'])
-                returns['type']['ref_html'] = self._make_link(url, returns['type']['ref'])
+                returns['type']['ref_html'] = self._get_reference_link(
+                    element, returns['type']['ref']
+                )
         valtype = element['attributes'].get('valtype')
         if valtype is not None:
             if valtype['ref'] is not None:
-                url, url_id = self._make_url_from_namepath(valtype['ref'])
-                valtype['ref_html'] = self._make_link(url, valtype['ref'])
+                valtype['ref_html'] = self._get_reference_link(element, valtype['ref'])
         return element
 
     def _make_link(self, url, title):
@@ -365,18 +670,10 @@ class HTMLDefaultGenerator(Generator):
         return link
 
     def _convert_code(self, code, langid):
-        lexer = get_lexer_by_name(langid, stripall=True)
-        formatter = HtmlFormatter(
-            linenos=self.template_settings['SHOW_LINE_NUMBER'],
-            cssclass="source_{}".format(langid), linespans='line'
-        )
-        return highlight(code, lexer, formatter)
+        return highlight_source(code, langid, self.template_settings['SHOW_LINE_NUMBER'])
 
-    def  _convert_markup(self, markup_string):
-        return markdown(
-            markup_string,
-            output_format='html5',
-        )
+    def  _convert_markup(self, markup_string, references=None, code_options=None):
+        return convert_markup(markup_string, references, code_options)
 
     def generate_element_file(self, element_data):
         for prop, element in element_data.get('properties').iteritems():
@@ -388,20 +685,26 @@ class HTMLDefaultGenerator(Generator):
                 self.generate_element_file(element)
             else:
                 self._check_if_properties_are_separate(element)
-        result = self.render_element(element_data)
-        self.renderer.render_to_file(
-            'element.html',
-            {'element_rendered': result, 'element': element_data, },
-            os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, element_data['doc_element_path']),
-            settings.OUTPUT_ENCODING
-        )
-        logging.info('Created: {}'.format(element_data['doc_element_path']))
+        page_path = element_data['doc_element_path']
+        if self.page_dependencies is not None and not self._is_page_changed(
+            page_path, self._get_element_page_inputs(element_data)
+        ):
+            return
+        self._add_page_job(('element', page_path, self._count_page_elements(element_data)))
+
+    def _count_page_elements(self, element_data):
+        count = 1
+        for prop, element in element_data.get('properties').iteritems():
+            if not element.get('is_separate'):
+                count += self._count_page_elements(element)
+        return count
 
     def _check_if_properties_are_separate(self, element_data):
         for prop, element in element_data.get('properties').iteritems():
             # check if element is defined in documentation
             if not self._is_element_defined(element):
                 self._check_if_properties_are_separate(element)
+                continue
             if element.get('is_separate'):
                 self.generate_element_file(element)
             else:
@@ -409,36 +712,172 @@ class HTMLDefaultGenerator(Generator):
 
     def generate_list_files(self, doc_data):
         for list_type, _list in doc_data['lists'].iteritems():
-            self.renderer.render_to_file(
-                'list.html',
-                {'list': _list, 'list_type': list_type, },
-                os.path.join(
-                    settings.DOCUMENTATION_OUTPUT_PATH,
-                    self.get_path_to_list_file(list_type)
-                ),
-                settings.OUTPUT_ENCODING
-            )
+            page_path = self.get_path_to_list_file(list_type)
+            if self.page_dependencies is not None and not self._is_page_changed(
+                page_path, {'list': get_data_hash([
+                    (element.get('doc_element_path'), element.get('namepath'),
+                     element.get('alias_name')) for element in _list['elements']
+                ])}
+            ):
+                continue
+            self._add_page_job(('list', list_type, len(_list['elements'])))
 
     def generate_source_files_for_documentation(self):
         for filepath in self.discovered_filepaths:
-            encoding = get_py_file_encoding(filepath)
-            with codecs.open(filepath, 'r', encoding) as f:
-                code = f.read()
-                f.close()
             output_path = self.get_path_to_sourcefile(filepath[1:])
-            lexer = get_lexer_by_name(settings.LANGUAGE, stripall=True)
-            formatter = HtmlFormatter(
-                linenos=self.template_settings['SHOW_LINE_NUMBER'],
-                cssclass="source_{}".format(settings.LANGUAGE), linespans='line'
+            if self.page_dependencies is not None:
+                # content is kept for rendering
+                code = file_contents.get_text(filepath)
+                if not self._is_page_changed(
+                    output_path, {'source': hashlib.sha1(code.encode('utf-8')).hexdigest()}
+                ):
+                    file_contents.discard(filepath)
+                    continue
+            self._add_page_job(('source', filepath, os.path.getsize(filepath)))
+
+    def _add_page_job(self, job):
+        """* Adds page to pages rendered by
+        {#jscribe.generators.html.htmldefaultgenerator.HTMLDefaultGenerator.render_pages}, page is
+        rendered right away if pages are not collected.
+        @method ._add_page_job
+        @param self
+        @param job {{tuple}} - Kind of page ("source", "list" or "element"), its key (path of
+            source file, list type or page path) and size used to order jobs.
+        @private
+        """
+        if self._page_jobs is None:
+            self.render_page(job)
+            return
+        self._page_jobs.append(job)
+
+    def render_pages(self, jobs, processes=1):
+        """* Renders pages to files. If `processes` is greater than 1 and there are at least
+        {#jscribe.generators.html.htmldefaultgenerator.HTMLDefaultGenerator.PARALLEL_MIN_PAGES}
+        pages, then pages are rendered in a pool of processes, biggest pages first (source pages
+        before others, since highlighting takes most of the time). Every process creates its own
+        generator with the same data and compiles every template before rendering, files are the
+        same as rendered in one process.
+        @method .render_pages
+        @param self
+        @param jobs {{list}} - Pages to render, see
+            {#jscribe.generators.html.htmldefaultgenerator.HTMLDefaultGenerator._add_page_job}.
+        @param processes=1 {{int}}
+        """
+        if processes <= 1 or len(jobs) < self.PARALLEL_MIN_PAGES:
+            for job in jobs:
+                self.render_page(job)
+            return
+        # errors in templates are raised here, not in every process
+        self.renderer.load_templates()
+        jobs = sorted(jobs, key=lambda job: (job[0] != 'source', -job[2]))
+        written_hashes = self.renderer.written_hashes
+        pool = multiprocessing.Pool(
+            min(processes, len(jobs)), _init_generator_process,
+            (
+                type(self), self.template_settings, self.doc_data, self.tag_settings,
+                _get_settings_values(), written_hashes is not None, self._highlighted_sources,
+            )
+        )
+        try:
+            for filepath, content_hash, skipped, highlighted, error in pool.imap_unordered(
+                _render_page_in_process,
+                [
+                    (job, None if written_hashes is None else written_hashes.get(
+                        self._get_page_filepath(job)
+                    )) for job in jobs
+                ]
+            ):
+                if error is not None:
+                    raise Generator.GeneratorException(error)
+                highlight_cache.add_new_entries(highlighted)
+                if written_hashes is not None:
+                    written_hashes[filepath] = content_hash
+                # file is written by process, only result is recorded
+                self.renderer.skipped_files += skipped
+                if skipped:
+                    self.renderer.output_writer.mark_unchanged(filepath)
+                else:
+                    self.renderer.output_writer.mark_written(filepath)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            # sources kept for processes are not needed anymore
+            for job in jobs:
+                if job[0] == 'source':
+                    file_contents.discard(job[1])
+
+    def _get_page_filepath(self, job):
+        kind, key, size = job
+        if kind == 'source':
+            page_path = self.get_path_to_sourcefile(key[1:])
+        elif kind == 'list':
+            page_path = self.get_path_to_list_file(key)
+        else:
+            page_path = key
+        return os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, page_path)
+
+    def render_page(self, job):
+        """* Renders page to file.
+        @method .render_page
+        @param self
+        @param job {{tuple}} - Page to render, see
+            {#jscribe.generators.html.htmldefaultgenerator.HTMLDefaultGenerator._add_page_job}.
+        """
+        kind, key, size = job
+        filepath = self._get_page_filepath(job)
+        if kind == 'source':
+            result = self._highlighted_sources.get(key)
+            if result is None:
+                # content is usually already read and decoded by parser
+                result = highlight_source(
+                    file_contents.get_text(key, keep=False), settings.LANGUAGE,
+                    self.template_settings['SHOW_LINE_NUMBER']
+                )
+            else:
+                file_contents.discard(key)
+            self.renderer.render_to_file(
+                'sourcefile.html', {'source': result, }, filepath, settings.OUTPUT_ENCODING
             )
-            result = highlight(code, lexer, formatter)
+            logging.info('Created: {}'.format(self.get_path_to_sourcefile(key[1:])))
+        elif kind == 'list':
             self.renderer.render_to_file(
-                'sourcefile.html',
-                {'source': result, },
-                os.path.join(settings.DOCUMENTATION_OUTPUT_PATH, output_path),
+                'list.html',
+                {'list': self.doc_data['lists'][key], 'list_type': key, },
+                filepath,
                 settings.OUTPUT_ENCODING
             )
-            logging.info('Created: {}'.format(output_path))
+        else:
+            element_data = self._get_page_element(key)
+            result = self.render_element(element_data)
+            self.renderer.render_to_file(
+                'element.html',
+                {'element_rendered': result, 'element': element_data, },
+                filepath,
+                settings.OUTPUT_ENCODING
+            )
+            logging.info('Created: {}'.format(key))
+
+    def _get_page_element(self, page_path):
+        """* Returns separate element that is rendered to page with given path.
+        @method ._get_page_element
+        @param self
+        @param page_path {{str}}
+        @return {{dict}}
+        @private
+        """
+        if self._page_elements is None:
+            self._page_elements = {}
+            self._add_page_elements(self.doc_data['root_element'])
+        return self._page_elements[page_path]
+
+    def _add_page_elements(self, element_data):
+        for prop, element in element_data.get('properties').iteritems():
+            if element.get('is_separate') and self._is_element_defined(element):
+                self._page_elements[element['doc_element_path']] = element
+            self._add_page_elements(element)
 
     def render_element(self, element):
         template = self.get_template_for_element(element.get('type'))
@@ -447,3 +886,216 @@ class HTMLDefaultGenerator(Generator):
     def render_element_contents(self, element):
         template = 'element_contents.html'
         return self.renderer.render(template, {'element': element, })
+
+
+def highlight_source(code, language, show_line_number):
+    """* Returns highlighted source code, for source page or code snippet. Highlighted code is
+    cached in {#jscribe.utils.highlightcache.highlight_cache}.
+    @function jscribe.generators.html.htmldefaultgenerator.highlight_source
+    @param code {{unicode}}
+    @param language {{str}} - Name of pygments lexer.
+    @param show_line_number {{boolean}}
+    @return {{unicode}}
+    """
+    key = highlight_cache.get_key(code, language, show_line_number)
+    highlighted_code = highlight_cache.get(key)
+    if highlighted_code is None:
+        lexer, formatter = _get_highlighter(language, show_line_number)
+        highlighted_code = highlight(code, lexer, formatter)
+        highlight_cache.set(key, highlighted_code)
+    return highlighted_code
+
+
+# lexers and formatters by language and line numbers option, they are reused for whole run
+_highlighters = {}
+
+
+def _get_highlighter(language, show_line_number):
+    highlighter = _highlighters.get((language, show_line_number))
+    if highlighter is None:
+        # looking for lexer by name can load every pygments plugin
+        lexer = get_lexer_by_name(language, stripall=True)
+        formatter = HtmlFormatter(
+            linenos=show_line_number, cssclass="source_{}".format(language), linespans='line'
+        )
+        highlighter = _highlighters[(language, show_line_number)] = lexer, formatter
+    return highlighter
+
+
+def convert_markup(markup_string, references=None, code_options=None):
+    """* Returns html converted from markdown. Html is cached in
+    {#jscribe.utils.markupcache.markup_cache}.
+    @function jscribe.generators.html.htmldefaultgenerator.convert_markup
+    @param markup_string {{unicode}}
+    @param references=None {{dict}} - Links by namepaths, references `{#namepath}` are converted
+        to links if given, see {#jscribe.generators.html.htmldefaultgenerator.DescriptionExtension}.
+    @param code_options=None {{tuple}} - Default language and line numbers option, inline code
+        blocks are highlighted if given.
+    @return {{unicode}}
+    """
+    global _markdown
+    # most of params and return values have no description
+    if not markup_string:
+        return u''
+    key = markup_cache.get_key(markup_string, sorted((references or {}).items()), code_options)
+    html = markup_cache.get(key)
+    if html is None:
+        # creating markdown instance builds every extension, reset is enough between documents
+        if _markdown is None:
+            _markdown = Markdown(output_format='html5', extensions=[_description_extension])
+        _description_extension.references = references
+        _description_extension.code_options = code_options
+        try:
+            html = _markdown.reset().convert(markup_string)
+        finally:
+            _description_extension.references = None
+            _description_extension.code_options = None
+        markup_cache.set(key, html)
+    return html
+
+
+_reference_regex = re.compile(r'[{]#(?P<ref>.*?)[}]')
+_code_block_regex = re.compile(r'[{][$](?P<lang>\w*?)\s(?P<code>.*?)[$][}]', flags=re.DOTALL)
+
+
+class DescriptionExtension(Extension):
+    """* Markdown extension that converts references to elements into links and inline code
+    blocks (that start with `{$` and language and end with `$}`) into highlighted code, while
+    markdown is converted.
+    Links and highlighted code are stashed, so markdown doesn't change them, and references in
+    code blocks or in code spans are left as they are.
+
+    Links and options of code blocks are set for every converted description by
+    {#jscribe.generators.html.htmldefaultgenerator.convert_markup}, if they are not set then
+    extension does nothing.
+    @class jscribe.generators.html.htmldefaultgenerator.DescriptionExtension
+    """
+
+    def __init__(self, **kwargs):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param kwargs... {{object}} - Config of extension.
+        """
+        self.references = None
+        self.code_options = None
+        super(DescriptionExtension, self).__init__(**kwargs)
+
+    def extendMarkdown(self, md):
+        """* Registers code block preprocessor and reference pattern.
+        @method .extendMarkdown
+        @param self
+        @param md {{Markdown}}
+        """
+        # code blocks after whitespace is normalized, before html blocks are stashed
+        md.preprocessors.register(_CodeBlockPreprocessor(md, self), 'jscribe_code_block', 29)
+        # references after code spans and escapes, before links
+        md.inlinePatterns.register(
+            _ReferenceInlineProcessor(_reference_regex.pattern, md, self), 'jscribe_reference', 175
+        )
+
+
+class _CodeBlockPreprocessor(Preprocessor):
+
+    def __init__(self, md, extension):
+        super(_CodeBlockPreprocessor, self).__init__(md)
+        self.extension = extension
+
+    def run(self, lines):
+        if self.extension.code_options is None:
+            return lines
+        text = u'\n'.join(lines)
+        if u'{$' not in text:
+            return lines
+        return _code_block_regex.sub(self._stash_code_block, text).split(u'\n')
+
+    def _stash_code_block(self, match):
+        language, show_line_number = self.extension.code_options
+        code_html = highlight_source(
+            match.group('code'), match.group('lang') or language, show_line_number
+        )
+        return self.md.htmlStash.store(code_html)
+
+
+class _ReferenceInlineProcessor(InlineProcessor):
+
+    def __init__(self, pattern, md, extension):
+        super(_ReferenceInlineProcessor, self).__init__(pattern, md)
+        self.extension = extension
+
+    def handleMatch(self, match, data):
+        link = None
+        if self.extension.references is not None:
+            link = self.extension.references.get(match.group('ref'))
+        # broken references are left as they are
+        if link is None:
+            return None, None, None
+        return self.md.htmlStash.store(link), match.start(0), match.end(0)
+
+
+# extension and markdown instance reused for whole run
+_description_extension = DescriptionExtension()
+_markdown = None
+
+
+def highlight_source_file(path, language, show_line_number):
+    """* Returns source file highlighted for source page, used by
+    {#jscribe.core.sourcehighlighter.SourceHighlighter}.
+    @function jscribe.generators.html.htmldefaultgenerator.highlight_source_file
+    @param path {{str}}
+    @param language {{str}} - Name of pygments lexer.
+    @param show_line_number {{boolean}}
+    @return {{unicode}}
+    """
+    return highlight_source(file_contents.get_text(path, keep=False), language, show_line_number)
+
+
+# generator used by process from pool started in HTMLDefaultGenerator.render_pages
+_process_generator = None
+
+
+def _get_settings_values():
+    return dict((name, getattr(settings, name)) for name in dir(settings) if name.isupper())
+
+
+def _init_generator_process(
+    generator_class, template_settings, doc_data, tag_settings, settings_values, keep_hashes,
+    highlighted_sources
+):
+    global _process_generator
+    # settings are not inherited by processes on every platform
+    for name, value in settings_values.iteritems():
+        setattr(settings, name, value)
+    _process_generator = generator_class(template_settings, doc_data, tag_settings, [])
+    _process_generator._update_navigation_globals()
+    _process_generator.renderer.load_templates()
+    _process_generator._highlighted_sources = highlighted_sources
+    highlight_cache.record_new_entries()
+    if keep_hashes:
+        _process_generator.renderer.written_hashes = {}
+
+
+def _render_page_in_process(page_job):
+    job, last_hash = page_job
+    renderer = _process_generator.renderer
+    filepath = _process_generator._get_page_filepath(job)
+    skipped_files = renderer.skipped_files
+    try:
+        if renderer.written_hashes is not None and last_hash is not None:
+            renderer.written_hashes[filepath] = last_hash
+        _process_generator.render_page(job)
+    except Exception:
+        # exceptions can't be always pickled, so only its description is passed
+        error = u'Can\'t render page "{}": {}'.format(
+            filepath, traceback.format_exc().decode('utf-8', 'replace')
+        )
+        return filepath, None, 0, highlight_cache.take_new_entries(), error
+    content_hash = None
+    if renderer.written_hashes is not None:
+        content_hash = renderer.written_hashes.pop(filepath, None)
+    # code highlighted in this process is cached by main process
+    return (
+        filepath, content_hash, renderer.skipped_files - skipped_files,
+        highlight_cache.take_new_entries(), None
+    )
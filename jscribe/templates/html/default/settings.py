@@ -2,6 +2,8 @@ TEMPLATE_SETTINGS = {
     "SHOW_LINE_NUMBER": True,
     "FOOTER_TEXT": "JSCRIBE",
     "LOGO_PATH": "",
+    # if true then navigation lists are written to one file, that is shown by every page
+    "NAVIGATION_FILE": False,
     "ELEMENT_TEMPLATES": {
         "default": "default_element.html"
     }
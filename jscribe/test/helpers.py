@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import json
+
+
+def write_source(path, namepath, description):
+    """Write javascript file with documented module."""
+    with open(path, 'w') as f:
+        f.write('/** {}\n@module {}\n*/\nvar x = 1;\n'.format(description, namepath))
+        f.close()
+
+
+def write_settings(path, input_path, template_settings=None, **kwargs):
+    """Write json settings file with javascript tag settings. Template settings, if given, are
+    added to default template settings of tests, setting with `None` value is left out."""
+    settings_data = {
+        'INPUT_PATHS': [input_path],
+        'TAG_SETTINGS': 'jscribe.conf.jstagsettings',
+    }
+    if template_settings is not None:
+        settings_data['TEMPLATE_SETTINGS'] = {
+            'SHOW_LINE_NUMBER': True, 'FOOTER_TEXT': 'Footer', 'ELEMENT_TEMPLATES': {},
+        }
+        for key, value in template_settings.iteritems():
+            if value is None:
+                del settings_data['TEMPLATE_SETTINGS'][key]
+            else:
+                settings_data['TEMPLATE_SETTINGS'][key] = value
+    settings_data.update(kwargs)
+    with open(path, 'w') as f:
+        json.dump(settings_data, f)
+        f.close()
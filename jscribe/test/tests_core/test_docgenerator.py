@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import shutil
+import unittest
+
+from jscribe.conf import settings
+from jscribe.core.docgenerator import DocumentationGenerator
+from jscribe.test.helpers import write_settings, write_source
+from jscribe.utils.gitfiles import GitException, run_git
+
+
+def is_git_available():
+    try:
+        run_git(['--version'], '.')
+    except GitException:
+        return False
+    return True
+
+
+class TestDocumentationGenerator(unittest.TestCase):
+
+    def setUp(self):
+        """Create git repository with source files and settings."""
+        os.makedirs('testdocgenerator/src')
+        self.settings_path = 'testdocgenerator/settings.json'
+        write_settings(
+            self.settings_path, './testdocgenerator/src', PARSE_CACHE_PATH='testdocgenerator/cache'
+        )
+        write_source('testdocgenerator/src/a.js', 'sincea', 'a')
+        write_source('testdocgenerator/src/b.js', 'sinceb', 'b')
+
+    def _commit(self):
+        git_config = ['-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        run_git(['add', '.'], 'testdocgenerator/src')
+        run_git(git_config + ['commit', '-q', '-m', 'Test.'], 'testdocgenerator/src')
+
+    def _get_descriptions(self, since):
+        generator = DocumentationGenerator(self.settings_path, since=since)
+        settings.reset()
+        properties = generator.doc_data['properties']
+        return properties['sincea']['description'], properties['sinceb']['description']
+
+    @unittest.skipUnless(is_git_available(), 'git is not installed')
+    def test_files_changed_since_cache_revision_are_read(self):
+        run_git(['init', '-q'], 'testdocgenerator/src')
+        self._commit()
+        self.assertEqual(self._get_descriptions('HEAD'), ('a', 'b'))
+        # commit after cache was saved, given revision is the new commit
+        write_source('testdocgenerator/src/b.js', 'sinceb', 'changed b')
+        self._commit()
+        self.assertEqual(self._get_descriptions('HEAD'), ('a', 'changed b'))
+        # uncommitted change is reverted after cache was saved
+        write_source('testdocgenerator/src/a.js', 'sincea', 'changed a')
+        self.assertEqual(self._get_descriptions('HEAD'), ('changed a', 'changed b'))
+        run_git(['checkout', '--', 'a.js'], 'testdocgenerator/src')
+        self.assertEqual(self._get_descriptions('HEAD'), ('a', 'changed b'))
+
+    @unittest.skipUnless(is_git_available(), 'git is not installed')
+    def test_files_not_tracked_by_git_are_read(self):
+        with open('testdocgenerator/src/.gitignore', 'w') as f:
+            f.write('b.js\n')
+            f.close()
+        run_git(['init', '-q'], 'testdocgenerator/src')
+        self._commit()
+        self.assertEqual(self._get_descriptions('HEAD'), ('a', 'b'))
+        # git doesn't report changes of ignored file
+        write_source('testdocgenerator/src/b.js', 'sinceb', 'changed b')
+        self.assertEqual(self._get_descriptions('HEAD'), ('a', 'changed b'))
+
+    def tearDown(self):
+        shutil.rmtree('testdocgenerator')
+        settings.reset()
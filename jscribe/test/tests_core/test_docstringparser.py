@@ -10,6 +10,9 @@ from collections import OrderedDict
 
 from jscribe.utils.file import get_source_file_coding
 from jscribe.core.docstringparser import DocStringParser
+from jscribe.core.parsecache import ParseCache
+from jscribe.utils.filecontent import file_contents
+from jscribe.core.element import Return
 
 
 class TestDocStringParser(unittest.TestCase):
@@ -759,12 +762,151 @@ class TestDocStringParser(unittest.TestCase):
             dsp.parse_file(filepath)
         self.assertEqual(dsp.data, data)
 
+    def test_doc_string_parser_assembles_file_once(self):
+        """Test if temporary collector holds data of last parsed file only."""
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        dsp.parse_file('testdocfilepackage.js')
+        dsp.parse_file('testdocfile1.js')
+        self.assertEqual(len(dsp._temp_data), 0)
+        self.assertEqual(
+            dsp.data['properties']['core']['properties'].keys(), ['EntityFactory']
+        )
+
+    def test_doc_string_parser_namepath_index(self):
+        """Test if namepath index holds every element of collected data."""
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        dsp.parse_file('testdocfilepackage.js')
+        dsp.parse_file('testdocfile1.js')
+        index = {}
+        stack = [('', dsp.data)]
+        while stack:
+            namepath, element = stack.pop()
+            for name, child in element['properties'].iteritems():
+                child_namepath = '.'.join([namepath, name]) if namepath else name
+                index[child_namepath] = child
+                stack.append((child_namepath, child))
+        self.assertEqual(sorted(dsp.namepath_index.keys()), sorted(index.keys()))
+        for namepath, element in index.iteritems():
+            self.assertIs(dsp.namepath_index[namepath], element)
+        dsp.clear_data()
+        self.assertEqual(dsp.namepath_index, {})
+
+    def test_doc_string_parser_parse_files_in_pool(self):
+        """Test if data collected by process pool is the same as collected in one process."""
+        filepaths = [
+            'testdocfilepackage.js', 'testdocfile1.js', 'testdocfile2.js', 'testdocfile3.js',
+        ]
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        for filepath in filepaths:
+            dsp.parse_file(filepath)
+        pool_dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        pool_dsp.PARALLEL_MIN_FILES = 1
+        pool_dsp.parse_files(filepaths, jobs=2)
+        self.assertEqual(pool_dsp.data, dsp.data)
+        self.assertEqual(pool_dsp.documentation_filepaths, dsp.documentation_filepaths)
+        # errors are raised like in one process
+        pool_dsp.clear_data()
+        self.assertRaises(
+            DocStringParser.InvalidTagException, pool_dsp.parse_files,
+            ['testdocfile1.js', 'testdocfile9.js', 'testdocfile10.js'], 2
+        )
+
+    def test_doc_string_parser_documented_file_callback(self):
+        """Test if callback is called once for every documented file as soon as file is parsed."""
+        filepaths = ['testdocfilepackage.js', 'testdocfile1.js', 'testdocfile2.js']
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        dsp.PARALLEL_MIN_FILES = 1
+        calls = []
+        dsp.documented_file_callback = lambda path: calls.append(
+            (path, len(dsp.documentation_filepaths))
+        )
+        dsp.parse_files(filepaths, jobs=2)
+        # every file was submitted while files were still parsed, before records were added
+        self.assertEqual(sorted(calls), sorted((path, 0) for path in dsp.documentation_filepaths))
+        dsp.parse_files(filepaths, jobs=2)
+        self.assertEqual(len(calls), len(set(dsp.documentation_filepaths)))
+
+    def test_doc_string_parser_compact_elements(self):
+        """Test if compact elements hold the same data as dictionaries."""
+        filepaths = [
+            'testdocfilepackage.js', 'testdocfile1.js', 'testdocfile2.js', 'testdocfile3.js',
+        ]
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        compact_dsp = DocStringParser(
+            self.tag_settings, self.doc_string_regex, self.tag_regex, compact_elements=True
+        )
+        for filepath in filepaths:
+            dsp.parse_file(filepath)
+            compact_dsp.parse_file(filepath)
+        self.assertEqual(compact_dsp.data, dsp.data)
+        self.assertEqual(json.loads(compact_dsp.data_json()), json.loads(dsp.data_json()))
+        entity_factory = compact_dsp.data['properties']['core']['properties']['EntityFactory']
+        factory = entity_factory['properties']['EntityFactory']
+        self.assertIsInstance(factory['attributes']['return'], Return)
+        self.assertEqual(factory['attributes']['return']['type']['ref'], None)
+        self.assertEqual(factory.get('doc_element_path'), None)
+        factory['doc_element_path'] = 'factory.html'
+        factory['custom'] = 'value'
+        self.assertEqual(factory['doc_element_path'], 'factory.html')
+        self.assertEqual(factory['custom'], 'value')
+        leaf = factory['properties']['currentEntityId']
+        self.assertEqual(len(leaf['properties']), 0)
+        self.assertRaises(TypeError, leaf['properties'].__setitem__, 'child', {})
+
+    def test_doc_string_parser_cache(self):
+        """Test if data collected with parse cache is the same as without it."""
+        filepaths = ['testdocfilepackage.js', 'testdocfile1.js', 'testdocfile2.js']
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        for filepath in filepaths:
+            dsp.parse_file(filepath)
+        for i in range(2):
+            cached_dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+            cached_dsp.cache = ParseCache('testparsecache', cached_dsp.get_settings_hash())
+            for filepath in filepaths:
+                cached_dsp.parse_file(filepath)
+            cached_dsp.cache.save()
+            self.assertEqual(cached_dsp.data, dsp.data)
+            self.assertEqual(cached_dsp.documentation_filepaths, dsp.documentation_filepaths)
+        self.assertEqual(cached_dsp.cache.hits, len(filepaths))
+        # changed settings invalidate cache
+        cached_dsp = DocStringParser(
+            self.tag_settings, self.doc_string_regex, self.tag_regex, ignore_invalid_tags=True
+        )
+        cached_dsp.cache = ParseCache('testparsecache', cached_dsp.get_settings_hash())
+        for filepath in filepaths:
+            cached_dsp.parse_file(filepath)
+        self.assertEqual(cached_dsp.cache.hits, 0)
+        os.remove('testparsecache')
+
+    def test_doc_string_parser_cache_changed_filepaths(self):
+        """Test if unchanged files are not read when changed files are known."""
+        filepaths = ['testdocfilepackage.js', 'testdocfile1.js', 'testdocfile2.js']
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        dsp.cache = ParseCache('testparsecache', dsp.get_settings_hash())
+        dsp.parse_files(filepaths)
+        dsp.cache.save()
+        file_contents.clear()
+        misses = file_contents.misses
+        cached_dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        cached_dsp.cache = ParseCache('testparsecache', cached_dsp.get_settings_hash())
+        cached_dsp.changed_filepaths = set(['testdocfile2.js'])
+        cached_dsp.parse_files(filepaths)
+        self.assertEqual(cached_dsp.data, dsp.data)
+        self.assertEqual(cached_dsp.cache.hits, len(filepaths))
+        # only changed file was read
+        self.assertEqual(file_contents.misses - misses, 1)
+        file_contents.clear()
+        os.remove('testparsecache')
+
     def test_get_doc_strings(self):
         """Test finding doc strings in a file."""
         dsp = DocStringParser(
             self.tag_settings, self.doc_string_regex, self.tag_regex
         )
-        doc_strings = dsp._get_doc_strings('testdocfile3.js', 'utf-8')
+        with codecs.open('testdocfile3.js', 'r', 'utf-8') as f:
+            text = f.read()
+            f.close()
+        doc_strings = dsp._get_doc_strings_from_text(text)
         doc_strings_check = [
             (1, 5, textwrap.dedent(u"""
                 File defines VelocityComponentFactory module.
@@ -780,6 +922,41 @@ class TestDocStringParser(unittest.TestCase):
         ]
         self.assertEqual(doc_strings, doc_strings_check)
 
+    def test_get_doc_strings_after_minified_line(self):
+        """Test finding doc strings in a text with very long line."""
+        text = (
+            'var a=1;/** not a doc string */' * 100000 + '\n' +
+            '    /** Minified.\n\n    @file minified\n    */\n'
+        )
+        dsp = DocStringParser(
+            self.tag_settings, self.doc_string_regex, self.tag_regex
+        )
+        doc_strings = dsp._get_doc_strings_from_text(text)
+        self.assertEqual(doc_strings, [(2, 5, 'Minified.\n\n@file minified\n')])
+
+    def test_doc_string_parser_skips_files(self):
+        """Test if big files, binary files and files without doc string opening tag are
+        skipped."""
+        with open('testdocfilebinary.js', 'wb') as f:
+            f.write('/** Binary.\n@file binary\n*/\nvar a = "\0";\n')
+            f.close()
+        with open('testdocfilenodocstrings.js', 'wb') as f:
+            f.write('# -*- coding: ascii -*-\nvar a = "\xff"; /* comment */\n')
+            f.close()
+        dsp = DocStringParser(self.tag_settings, self.doc_string_regex, self.tag_regex)
+        self.assertEqual(dsp._doc_string_open_literal, '/**')
+        # binary files are skipped by default, like with SKIP_BINARY_FILES setting
+        self.assertIsNone(dsp.get_file_records('testdocfilebinary.js'))
+        # file without opening tag is not decoded at all
+        self.assertIsNone(dsp.get_file_records('testdocfilenodocstrings.js'))
+        dsp.skip_binary_files = False
+        self.assertIsNotNone(dsp.get_file_records('testdocfilebinary.js'))
+        self.assertIsNotNone(dsp.get_file_records('testdocfile1.js'))
+        dsp.max_file_size = 10
+        self.assertIsNone(dsp.get_file_records('testdocfile1.js'))
+        os.remove('testdocfilebinary.js')
+        os.remove('testdocfilenodocstrings.js')
+
     def test_invalid_coding_in_source_file(self):
         """Raise error if encoding of file is invalid."""
         filepath = 'testdocfileinvalidutf8.js'
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import json
+import shutil
+import filecmp
+import unittest
+
+from jscribe.conf import settings
+from jscribe.core.docgenerator import DocumentationGenerator
+from jscribe.core.docstringparser import DocStringParser
+from jscribe.core.htmldocgenerator import HTMLDocumentationGenerator
+from jscribe.generators.html.htmldefaultgenerator import HTMLDefaultGenerator, convert_markup
+
+
+class TestHTMLDefaultGenerator(unittest.TestCase):
+
+    def setUp(self):
+        """Create source files."""
+        os.makedirs('testhtmlgenerator/src')
+        for index in range(3):
+            with open('testhtmlgenerator/src/module{}.js'.format(index), 'w') as f:
+                f.write(
+                    '/** Module {0}, see {{#module{1}.method}}.\n@module module{0}\n*/\n'
+                    '/** Method.\n@method .method\n@param x {{{{int}}}} - X.\n*/\n'
+                    'var method = function(x) {{ return x; }};\n'.format(index, (index + 1) % 3)
+                )
+                f.close()
+
+    def _write_source(self, filename, content):
+        with open(os.path.join('testhtmlgenerator/src', filename), 'w') as f:
+            f.write(content)
+            f.close()
+
+    def _create_template_generator(self, output_path, jobs, navigation_file=False):
+        settings_path = 'testhtmlgenerator/settings.json'
+        with open(settings_path, 'w') as f:
+            json.dump({
+                'INPUT_PATHS': ['./testhtmlgenerator/src'],
+                'DOCUMENTATION_OUTPUT_PATH': output_path,
+                'TAG_SETTINGS': 'jscribe.conf.jstagsettings',
+                'TEMPLATE_SETTINGS': {
+                    'SHOW_LINE_NUMBER': True, 'FOOTER_TEXT': 'Footer', 'TITLE': 'Generator',
+                    'ELEMENT_TEMPLATES': {}, 'NAVIGATION_FILE': navigation_file,
+                },
+            }, f)
+            f.close()
+        os.makedirs(output_path)
+        generator = DocumentationGenerator(settings_path, jobs=jobs)
+        template_generator = HTMLDocumentationGenerator(
+            generator.doc_data, generator.tag_settings, generator.documentation_filepaths
+        ).create_template_generator()
+        template_generator.PARALLEL_MIN_PAGES = 1
+        return template_generator
+
+    def _generate(self, output_path, jobs, navigation_file=False):
+        self._create_template_generator(output_path, jobs, navigation_file).generate_documentation()
+        settings.reset()
+
+    def test_pages_rendered_in_processes_are_the_same(self):
+        self._generate('testhtmlgenerator/serial/', 1)
+        self._generate('testhtmlgenerator/parallel/', 2)
+        filenames = sorted(os.listdir('testhtmlgenerator/serial'))
+        self.assertEqual(filenames, sorted(os.listdir('testhtmlgenerator/parallel')))
+        self.assertIn('module0.html', filenames)
+        match, mismatch, errors = filecmp.cmpfiles(
+            'testhtmlgenerator/serial', 'testhtmlgenerator/parallel', filenames, shallow=False
+        )
+        self.assertEqual((mismatch, errors), ([], []))
+
+    def test_navigation_is_written_to_shared_file(self):
+        self._generate('testhtmlgenerator/serial/', 1)
+        self._generate('testhtmlgenerator/shared/', 1, navigation_file=True)
+        with open('testhtmlgenerator/serial/module0.html') as f:
+            page = f.read()
+            f.close()
+        self.assertIn('title="module2">module2</a>', page)
+        with open('testhtmlgenerator/shared/module0.html') as f:
+            page = f.read()
+            f.close()
+        self.assertNotIn('title="module2">module2</a>', page)
+        self.assertIn('src="navigation-lists.html"', page)
+        with open('testhtmlgenerator/shared/navigation-lists.html') as f:
+            self.assertIn('title="module2">module2</a>', f.read())
+            f.close()
+
+    def test_errors_in_processes_are_raised(self):
+        def render_page(generator, job):
+            raise ValueError('Broken page')
+        original_render_page = HTMLDefaultGenerator.render_page
+        HTMLDefaultGenerator.render_page = render_page
+        try:
+            self.assertRaises(
+                HTMLDefaultGenerator.GeneratorException,
+                self._generate, 'testhtmlgenerator/parallel/', 2
+            )
+        finally:
+            HTMLDefaultGenerator.render_page = original_render_page
+
+    def test_references_in_descriptions(self):
+        references = {'a.b': u'<a href="a.html#b" title="a.b">a.b</a>', 'x.y': None}
+        self.assertEqual(
+            convert_markup(u'See {#a.b} and {#x.y}.', references),
+            u'<p>See <a href="a.html#b" title="a.b">a.b</a> and {#x.y}.</p>'
+        )
+        # references in code spans and code blocks are left as they are
+        self.assertEqual(
+            convert_markup(u'See `{#a.b}`.', references), u'<p>See <code>{#a.b}</code>.</p>'
+        )
+        self.assertEqual(
+            convert_markup(u'Code:\n\n    {#a.b}\n', references),
+            u'<p>Code:</p>\n<pre><code>{#a.b}\n</code></pre>'
+        )
+        # inline code block is highlighted before markdown could change it
+        markup = u'Code {$js /** doc **/ var a = 1; $}.'
+        self.assertIn(u'<strong>', convert_markup(markup))
+        html = convert_markup(markup, references, ('javascript', False))
+        self.assertNotIn(u'<strong>', html)
+        self.assertIn(u'<span class="cm">/** doc **/</span>', html)
+
+    def test_broken_reference_in_description_is_reported(self):
+        self._write_source('broken.js', '/** See {#module0.nothing}.\n@module broken\n*/\n')
+        with self.assertRaises(DocStringParser.InvalidElementPathException) as context:
+            self._generate('testhtmlgenerator/serial/', 1)
+        self.assertIn(u'module0.nothing', unicode(context.exception))
+
+    def test_url_table_is_the_same_as_urls_made_from_namepaths(self):
+        self._write_source('nested.js', (
+            '/** Package.\n@pack pkg "Package"\n*/\n'
+            '/** Module.\n@module pkg.mod "Module"\n*/\n'
+            '/** Class.\n@class .Cls "Class"\n*/\n'
+            '/** Method.\n@method .Cls.run\n*/\n'
+            '/** Function in not defined element.\n@function undefined.inner.fn\n*/\n'
+        ))
+        template_generator = self._create_template_generator('testhtmlgenerator/serial/', 1)
+        template_generator._prepare_element_data(template_generator.doc_data)
+        template_generator._build_url_table()
+        url_table = template_generator._url_table
+        self.assertEqual(url_table['pkg.mod.Cls.run'], ('pkg_mod.html#Cls_run', 'Cls_run'))
+        self.assertEqual(url_table['undefined.inner.fn'], ('undefined_inner.html#fn', 'fn'))
+        self.assertNotIn('undefined.inner', url_table)
+        for namepath in ['pkg', 'pkg.mod', 'pkg.mod.Cls', 'module0.method']:
+            self.assertIn(namepath, url_table)
+        for namepath, url in url_table.iteritems():
+            self.assertEqual(template_generator._make_url_from_namepath(namepath), url)
+
+    def test_broken_references_are_reported_at_once(self):
+        self._write_source('broken.js', (
+            '/** Module.\n@module broken\n*/\n'
+            '/** See {#module0.nothing}.\n@method .first\n@param x {{#nothing}} - X.\n*/\n'
+            '/** Method.\n@method .second\n@return {{#broken.nothing}} - Y.\n*/\n'
+        ))
+        with self.assertRaises(DocStringParser.InvalidElementPathException) as context:
+            self._generate('testhtmlgenerator/serial/', 1)
+        message = unicode(context.exception)
+        self.assertIn(u'Found 3 broken references', message)
+        self.assertIn(u'broken.first (/testhtmlgenerator/src/broken.js:4)', message)
+        self.assertIn(u'broken.second (/testhtmlgenerator/src/broken.js:8)', message)
+        for namepath in [u'module0.nothing', u'nothing', u'broken.nothing']:
+            self.assertIn(u'does not exist: {}\n'.format(namepath), message + u'\n')
+
+    def tearDown(self):
+        shutil.rmtree('testhtmlgenerator')
+        settings.reset()
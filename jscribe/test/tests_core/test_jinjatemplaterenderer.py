@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import shutil
+import unittest
+
+from jscribe.core.jinjatemplaterenderer import JinjaTemplateRenderer
+
+
+class TestJinjaTemplateRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.template_package = 'jscribe.templates.html.default'
+        self.context = {'navigation': u'<ul><li>Łużyński</li></ul>'}
+
+    def _render(self, renderer):
+        return renderer.render('navigationframe.html', self.context)
+
+    def test_templates_are_loaded_from_bytecode_cache(self):
+        rendered = self._render(JinjaTemplateRenderer(self.template_package, {}))
+        renderer = JinjaTemplateRenderer(
+            self.template_package, {}, bytecode_cache_path='testtemplatecache/bytecode'
+        )
+        self.assertEqual(self._render(renderer), rendered)
+        self.assertTrue(os.listdir('testtemplatecache/bytecode'))
+        renderer = JinjaTemplateRenderer(
+            self.template_package, {}, bytecode_cache_path='testtemplatecache/bytecode'
+        )
+        self.assertEqual(self._render(renderer), rendered)
+
+    def _assert_loaded_from_module(self, renderer, compiled_path):
+        template = renderer.env.get_template('navigationframe.html')
+        self.assertTrue(template.root_render_func.__module__.startswith('_jinja2_module_templates'))
+        self.assertIn(compiled_path, template.filename)
+
+    def test_templates_are_loaded_from_compiled_modules(self):
+        rendered = self._render(JinjaTemplateRenderer(self.template_package, {}))
+        # modules compiled from old templates and other directories
+        old_path = os.path.join('testtemplatecache/compiled', '2.0-{}'.format('0' * 40))
+        os.makedirs(old_path)
+        os.makedirs('testtemplatecache/compiled/other')
+        renderer = JinjaTemplateRenderer(
+            self.template_package, {}, compiled_templates_path='testtemplatecache/compiled'
+        )
+        self.assertEqual(self._render(renderer), rendered)
+        renderer.load_templates()
+        # one directory with modules compiled from current templates, old one is removed
+        compiled_paths = sorted(os.listdir('testtemplatecache/compiled'))
+        self.assertEqual(len(compiled_paths), 2)
+        self.assertIn(renderer.get_templates_hash(), compiled_paths[0])
+        self.assertEqual(compiled_paths[1], 'other')
+        compiled_path = os.path.join('testtemplatecache/compiled', compiled_paths[0])
+        self.assertTrue(os.listdir(compiled_path))
+        self._assert_loaded_from_module(renderer, compiled_path)
+        # bytecode cache is not used for compiled templates
+        renderer = JinjaTemplateRenderer(
+            self.template_package, {}, bytecode_cache_path='testtemplatecache/bytecode',
+            compiled_templates_path='testtemplatecache/compiled'
+        )
+        self.assertEqual(self._render(renderer), rendered)
+        self._assert_loaded_from_module(renderer, compiled_path)
+        self.assertEqual(sorted(os.listdir('testtemplatecache/compiled')), compiled_paths)
+        self.assertEqual(os.listdir('testtemplatecache/bytecode'), [])
+
+    def tearDown(self):
+        if os.path.isdir('testtemplatecache'):
+            shutil.rmtree('testtemplatecache')
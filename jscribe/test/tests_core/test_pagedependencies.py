@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import shutil
+import unittest
+
+from jscribe.conf import settings
+from jscribe.core.docgenerator import DocumentationGenerator
+from jscribe.core.htmldocgenerator import HTMLDocumentationGenerator
+from jscribe.test.helpers import write_settings, write_source
+
+
+class TestPageDependencies(unittest.TestCase):
+
+    def setUp(self):
+        """Create source files and settings."""
+        os.makedirs('testpagedependencies/src')
+        os.makedirs('testpagedependencies/out')
+        self.settings_path = 'testpagedependencies/settings.json'
+        write_settings(
+            self.settings_path, './testpagedependencies/src', {'TITLE': 'Pages'},
+            DOCUMENTATION_OUTPUT_PATH='./testpagedependencies/out/',
+            PAGE_DEPENDENCIES_PATH='testpagedependencies/pages',
+        )
+        write_source('testpagedependencies/src/a.js', 'pagesa', 'a')
+        write_source('testpagedependencies/src/b.js', 'pagesb', 'b')
+
+    def _generate(self):
+        generator = DocumentationGenerator(self.settings_path)
+        template_generator = HTMLDocumentationGenerator(
+            generator.doc_data, generator.tag_settings, generator.documentation_filepaths
+        ).create_template_generator()
+        template_generator.generate_documentation()
+        settings.reset()
+        # numbers of unchanged and generated pages
+        page_dependencies = template_generator.page_dependencies
+        return page_dependencies.hits, page_dependencies.misses
+
+    def test_only_pages_with_changed_inputs_are_generated(self):
+        # two element pages, two source pages and list of modules
+        self.assertEqual(self._generate(), (0, 5))
+        self.assertEqual(self._generate(), (5, 0))
+        # description of "b" is shown only on its page, source page of "b" changed too
+        write_source('testpagedependencies/src/b.js', 'pagesb', 'changed b')
+        self.assertEqual(self._generate(), (3, 2))
+        with open('testpagedependencies/out/pagesb.html') as f:
+            self.assertIn('changed b', f.read())
+            f.close()
+        # missing page is generated again
+        os.remove('testpagedependencies/out/pagesa.html')
+        self.assertEqual(self._generate(), (4, 1))
+        self.assertTrue(os.path.isfile('testpagedependencies/out/pagesa.html'))
+
+    def test_pages_of_removed_elements_are_removed(self):
+        self._generate()
+        self.assertTrue(os.path.isfile('testpagedependencies/out/pagesb.html'))
+        os.remove('testpagedependencies/src/b.js')
+        # list of modules is shown on every page
+        self.assertEqual(self._generate(), (0, 3))
+        self.assertFalse(os.path.isfile('testpagedependencies/out/pagesb.html'))
+        self.assertFalse(
+            os.path.isfile('testpagedependencies/out/testpagedependencies_src_b.js.html')
+        )
+        self.assertTrue(os.path.isfile('testpagedependencies/out/pagesa.html'))
+
+    def tearDown(self):
+        shutil.rmtree('testpagedependencies')
+        settings.reset()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import shutil
+import unittest
+
+from jscribe.core.sourcehighlighter import SourceHighlighter
+from jscribe.generators.html.htmldefaultgenerator import highlight_source, highlight_source_file
+
+
+class TestSourceHighlighter(unittest.TestCase):
+
+    def setUp(self):
+        """Create source files."""
+        os.makedirs('testsourcehighlighter')
+        self.paths = []
+        for index in range(3):
+            path = os.path.join('testsourcehighlighter', 'file{}.js'.format(index))
+            with open(path, 'w') as f:
+                f.write('var x{} = "{}";\n'.format(index, 'x' * 10 * index))
+                f.close()
+            self.paths.append(path)
+
+    def test_highlighted_sources_are_the_same(self):
+        highlighter = SourceHighlighter(highlight_source_file, ('javascript', True), 2)
+        for path in self.paths:
+            highlighter.submit(path)
+        highlighted_sources = highlighter.get_results()
+        self.assertEqual(sorted(highlighted_sources), self.paths)
+        for path in self.paths:
+            with open(path) as f:
+                code = f.read().decode('utf-8')
+                f.close()
+            self.assertEqual(highlighted_sources[path], highlight_source(code, 'javascript', True))
+
+    def test_size_limit_and_errors(self):
+        # size of first two highlighted sources, files are submitted one by one
+        max_size = sum(
+            len(highlight_source_file(path, 'javascript', True)) for path in self.paths[:2]
+        )
+        highlighter = SourceHighlighter(highlight_source_file, ('javascript', True), 1, max_size)
+        for path in self.paths:
+            highlighter.submit(path)
+        highlighted_sources = highlighter.get_results()
+        self.assertLessEqual(sum(len(source) for source in highlighted_sources.values()), max_size)
+        self.assertEqual(sorted(highlighted_sources), self.paths[:2])
+        # files that can't be highlighted are left for generator
+        highlighter = SourceHighlighter(highlight_source_file, ('nosuchlanguage', True), 2)
+        highlighter.submit(self.paths[0])
+        self.assertEqual(highlighter.get_results(), {})
+
+    def tearDown(self):
+        shutil.rmtree('testsourcehighlighter')
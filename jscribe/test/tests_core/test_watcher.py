@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import shutil
+import unittest
+
+from jscribe.conf import settings
+from jscribe.core.watcher import DocumentationWatcher
+from jscribe.generators.html.htmldefaultgenerator import HTMLDefaultGenerator
+from jscribe.test.helpers import write_settings, write_source
+
+
+class TestDocumentationWatcher(unittest.TestCase):
+
+    def setUp(self):
+        """Create source files and settings."""
+        os.makedirs('testwatcher/src')
+        os.makedirs('testwatcher/out')
+        self.settings_path = 'testwatcher/settings.json'
+        self._write_settings('Footer')
+        write_source('testwatcher/src/a.js', 'testwatcher', 'a')
+        write_source('testwatcher/src/b.js', 'testwatcher.b', 'b')
+
+    def _write_settings(self, footer_text):
+        write_settings(
+            self.settings_path, './testwatcher/src',
+            {'TITLE': 'Watcher', 'FOOTER_TEXT': footer_text},
+            DOCUMENTATION_OUTPUT_PATH='./testwatcher/out/',
+        )
+
+    def test_watcher_updates_changed_files(self):
+        watcher = DocumentationWatcher(self.settings_path)
+        watcher.generate_documentation()
+        self.assertEqual(watcher.parsed_files, 2)
+        self.assertTrue(os.path.isfile('testwatcher/out/testwatcher_b.html'))
+        self.assertFalse(watcher.update())
+        # only changed file is parsed, pages with unchanged inputs are not rendered
+        write_source('testwatcher/src/b.js', 'testwatcher.b', 'changed b')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 3)
+        rendered_pages = []
+        original_render_page = HTMLDefaultGenerator.render_page
+        def render_page(generator, job):
+            rendered_pages.append(job[:2])
+            return original_render_page(generator, job)
+        HTMLDefaultGenerator.render_page = render_page
+        try:
+            watcher.generate_documentation()
+        finally:
+            HTMLDefaultGenerator.render_page = original_render_page
+        self.assertEqual(sorted(rendered_pages), [
+            ('element', 'testwatcher_b.html'), ('source', './testwatcher/src/b.js'),
+        ])
+        with open('testwatcher/out/testwatcher_b.html') as f:
+            self.assertIn('changed b', f.read())
+            f.close()
+        # page of "a" module, its source page and list of modules didn't change
+        self.assertEqual(watcher.skipped_pages, 3)
+        # added and removed files
+        write_source('testwatcher/src/c.js', 'testwatcher.c', 'c')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 4)
+        watcher.generate_documentation()
+        self.assertTrue(os.path.isfile('testwatcher/out/testwatcher_c.html'))
+        os.remove('testwatcher/src/c.js')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 4)
+        self.assertEqual(len(watcher.documentation_filepaths), 2)
+        # pages that are not generated anymore are removed
+        watcher.generate_documentation()
+        self.assertFalse(os.path.isfile('testwatcher/out/testwatcher_c.html'))
+        # changed settings, every file is parsed again
+        self._write_settings('Changed footer')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 6)
+        self.assertEqual(settings.TEMPLATE_SETTINGS['FOOTER_TEXT'], 'Changed footer')
+        watcher.generate_documentation()
+        with open('testwatcher/out/testwatcher_b.html') as f:
+            self.assertIn('Changed footer', f.read())
+            f.close()
+        # removed template setting has default value again
+        self._write_settings(None)
+        self.assertTrue(watcher.update())
+        watcher.generate_documentation()
+        with open('testwatcher/out/testwatcher_b.html') as f:
+            page = f.read()
+            f.close()
+        self.assertNotIn('Changed footer', page)
+        self.assertIn('JSCRIBE', page)
+
+    def test_failed_update_is_not_repeated(self):
+        watcher = DocumentationWatcher(self.settings_path)
+        watcher.generate_documentation()
+        created_parsers = []
+        original_create_parser = watcher._create_parser
+        def create_parser():
+            created_parsers.append(True)
+            return original_create_parser()
+        watcher._create_parser = create_parser
+        write_source('testwatcher/src/b.js', 'testwatcher.b\n@invalidtag', 'b')
+        self.assertRaises(Exception, watcher.update)
+        self.assertEqual(len(created_parsers), 1)
+        # broken file is not parsed again until it changes
+        self.assertFalse(watcher.update())
+        self.assertEqual(len(created_parsers), 1)
+        write_source('testwatcher/src/b.js', 'testwatcher.b', 'fixed b')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 3)
+        # same for update after settings change
+        write_source('testwatcher/src/b.js', 'testwatcher.b\n@invalidtag', 'b')
+        self._write_settings('Changed footer')
+        self.assertRaises(Exception, watcher.update)
+        created_parsers[:] = []
+        self.assertFalse(watcher.update())
+        self.assertEqual(created_parsers, [])
+        write_source('testwatcher/src/b.js', 'testwatcher.b', 'fixed b')
+        self.assertTrue(watcher.update())
+        self.assertEqual(watcher.parsed_files, 5)
+        watcher.generate_documentation()
+        with open('testwatcher/out/testwatcher_b.html') as f:
+            self.assertIn('Changed footer', f.read())
+            f.close()
+
+    def tearDown(self):
+        shutil.rmtree('testwatcher')
+        settings.reset()
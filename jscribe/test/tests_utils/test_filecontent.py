@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import time
+import codecs
+import unittest
+
+from jscribe.utils.filecontent import FileContentCache
+
+
+class TestFileContentCache(unittest.TestCase):
+
+    def setUp(self):
+        """Create source files."""
+        self.filepaths = ['testfilecontent1.js', 'testfilecontent2.js', 'testfilecontent3.js']
+        for filepath in self.filepaths:
+            with codecs.open(filepath, 'w', 'utf-8') as f:
+                f.write(u'// -*- coding: utf-8 -*-\n// {} Łużyński\n'.format(filepath))
+                f.close()
+
+    def test_file_content_read_once(self):
+        file_contents = FileContentCache()
+        file_content = file_contents.get(self.filepaths[0])
+        self.assertEqual(file_content.coding, 'utf-8')
+        text = file_contents.get_text(self.filepaths[0])
+        self.assertEqual(text, u'// -*- coding: utf-8 -*-\n// testfilecontent1.js Łużyński\n')
+        self.assertIs(file_contents.get_text(self.filepaths[0]), text)
+        self.assertEqual((file_contents.hits, file_contents.misses), (2, 1))
+        self.assertEqual(file_contents.size, file_content.size)
+        # content is removed after it's needed for the last time
+        self.assertIs(file_contents.get_text(self.filepaths[0], keep=False), text)
+        self.assertEqual(file_contents.size, 0)
+
+    def test_file_content_modified(self):
+        file_contents = FileContentCache()
+        file_contents.get_text(self.filepaths[0])
+        time.sleep(0.01)
+        with open(self.filepaths[0], 'w') as f:
+            f.write('// modified file\n')
+            f.close()
+        self.assertEqual(file_contents.get_text(self.filepaths[0]), '// modified file\n')
+        self.assertEqual(file_contents.misses, 2)
+
+    def test_file_content_least_recently_used(self):
+        file_contents = FileContentCache()
+        file_contents.max_size = file_contents.get(self.filepaths[0]).size * 2
+        file_contents.get(self.filepaths[1])
+        file_contents.get(self.filepaths[0])
+        file_contents.get(self.filepaths[2])
+        self.assertLessEqual(file_contents.size, file_contents.max_size)
+        self.assertEqual(
+            list(file_contents._contents.keys()), [self.filepaths[0], self.filepaths[2]]
+        )
+
+    def tearDown(self):
+        for filepath in self.filepaths:
+            os.remove(filepath)
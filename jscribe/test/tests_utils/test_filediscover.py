@@ -2,10 +2,22 @@
 #!/usr/bin/env python
 
 import os
+import time
 import unittest
 import shutil
 
 from jscribe.utils.file import discover_files
+from jscribe.utils.discovery import FileDiscovery, list_directory
+from jscribe.utils.discoverycache import DiscoveryCache
+from jscribe.utils.gitfiles import GitException, run_git, list_changed_files
+
+
+def is_git_available():
+    try:
+        run_git(['--version'], '.')
+    except GitException:
+        return False
+    return True
 
 
 class TestFileDiscover(unittest.TestCase):
@@ -110,6 +122,165 @@ class TestFileDiscover(unittest.TestCase):
         )
         self.assertEqual(set(found_paths), paths_to_find)
 
+    def test_discover_files_prunes_ignored_dirs(self):
+        # subdirectories of ignored directory are ignored too
+        input_paths = [u'2/']
+        ignore_paths = [r'2/1$', r'nothing']
+        input_regex = r'^.*?[.]test$'
+        ignore_regex = r'^.*?ignore[.]test$'
+        paths_to_find = [u'2/1ąśęłó.test', u'2/2ąśęłó.test']
+        found_paths = discover_files(
+            input_paths, input_regex, ignore_paths_regex=ignore_paths, ignore_regex=ignore_regex
+        )
+        self.assertEqual(sorted(found_paths), paths_to_find)
+
+    def test_discover_files_overlapping_paths(self):
+        # files are discovered once, even if input paths overlap or are symlinks
+        os.symlink(os.path.abspath(u'2/1'), u'1/link')
+        input_paths = [u'2/', u'1/link', u'2/1/']
+        input_regex = r'^.*?[.]test$'
+        ignore_regex = r'^.*?ignore[.]test$'
+        paths_to_find = [
+            u'2/1/1/1/1ąśęłó.test', u'2/1/1/1/2ąśęłó.test', u'2/1/1ąśęłó.test', u'2/1/2ąśęłó.test',
+            u'2/1ąśęłó.test', u'2/2ąśęłó.test',
+        ]
+        found_paths = discover_files(input_paths, input_regex, ignore_regex=ignore_regex)
+        self.assertEqual(sorted(found_paths), paths_to_find)
+        os.remove(u'1/link')
+
+    def test_discover_files_ignore_files(self):
+        # files and directories matched by patterns from ignore files are not discovered
+        with open(u'2/.jscribeignore', 'w') as f:
+            f.write('*ignore.test\n/1/1/\n')
+            f.close()
+        with open(u'2/1/.jscribeignore', 'w') as f:
+            f.write('2*.test\n')
+            f.close()
+        input_paths = [u'2/']
+        input_regex = r'^.*?[.]test$'
+        paths_to_find = [u'2/1/1ąśęłó.test', u'2/1ąśęłó.test', u'2/2ąśęłó.test']
+        found_paths = discover_files(
+            input_paths, input_regex, ignore_files=['.gitignore', '.jscribeignore']
+        )
+        self.assertEqual(sorted(found_paths), paths_to_find)
+
+    def test_discover_files_cache(self):
+        # unchanged directories are taken from cache, result is the same as without cache
+        cache_path = 'testdiscoverycache'
+        input_paths = [u'1/', u'2/']
+        input_regex = r'^.*?[.]test$'
+        ignore_regex = r'^.*?ignore[.]test$'
+        # directories modified just now are racy and they are not cached
+        past = time.time() - 100
+        for input_path in input_paths:
+            for dir_path, dir_names, file_names in os.walk(input_path):
+                os.utime(dir_path, (past, past))
+        expected_paths = discover_files(input_paths, input_regex, ignore_regex=ignore_regex)
+        try:
+            for run in range(2):
+                discovery = FileDiscovery(input_regex, ignore_regex=ignore_regex)
+                discovery.cache = DiscoveryCache(cache_path, discovery.get_settings_hash())
+                self.assertEqual(discovery.discover(input_paths), expected_paths)
+                discovery.cache.save()
+            self.assertEqual((discovery.cache.hits, discovery.cache.misses), (11, 0))
+            # cache file is not written again when nothing changed
+            os.utime(cache_path, (1, 1))
+            self.assertEqual(
+                discover_files(input_paths, input_regex, ignore_regex=ignore_regex,
+                               cache_path=cache_path),
+                expected_paths
+            )
+            self.assertEqual(os.path.getmtime(cache_path), 1)
+            # new file changes modification time of its directory
+            with open(u'2/1/3ąśęłó.test', 'w') as f:
+                f.close()
+            discovery = FileDiscovery(input_regex, ignore_regex=ignore_regex)
+            discovery.cache = DiscoveryCache(cache_path, discovery.get_settings_hash())
+            found_paths = discovery.discover(input_paths)
+            self.assertEqual((discovery.cache.hits, discovery.cache.misses), (10, 1))
+            self.assertEqual(sorted(found_paths), sorted(expected_paths + [u'2/1/3ąśęłó.test']))
+            # cache made with different settings is not used
+            discovery = FileDiscovery(input_regex)
+            discovery.cache = DiscoveryCache(cache_path, discovery.get_settings_hash())
+            self.assertEqual(len(discovery.discover(input_paths)), 33)
+            self.assertEqual(discovery.cache.hits, 0)
+        finally:
+            os.remove(cache_path)
+
+    def test_discover_files_threads(self):
+        # directories listed by many threads give the same files in the same order
+        os.symlink(os.path.abspath(u'2/1'), u'1/link')
+        with open(u'1/.jscribeignore', 'w') as f:
+            f.write('/2/2/\n*2ąśęłó.test\n')
+            f.close()
+        input_paths = [u'1/', u'2/', u'1/2/']
+        input_regex = r'^.*?[.]test$'
+        ignore_paths = [r'2/1/1$']
+        for ignore_files in [(), ['.jscribeignore']]:
+            expected_paths = discover_files(
+                input_paths, input_regex, ignore_paths_regex=ignore_paths, ignore_files=ignore_files
+            )
+            found_paths = discover_files(
+                input_paths, input_regex, ignore_paths_regex=ignore_paths, ignore_files=ignore_files,
+                threads=4
+            )
+            self.assertEqual(found_paths, expected_paths)
+        self.assertNotIn(u'1/2/2/1ąśęłó.test', found_paths)
+        self.assertNotIn(u'1/1/1/2ąśęłó.test', found_paths)
+        self.assertIn(u'1/1/1/1ąśęłó.test', found_paths)
+        os.remove(u'1/link')
+
+    def test_list_directory(self):
+        # symlinks are listed by type of their target, broken symlink is listed as file
+        os.symlink(os.path.abspath(u'2/1'), u'2/dirlink')
+        os.symlink(os.path.abspath(u'2/1ąśęłó.test'), u'2/filelink')
+        os.symlink(os.path.abspath(u'2/nothing'), u'2/brokenlink')
+        filenames, dirnames = list_directory(u'2/')
+        self.assertEqual(sorted(dirnames), [(u'1', False), (u'dirlink', True)])
+        self.assertEqual(sorted(filenames), [
+            (u'1ąśęłó.test', False), (u'1ąśęłóignore.test', False), (u'2ąśęłó.test', False),
+            (u'2ąśęłóignore.test', False), (u'brokenlink', True), (u'filelink', True),
+        ])
+        self.assertEqual(list_directory(u'2/nothing'), ([], []))
+
+    @unittest.skipUnless(is_git_available(), 'git is not installed')
+    def test_discover_files_git(self):
+        # files are listed from git index, untracked files are not discovered
+        git_config = ['-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        run_git(['init', '-q'], u'2/')
+        run_git(['add', u'1'], u'2/')
+        run_git(git_config + ['commit', '-q', '-m', 'Test.'], u'2/')
+        input_paths = [u'2/']
+        input_regex = r'^.*?[.]test$'
+        ignore_paths = [r'2/1/1$']
+        ignore_regex = r'^.*?ignore[.]test$'
+        found_paths = discover_files(
+            input_paths, input_regex, ignore_paths_regex=ignore_paths, ignore_regex=ignore_regex,
+            backend='git'
+        )
+        self.assertEqual(found_paths, [u'2/1/1ąśęłó.test', u'2/1/2ąśęłó.test'])
+        # changed and untracked files
+        with open(u'2/1/1ąśęłó.test', 'w') as f:
+            f.write('changed')
+            f.close()
+        self.assertEqual(sorted(list_changed_files(u'2/', 'HEAD')), [
+            u'2/1/1ąśęłó.test', u'2/1ąśęłó.test', u'2/1ąśęłóignore.test', u'2/2ąśęłó.test',
+            u'2/2ąśęłóignore.test',
+        ])
+        # tracked files are ignored by ignore files like when directories are walked
+        with open(u'2/.jscribeignore', 'w') as f:
+            f.write('1/2*.test\n')
+            f.close()
+        with open(u'2/1/.jscribeignore', 'w') as f:
+            f.write('/1/\n')
+            f.close()
+        run_git(['add', u'1/1'], u'2/')
+        found_paths = discover_files(
+            input_paths, input_regex, ignore_regex=ignore_regex, ignore_files=['.jscribeignore'],
+            backend='git'
+        )
+        self.assertEqual(found_paths, [u'2/1/1ąśęłó.test'])
+
     def tearDown(self):
         """Remove test dir tree and files."""
         for dir_path in self.dir_paths:
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import unittest
+
+from jscribe.utils.highlightcache import HighlightCache
+
+
+class TestHighlightCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_path = 'testhighlightcache'
+
+    def test_least_recently_used_code_is_removed(self):
+        highlight_cache = HighlightCache(max_size=10)
+        keys = [highlight_cache.get_key(u'x = {};'.format(index), 'javascript') for index in range(3)]
+        self.assertNotEqual(keys[0], highlight_cache.get_key(u'x = 0;', 'python'))
+        highlight_cache.set(keys[0], u'aaaa')
+        highlight_cache.set(keys[1], u'bbbb')
+        self.assertEqual(highlight_cache.get(keys[0]), u'aaaa')
+        highlight_cache.set(keys[2], u'cccc')
+        self.assertIsNone(highlight_cache.get(keys[1]))
+        self.assertEqual(highlight_cache.get(keys[0]), u'aaaa')
+        self.assertEqual(highlight_cache.size, 8)
+        self.assertEqual((highlight_cache.hits, highlight_cache.misses), (2, 1))
+
+    def test_new_entries_are_added_to_other_cache(self):
+        highlight_cache = HighlightCache()
+        highlight_cache.set('a', u'aaaa')
+        highlight_cache.get('a')
+        # entries are recorded only after recording is started, i.e. in process of pool
+        highlight_cache.record_new_entries()
+        self.assertEqual(highlight_cache.take_new_entries(), ([], 0, 0))
+        highlight_cache.get('a')
+        highlight_cache.get('b')
+        highlight_cache.set('b', u'Łużyński')
+        new_entries = highlight_cache.take_new_entries()
+        self.assertEqual(new_entries, ([('b', u'Łużyński')], 1, 1))
+        self.assertEqual(highlight_cache.take_new_entries(), ([], 0, 0))
+        main_cache = HighlightCache()
+        main_cache.add_new_entries(new_entries)
+        self.assertEqual((main_cache.hits, main_cache.misses), (1, 1))
+        self.assertEqual(main_cache.get('b'), u'Łużyński')
+        self.assertEqual(main_cache.take_new_entries(), ([], 2, 1))
+
+    def test_cache_is_saved_and_loaded(self):
+        highlight_cache = HighlightCache()
+        highlight_cache.set('a', u'aaaa')
+        highlight_cache.set('b', u'bbbb')
+        highlight_cache.save(self.cache_path)
+        loaded_cache = HighlightCache(max_size=4)
+        loaded_cache.load(self.cache_path)
+        # least recently used code doesn't fit
+        self.assertIsNone(loaded_cache.get('a'))
+        self.assertEqual(loaded_cache.get('b'), u'bbbb')
+        self.assertEqual(loaded_cache.take_new_entries(), ([], 1, 1))
+        # invalid file is ignored
+        with open(self.cache_path, 'w') as f:
+            f.write('invalid')
+            f.close()
+        loaded_cache = HighlightCache()
+        loaded_cache.load(self.cache_path)
+        self.assertEqual(loaded_cache.size, 0)
+
+    def tearDown(self):
+        if os.path.isfile(self.cache_path):
+            os.remove(self.cache_path)
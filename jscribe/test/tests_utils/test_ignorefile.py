@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import unittest
+
+from jscribe.utils.ignorefile import IgnoreFile, IgnoreFilesMatcher
+
+
+class TestIgnoreFile(unittest.TestCase):
+
+    def test_ignore_file_patterns(self):
+        ignore_file = IgnoreFile([
+            u'# comment', u'', u'*.min.js', u'build/', u'/vendor', u'docs/**/*.js', u'lib/a?.js',
+            u'tmp[0-9].js', u'\\#hash.js', u'trailing.js   ',
+        ])
+        self.assertTrue(ignore_file.match(u'app.min.js', False))
+        self.assertTrue(ignore_file.match(u'src/app.min.js', False))
+        self.assertIsNone(ignore_file.match(u'app.js', False))
+        # directory only pattern
+        self.assertTrue(ignore_file.match(u'src/build', True))
+        self.assertIsNone(ignore_file.match(u'src/build', False))
+        # anchored pattern
+        self.assertTrue(ignore_file.match(u'vendor', True))
+        self.assertIsNone(ignore_file.match(u'src/vendor', True))
+        self.assertTrue(ignore_file.match(u'docs/a.js', False))
+        self.assertTrue(ignore_file.match(u'docs/a/b/c.js', False))
+        self.assertIsNone(ignore_file.match(u'src/docs/a.js', False))
+        self.assertTrue(ignore_file.match(u'lib/ab.js', False))
+        self.assertIsNone(ignore_file.match(u'lib/abc.js', False))
+        self.assertTrue(ignore_file.match(u'tmp1.js', False))
+        self.assertIsNone(ignore_file.match(u'tmpx.js', False))
+        self.assertTrue(ignore_file.match(u'#hash.js', False))
+        self.assertTrue(ignore_file.match(u'trailing.js', False))
+
+    def test_ignore_file_negation(self):
+        ignore_file = IgnoreFile([u'*.js', u'!keep.js', u'keep.js.bak', u'!*.txt', u'secret.txt'])
+        self.assertTrue(ignore_file.match(u'a.js', False))
+        self.assertFalse(ignore_file.match(u'keep.js', False))
+        self.assertTrue(ignore_file.match(u'secret.txt', False))
+        self.assertFalse(ignore_file.match(u'other.txt', False))
+
+    def test_ignore_files_matcher(self):
+        matcher = IgnoreFilesMatcher().extend(u'/project', IgnoreFile([u'*.js', u'!/src/']))
+        matcher = matcher.extend(u'/project/src', IgnoreFile([u'!main.js']))
+        self.assertTrue(matcher.is_ignored(u'/project/app.js', False))
+        self.assertFalse(matcher.is_ignored(u'/project/src', True))
+        # deeper ignore file wins
+        self.assertFalse(matcher.is_ignored(u'/project/src/main.js', False))
+        self.assertTrue(matcher.is_ignored(u'/project/src/other.js', False))
+        self.assertFalse(matcher.is_ignored(u'/project/README', False))
+        # ignore files without patterns are not added
+        self.assertIs(matcher.extend(u'/project/src/lib', IgnoreFile([u'# comment'])), matcher)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import unittest
+
+from markdown import markdown
+
+from jscribe.utils.markupcache import MarkupCache, markup_cache
+from jscribe.generators.html.htmldefaultgenerator import convert_markup
+
+
+class TestMarkupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_path = 'testmarkupcache'
+        markup_cache.clear()
+
+    def test_markup_is_converted_like_with_new_markdown_instance(self):
+        descriptions = [
+            u'', u'Some *text*, Łużyński.', u'[link]: http://example.com\n\nSee [link].',
+            u'See [link].', u'- one\n- two\n\n<div class="x">html</div>',
+        ]
+        for description in descriptions:
+            self.assertEqual(
+                convert_markup(description), markdown(description, output_format='html5')
+            )
+        # link defined in other description is not used
+        self.assertNotIn(u'<a', convert_markup(u'See [link].'))
+
+    def test_markup_is_converted_once(self):
+        hits = markup_cache.hits
+        html = convert_markup(u'Some *text*.')
+        self.assertIs(convert_markup(u'Some *text*.'), html)
+        self.assertEqual(markup_cache.hits, hits + 1)
+        markup_cache.save(self.cache_path)
+        loaded_cache = MarkupCache()
+        loaded_cache.load(self.cache_path)
+        self.assertEqual(loaded_cache.get(loaded_cache.get_key(u'Some *text*.', [], None)), html)
+
+    def tearDown(self):
+        markup_cache.clear()
+        if os.path.isfile(self.cache_path):
+            os.remove(self.cache_path)
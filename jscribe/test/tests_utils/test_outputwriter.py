@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+import os
+import json
+import shutil
+import unittest
+
+from jscribe.utils.outputwriter import OutputWriter
+
+
+class TestOutputWriter(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs('testoutputwriter')
+        self.filepath = os.path.join('testoutputwriter', 'page.html')
+
+    def _read(self, filepath):
+        with open(filepath, 'rb') as f:
+            content = f.read()
+            f.close()
+        return content
+
+    def test_unchanged_file_is_not_written(self):
+        writer = OutputWriter()
+        self.assertTrue(writer.write(self.filepath, 'content'))
+        os.utime(self.filepath, (1, 1))
+        self.assertFalse(writer.write(self.filepath, 'content'))
+        self.assertEqual(os.path.getmtime(self.filepath), 1)
+        # content of the same size
+        self.assertTrue(writer.write(self.filepath, 'changed'))
+        self.assertEqual(self._read(self.filepath), 'changed')
+        self.assertEqual(os.listdir('testoutputwriter'), ['page.html'])
+        copy_path = os.path.join('testoutputwriter', 'copy.html')
+        self.assertTrue(writer.copy(self.filepath, copy_path))
+        self.assertFalse(writer.copy(self.filepath, copy_path))
+        self.assertEqual(writer.written, [self.filepath, self.filepath, copy_path])
+        self.assertEqual(writer.unchanged, [self.filepath, copy_path])
+
+    def test_manifest(self):
+        writer = OutputWriter()
+        writer.write(self.filepath, 'content')
+        writer.mark_unchanged(os.path.join('testoutputwriter', 'b.html'))
+        writer.mark_unchanged(os.path.join('testoutputwriter', 'a.html'))
+        writer.mark_deleted(os.path.join('testoutputwriter', 'old.html'))
+        manifest_path = os.path.join('testoutputwriter', 'manifest.json')
+        writer.save_manifest(manifest_path, 'testoutputwriter')
+        self.assertEqual(json.loads(self._read(manifest_path)), {
+            'written': ['page.html'], 'unchanged': ['a.html', 'b.html'], 'deleted': ['old.html'],
+        })
+
+    def test_files_not_generated_anymore_are_removed(self):
+        manifest_path = os.path.join('testoutputwriter', 'manifest.json')
+        writer = OutputWriter()
+        writer.write(self.filepath, 'content')
+        writer.write(os.path.join('testoutputwriter', 'old.html'), 'content')
+        writer.save_manifest(manifest_path, 'testoutputwriter')
+        with open(os.path.join('testoutputwriter', 'user.html'), 'w') as f:
+            f.write('not generated')
+            f.close()
+        writer = OutputWriter()
+        writer.write(self.filepath, 'content')
+        writer.remove_stale_files(manifest_path, 'testoutputwriter')
+        writer.save_manifest(manifest_path, 'testoutputwriter')
+        self.assertEqual(json.loads(self._read(manifest_path)), {
+            'written': [], 'unchanged': ['page.html'], 'deleted': ['old.html'],
+        })
+        # files that are not in manifest are left
+        self.assertEqual(
+            sorted(os.listdir('testoutputwriter')), ['manifest.json', 'page.html', 'user.html']
+        )
+
+    def tearDown(self):
+        shutil.rmtree('testoutputwriter')
@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Source files discovery engine used by {#jscribe.utils.file.discover_files}.
+
+Directories are walked top-down, in the same order as `os.walk` walks them, but ignored
+directories are pruned before their content is listed. Directory entries are listed with
+`scandir` (from `os` module or from *scandir* package if it's installed), so types of entries are
+known without extra `stat` calls, otherwise `os.listdir` is used.
+
+With {#jscribe.utils.discoverycache.DiscoveryCache} directories that didn't change since last run
+are not listed at all. On high-latency filesystems directories can be listed by many threads at
+once, see {#jscribe.utils.discovery.FileDiscovery.threads}.
+@module jscribe.utils.discovery
+@author Rafał Łużyński
+"""
+
+import os
+import re
+import json
+import stat
+import time
+import hashlib
+from multiprocessing.pool import ThreadPool
+
+from jscribe.utils.ignorefile import IgnoreFile, IgnoreFilesMatcher
+from jscribe.utils.discoverycache import get_directory_signature
+from jscribe.utils.gitfiles import list_git_files
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+# regexes that can't be merged into one alternation: group references and global inline flags
+_NOT_MERGEABLE_REGEX_OBJ = re.compile(r'\\[1-9]|\(\?P=|\(\?[iLmsux]+\)')
+
+
+def compile_alternation(regexes):
+    """* Returns function that checks if any of given regexes matches beginning of string. Regexes
+    are merged into one compiled alternation, if that's possible.
+    @function jscribe.utils.discovery.compile_alternation
+    @param regexes {{list}}
+    @return {{function|None}} - Function that takes string and returns `True` if any regex matches
+        it, `None` if there are no regexes.
+    """
+    regexes = list(regexes)
+    if not regexes:
+        return None
+    if not any(_NOT_MERGEABLE_REGEX_OBJ.search(regex) for regex in regexes):
+        try:
+            regex_obj = re.compile('|'.join('(?:' + regex + ')' for regex in regexes))
+        except (re.error, UnicodeError):
+            pass
+        else:
+            return lambda string: regex_obj.match(string) is not None
+    regex_objs = [re.compile(regex) for regex in regexes]
+    return lambda string: any(regex_obj.match(string) is not None for regex_obj in regex_objs)
+
+
+def list_directory(dirpath):
+    """* Lists directory entries.
+    @function jscribe.utils.discovery.list_directory
+    @param dirpath {{str}}
+    @return {{tuple}} - Two lists of tuples: *name*, *is entry a symlink*, first for files (and
+        symlinks to files), second for subdirectories. Both are empty if directory can't be
+        listed.
+    """
+    filenames = []
+    dirnames = []
+    try:
+        if scandir is not None:
+            for entry in scandir(dirpath):
+                if entry.is_dir():
+                    dirnames.append((entry.name, entry.is_symlink()))
+                else:
+                    filenames.append((entry.name, entry.is_symlink()))
+        else:
+            for name in os.listdir(dirpath):
+                path = os.path.join(dirpath, name)
+                # one stat call per entry, only symlinks are followed
+                is_symlink = False
+                try:
+                    mode = os.lstat(path).st_mode
+                    is_symlink = stat.S_ISLNK(mode)
+                    if is_symlink:
+                        mode = os.stat(path).st_mode
+                except OSError:
+                    # entry removed while listing or broken symlink, it's not a directory
+                    mode = 0
+                if stat.S_ISDIR(mode):
+                    dirnames.append((name, is_symlink))
+                else:
+                    filenames.append((name, is_symlink))
+    except OSError:
+        # like os.walk, directories that can't be listed are skipped
+        return [], []
+    return filenames, dirnames
+
+
+class FileDiscovery(object):
+    """* Finds source files in directory trees.
+
+    Symlinked directories are not followed, like in `os.walk`. Directory that was already walked
+    (i.e. because it's inside other input path, or input path is a symlink to it) is not walked
+    again, and file that is a symlink to already found file is skipped.
+
+    If names of ignore files are given, then files with these names (i.e. `.gitignore`) are loaded
+    from every walked directory, and from parent directories of input path up to the root of its
+    git repository. Files and directories matched by their patterns are skipped, like in git.
+    @class jscribe.utils.discovery.FileDiscovery
+    """
+
+    def __init__(self, input_regex, ignore_paths_regex=(), ignore_regex=None, ignore_files=()):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param input_regex {{str}} - Regex that matches names of files that should be discovered.
+        @param ignore_paths_regex=() {{list}} - Regexes that match paths to ignored directories,
+            their subdirectories are ignored too.
+        @param ignore_regex=None {{str}} - Regex that matches names of files that must not be
+            discovered.
+        @param ignore_files=() {{list}} - Names of gitignore-style files.
+        """
+        self._input_regex_obj = re.compile(input_regex)
+        self._ignore_regex_obj = None
+        if ignore_regex is not None:
+            self._ignore_regex_obj = re.compile(ignore_regex)
+        self._input_regex = input_regex
+        self._ignore_regex = ignore_regex
+        self._is_ignored_path = compile_alternation(ignore_paths_regex)
+        self._ignore_files = list(ignore_files or ())
+        """* Discovery cache, if set then only directories that changed since last run are listed.
+        @valtype {{#jscribe.utils.discoverycache.DiscoveryCache}}
+        @attribute .cache
+        """
+        self.cache = None
+        """* Number of threads that list directories. If greater than 1, then directories of every
+        level of tree are listed concurrently before files are collected, result is the same as
+        with one thread.
+        @valtype {{int}}
+        @attribute .threads
+        """
+        self.threads = 1
+
+    def get_settings_hash(self):
+        """* Returns hash of settings that have impact on directory entries stored in cache.
+        Ignored paths are not included, since they are checked when cached directories are
+        walked.
+        @method .get_settings_hash
+        @param self
+        @return {{str}}
+        """
+        discovery_settings = json.dumps(
+            [self._input_regex, self._ignore_regex, self._ignore_files], sort_keys=True
+        )
+        return hashlib.sha1(discovery_settings).hexdigest()
+
+    def discover(self, input_paths):
+        """* Returns paths of discovered files.
+        @method .discover
+        @param self
+        @param input_paths {{list}} - Paths to directories with source files.
+        @return {{list}}
+        """
+        filepaths = []
+        visited_dirs = set()
+        found_files = set()
+        pool = None
+        if self.threads > 1:
+            pool = ThreadPool(self.threads)
+        try:
+            for input_path in input_paths:
+                if not os.path.isdir(input_path):
+                    continue
+                self._walk(input_path, filepaths, visited_dirs, found_files, pool)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return filepaths
+
+    def discover_git(self, input_paths):
+        """* Returns paths of discovered files, files are listed from git index instead of walking
+        directories. Ignored paths, input regex, ignore regex and ignore files are used like in
+        {#jscribe.utils.discovery.FileDiscovery.discover}, so files tracked by git can be ignored
+        too, i.e. by `.jscribeignore`. Files removed from working tree are skipped.
+        @method .discover_git
+        @param self
+        @param input_paths {{list}} - Paths to directories inside git repository.
+        @return {{list}} - Paths of files in git order, they are built the same way as in
+            {#jscribe.utils.discovery.FileDiscovery.discover}, so the same file has the same path.
+        """
+        filepaths = []
+        found_files = set()
+        # directories are shared by many files, so every directory is checked once
+        ignored_dirs = {}
+        for input_path in input_paths:
+            if not os.path.isdir(input_path):
+                continue
+            real_input_path = os.path.realpath(input_path)
+            matchers = {}
+            for filepath in list_git_files(input_path):
+                dirpath, filename = os.path.split(filepath)
+                if not self.is_source_file(filename):
+                    continue
+                if self._is_in_ignored_dir(input_path, dirpath, ignored_dirs):
+                    continue
+                if self._ignore_files:
+                    matcher = self._get_git_dir_matcher(
+                        input_path, real_input_path, dirpath, matchers
+                    )
+                    if matcher is None or matcher.is_ignored(
+                        os.path.join(real_input_path, os.path.relpath(filepath, input_path)), False
+                    ):
+                        continue
+                real_filepath = os.path.realpath(filepath)
+                if real_filepath in found_files or not os.path.isfile(filepath):
+                    continue
+                found_files.add(real_filepath)
+                filepaths.append(filepath)
+        return filepaths
+
+    def _get_git_dir_matcher(self, input_path, real_input_path, dirpath, matchers):
+        """* Returns matcher with ignore files of directory and its parents, like the one made when
+        directory is walked.
+        @method ._get_git_dir_matcher
+        @param self
+        @param input_path {{str}}
+        @param real_input_path {{str}}
+        @param dirpath {{str}} - Directory inside input path.
+        @param matchers {{dict}} - Matchers of directories checked before.
+        @private
+        @return {{#jscribe.utils.ignorefile.IgnoreFilesMatcher}} - `None` if directory is
+            ignored by ignore files of its parents.
+        """
+        if dirpath in matchers:
+            return matchers[dirpath]
+        if os.path.normpath(dirpath) == os.path.normpath(input_path):
+            real_dirpath = real_input_path
+            matcher = self._get_parent_ignore_files_matcher(real_input_path)
+        else:
+            real_dirpath = os.path.join(real_input_path, os.path.relpath(dirpath, input_path))
+            matcher = self._get_git_dir_matcher(
+                input_path, real_input_path, os.path.dirname(dirpath), matchers
+            )
+            if matcher is not None and matcher.is_ignored(real_dirpath, True):
+                matcher = None
+        if matcher is not None:
+            filenames = [
+                (filename, False) for filename in self._ignore_files
+                if os.path.isfile(os.path.join(dirpath, filename))
+            ]
+            matcher = self._extend_ignore_files_matcher(matcher, dirpath, real_dirpath, filenames)
+        matchers[dirpath] = matcher
+        return matcher
+
+    def _is_in_ignored_dir(self, input_path, dirpath, ignored_dirs):
+        # directory is ignored if it or any of its parents inside input path is ignored
+        if self._is_ignored_path is None:
+            return False
+        ignored = ignored_dirs.get(dirpath)
+        if ignored is None:
+            if os.path.normpath(dirpath) == os.path.normpath(input_path):
+                # walk checks input path as it was given
+                ignored = self.is_ignored_dir(input_path)
+            else:
+                ignored = self.is_ignored_dir(dirpath) or self._is_in_ignored_dir(
+                    input_path, os.path.dirname(dirpath), ignored_dirs
+                )
+            ignored_dirs[dirpath] = ignored
+        return ignored
+
+    def is_ignored_dir(self, dirpath):
+        """* Checks if directory is ignored.
+        @method .is_ignored_dir
+        @param self
+        @param dirpath {{str}}
+        @return {{boolean}}
+        """
+        return self._is_ignored_path is not None and self._is_ignored_path(dirpath)
+
+    def is_source_file(self, filename):
+        """* Checks if file name matches input regex and doesn't match ignore regex.
+        @method .is_source_file
+        @param self
+        @param filename {{str}}
+        @return {{boolean}}
+        """
+        if self._ignore_regex_obj is not None and self._ignore_regex_obj.match(filename):
+            return False
+        return self._input_regex_obj.match(filename) is not None
+
+    def _walk(self, top, filepaths, visited_dirs, found_files, pool=None):
+        real_top = os.path.realpath(top)
+        top_matcher = self._get_parent_ignore_files_matcher(real_top)
+        listings = {}
+        if pool is not None:
+            listings = self._read_tree(top, real_top, top_matcher, visited_dirs, pool)
+        # stack of directories to walk: path, real path, ignore files matcher
+        stack = [(top, real_top, top_matcher)]
+        while stack:
+            dirpath, real_dirpath, matcher = stack.pop()
+            if real_dirpath in visited_dirs or self.is_ignored_dir(dirpath):
+                continue
+            visited_dirs.add(real_dirpath)
+            listing = listings.pop(real_dirpath, None)
+            if listing is None:
+                listing = self._read_directory(dirpath, real_dirpath, matcher)
+            filenames, dirnames, matcher = listing
+            for filename, is_symlink in filenames:
+                if not self.is_source_file(filename):
+                    continue
+                filepath = os.path.join(dirpath, filename)
+                real_filepath = os.path.join(real_dirpath, filename)
+                if matcher and matcher.is_ignored(real_filepath, False):
+                    continue
+                if is_symlink:
+                    real_filepath = os.path.realpath(filepath)
+                if real_filepath in found_files:
+                    continue
+                found_files.add(real_filepath)
+                filepaths.append(filepath)
+            # reversed, so subdirectories are walked in order they were listed
+            for dirname, is_symlink in reversed(dirnames):
+                if is_symlink:
+                    continue
+                real_subdirpath = os.path.join(real_dirpath, dirname)
+                if matcher and matcher.is_ignored(real_subdirpath, True):
+                    continue
+                stack.append((os.path.join(dirpath, dirname), real_subdirpath, matcher))
+
+    def _read_tree(self, top, real_top, top_matcher, visited_dirs, pool):
+        """* Reads directories of tree level by level, every level is read by pool of threads.
+        Directories are pruned like in {#jscribe.utils.discovery.FileDiscovery.discover}, so no
+        directory is listed that wouldn't be listed by one thread.
+        @method ._read_tree
+        @param self
+        @param top {{str}} - Input path.
+        @param real_top {{str}}
+        @param top_matcher {{#jscribe.utils.ignorefile.IgnoreFilesMatcher}}
+        @param visited_dirs {{set}} - Real paths of directories walked before.
+        @param pool {{multiprocessing.pool.ThreadPool}}
+        @private
+        @return {{dict}} - Results of
+            {#jscribe.utils.discovery.FileDiscovery._read_directory} under real paths of
+            directories.
+        """
+        listings = {}
+        level = [(top, real_top, top_matcher)]
+        while level:
+            read_level = []
+            for dirpath, real_dirpath, matcher in level:
+                if real_dirpath in visited_dirs or real_dirpath in listings or \
+                        self.is_ignored_dir(dirpath):
+                    continue
+                # placeholder, so directory is read once
+                listings[real_dirpath] = None
+                read_level.append((dirpath, real_dirpath, matcher))
+            results = pool.map(lambda entry: self._read_directory(*entry), read_level)
+            level = []
+            for (dirpath, real_dirpath, parent_matcher), listing in zip(read_level, results):
+                listings[real_dirpath] = listing
+                filenames, dirnames, matcher = listing
+                for dirname, is_symlink in dirnames:
+                    if is_symlink:
+                        continue
+                    real_subdirpath = os.path.join(real_dirpath, dirname)
+                    if matcher and matcher.is_ignored(real_subdirpath, True):
+                        continue
+                    level.append((os.path.join(dirpath, dirname), real_subdirpath, matcher))
+        return listings
+
+    def _read_directory(self, dirpath, real_dirpath, matcher):
+        """* Lists directory and loads its ignore files.
+        @method ._read_directory
+        @param self
+        @param dirpath {{str}}
+        @param real_dirpath {{str}}
+        @param matcher {{#jscribe.utils.ignorefile.IgnoreFilesMatcher}} - Matcher of parent
+            directory.
+        @private
+        @return {{tuple}} - Files and subdirectories like in
+            {#jscribe.utils.discovery.list_directory}, and matcher for this directory.
+        """
+        filenames, dirnames = self._list_directory(dirpath, real_dirpath)
+        if self._ignore_files:
+            matcher = self._extend_ignore_files_matcher(matcher, dirpath, real_dirpath, filenames)
+        return filenames, dirnames, matcher
+
+    def _list_directory(self, dirpath, real_dirpath):
+        """* Lists directory or takes its entries from cache, if it didn't change. Only entries
+        that matter for discovery are returned when cache is used.
+        @method ._list_directory
+        @param self
+        @param dirpath {{str}}
+        @param real_dirpath {{str}}
+        @private
+        @return {{tuple}} - Like {#jscribe.utils.discovery.list_directory}.
+        """
+        if self.cache is None:
+            return list_directory(dirpath)
+        signature = get_directory_signature(dirpath)
+        if signature is None:
+            return [], []
+        entries = self.cache.get(real_dirpath, signature)
+        if entries is not None:
+            return entries
+        filenames, dirnames = list_directory(dirpath)
+        listing_time = time.time()
+        # there is no need to store entries that are skipped anyway
+        entries = (
+            [
+                (filename, is_symlink) for filename, is_symlink in filenames
+                if filename in self._ignore_files or self.is_source_file(filename)
+            ],
+            [(dirname, is_symlink) for dirname, is_symlink in dirnames if not is_symlink],
+        )
+        self.cache.set(real_dirpath, signature, entries, listing_time)
+        return entries
+
+    def _extend_ignore_files_matcher(self, matcher, dirpath, real_dirpath, filenames):
+        # ignore files are found in directory listing, so there is no extra stat for them
+        names = set(filename for filename, is_symlink in filenames)
+        for ignore_filename in self._ignore_files:
+            if ignore_filename in names:
+                matcher = matcher.extend(
+                    real_dirpath, IgnoreFile.load(os.path.join(dirpath, ignore_filename))
+                )
+        return matcher
+
+    def _get_parent_ignore_files_matcher(self, real_top):
+        """* Returns matcher with ignore files from parent directories of input path, up to the
+        root of git repository. If input path is not in git repository, then matcher is empty.
+        @method ._get_parent_ignore_files_matcher
+        @param self
+        @param real_top {{str}} - Real path of input path.
+        @private
+        @return {{#jscribe.utils.ignorefile.IgnoreFilesMatcher}}
+        """
+        matcher = IgnoreFilesMatcher()
+        if not self._ignore_files:
+            return matcher
+        parents = []
+        dirpath = real_top
+        while not os.path.exists(os.path.join(dirpath, '.git')):
+            parent = os.path.dirname(dirpath)
+            if parent == dirpath:
+                # not in git repository
+                return matcher
+            dirpath = parent
+            parents.append(dirpath)
+        for dirpath in reversed(parents):
+            for ignore_filename in self._ignore_files:
+                path = os.path.join(dirpath, ignore_filename)
+                if os.path.isfile(path):
+                    matcher = matcher.extend(dirpath, IgnoreFile.load(path))
+        return matcher
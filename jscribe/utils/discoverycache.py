@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""*
+@module jscribe.utils.discoverycache
+@author Rafał Łużyński
+"""
+
+import os
+import logging
+import threading
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from jscribe.utils.outputwriter import write_file
+
+
+class DiscoveryCache(object):
+    """* Persistent snapshot of directories walked by {#jscribe.utils.discovery.FileDiscovery}.
+
+    For every directory its modification time is stored together with entries that matter for
+    discovery (source files, ignore files and subdirectories), so on next run only directories
+    that changed are listed again, others need just one `stat` call. Directory modification time
+    changes only when entries are added, removed or renamed, content of ignore files is always
+    read again.
+
+    Directories modified shortly before they were listed are not stored, because another change
+    in the same tick of filesystem clock would not change their modification time ("racy" entries,
+    like in git index). Whole cache is dropped if settings hash (see
+    {#jscribe.utils.discovery.FileDiscovery.get_settings_hash}) is different than the one that
+    cache was created with.
+    @class jscribe.utils.discoverycache.DiscoveryCache
+    """
+
+    """* Version of cache file format. Increase it whenever format of stored entries changes.
+    @attribute .VERSION
+    @valtype {{int}}
+    """
+    VERSION = 1
+
+    """* Directories modified less than this number of seconds before they were listed are not
+    stored. It's large enough for filesystems with two seconds resolution of modification time.
+    @number .RACY_INTERVAL
+    """
+    RACY_INTERVAL = 2
+
+    def __init__(self, path, settings_hash):
+        """* Initialization. Loads cache file if it exists.
+        @method .__init__
+        @constructor
+        @param self
+        @param path {{str}} - Path to cache file.
+        @param settings_hash {{str}} - Hash of settings that have impact on stored entries.
+        """
+        self.path = path
+        self.settings_hash = settings_hash
+        self._directories = {}
+        self._used_directories = {}
+        self.hits = 0
+        self.misses = 0
+        # directories can be listed by many threads
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """* Loads directory snapshots from cache file. Invalid or outdated cache file is ignored.
+        @method ._load
+        @param self
+        @private
+        """
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                cache_data = pickle.load(f)
+                f.close()
+        except Exception as e:
+            logging.info('Ignoring invalid discovery cache "{}": {}'.format(self.path, e))
+            return
+        if cache_data.get('version') != self.VERSION or \
+                cache_data.get('settings_hash') != self.settings_hash:
+            return
+        self._directories = cache_data.get('directories', {})
+
+    def get(self, dirpath, signature):
+        """* Returns cached entries of directory.
+        @method .get
+        @param self
+        @param dirpath {{str}} - Real path of directory.
+        @param signature {{tuple}} - Current signature of directory, see
+            {#jscribe.utils.discoverycache.get_directory_signature}.
+        @return {{tuple|None}} - Entries like returned by
+            {#jscribe.utils.discovery.list_directory}, `None` if directory is not cached or it
+            changed.
+        """
+        with self._lock:
+            entry = self._directories.get(dirpath)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used_directories[dirpath] = entry
+            return entry[1]
+
+    def set(self, dirpath, signature, entries, listing_time):
+        """* Stores entries of directory.
+        @method .set
+        @param self
+        @param dirpath {{str}} - Real path of directory.
+        @param signature {{tuple}} - Signature of directory taken before it was listed.
+        @param entries {{tuple}} - Entries like returned by
+            {#jscribe.utils.discovery.list_directory}.
+        @param listing_time {{float}} - Time when directory was listed.
+        """
+        with self._lock:
+            if listing_time - signature[0] < self.RACY_INTERVAL:
+                # directory can change again without changing its modification time
+                self._used_directories.pop(dirpath, None)
+                return
+            self._used_directories[dirpath] = (signature, entries)
+
+    def save(self):
+        """* Saves cache to file. Only directories walked in this run are saved, so entries of
+        removed directories don't pile up. File is not written if no directory changed since cache
+        was loaded, i.e. when files are discovered every second by watcher.
+        @method .save
+        @param self
+        """
+        if self._used_directories == self._directories and os.path.isfile(self.path):
+            return
+        cache_data = {
+            'version': self.VERSION,
+            'settings_hash': self.settings_hash,
+            'directories': self._used_directories,
+        }
+        write_file(self.path, pickle.dumps(cache_data, pickle.HIGHEST_PROTOCOL))
+
+
+def get_directory_signature(dirpath):
+    """* Returns signature of directory that changes when entries are added to it, removed or
+    renamed. Change time is included, so change of permissions is noticed too.
+    @function jscribe.utils.discoverycache.get_directory_signature
+    @param dirpath {{str}}
+    @return {{tuple|None}} - Modification time, change time and inode of directory, `None` if
+        directory can't be accessed.
+    """
+    try:
+        stat = os.stat(dirpath)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_ctime, stat.st_ino
+
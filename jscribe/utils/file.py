@@ -6,13 +6,32 @@
 @author Rafał Łużyński
 """
 
-import os
 import re
+import io
+import codecs
+import logging
 
+from jscribe.utils.discovery import FileDiscovery
+from jscribe.utils.discoverycache import DiscoveryCache
+from jscribe.utils.gitfiles import GitException
 
-def discover_files(input_paths, input_regex, ignore_paths_regex=[], ignore_regex=None):
+
+"""* Number of bytes at the beginning of file that are checked by
+{#jscribe.utils.file.is_binary_content}.
+@number .BINARY_SNIFF_SIZE
+"""
+BINARY_SNIFF_SIZE = 8000
+
+_SOURCE_CODING_REGEX_OBJ = re.compile(r'coding[:=]\s*(?P<coding>[-\w.]+)')
+_ASCII_CHARACTERS = u''.join(unichr(code) for code in range(128))
+_ascii_compatible_encodings = {}
+
+
+def discover_files(input_paths, input_regex, ignore_paths_regex=[], ignore_regex=None,
+                   ignore_files=(), cache_path=None, backend='filesystem', threads=1):
     """* Return list of filepaths that align with given entry parameters
-    (input paths, file regex, ignores).
+    (input paths, file regex, ignores). Directories matched by ignore paths regexes are not walked
+    at all, so their subdirectories are ignored too.
     @function .discover_files
     @param input_paths {{list}} List of paths to directories that contains your files you want to be
     discovered.
@@ -20,49 +39,110 @@ def discover_files(input_paths, input_regex, ignore_paths_regex=[], ignore_regex
     @param ignore_paths_regex=[] {{list}} list of regexes that match paths to directories that you
     want to exclude from your input_paths
     @param ignore_regex=None {{str}} regex that matches source file names that must not be discovered
+    @param ignore_files=() {{list}} names of gitignore-style files (i.e. `.gitignore`), files and
+    directories matched by their patterns are not discovered
+    @param cache_path=None {{str}} path to discovery cache file, if given then only directories
+    that changed since last run are listed, see {#jscribe.utils.discoverycache.DiscoveryCache}
+    @param backend='filesystem' {{str}} `filesystem` to walk directories or `git` to list files
+    from git index, if git can't be used then directories are walked
+    @param threads=1 {{int}} number of threads that list directories
     @return {{list}} - List of discovered filepaths
     """
-    input_re = re.compile(input_regex)
-    if ignore_regex is not None:
-        ignore_re = re.compile(ignore_regex)
-    # compile regex for ignore paths
-    ignore_paths_regex_obj = []
-    for path in ignore_paths_regex:
-        ignore_paths_regex_obj.append(re.compile(path))
-    file_paths = []
-    for path in input_paths:
-        for dirpath, dirnames, filenames in os.walk(path):
-            if not _match_ignore_path(ignore_paths_regex_obj, dirpath):
-                continue
-            for filename in filenames:
-                if ignore_regex is not None and ignore_re.match(filename):
-                    continue
-                if input_re.match(filename):
-                    file_paths.append(os.path.join(dirpath, filename))
-    return file_paths
-
-
-def _match_ignore_path(ignore_paths_regex_obj, dirpath):
-    for ignore_path_obj in ignore_paths_regex_obj:
-        if ignore_path_obj.match(dirpath) is not None:
-            return False
-    return True
+    if backend not in ('filesystem', 'git'):
+        raise ValueError(u'Invalid discovery backend "{}".'.format(backend))
+    discovery = FileDiscovery(input_regex, ignore_paths_regex, ignore_regex, ignore_files)
+    discovery.threads = threads
+    if backend == 'git':
+        try:
+            return discovery.discover_git(input_paths)
+        except GitException as e:
+            logging.warning(
+                u'Can\'t list files from git, walking directories instead. {}'.format(e)
+            )
+    if cache_path is None:
+        return discovery.discover(input_paths)
+    discovery.cache = DiscoveryCache(cache_path, discovery.get_settings_hash())
+    filepaths = discovery.discover(input_paths)
+    discovery.cache.save()
+    logging.info('Discovery cache: {} directories reused, {} directories listed.'.format(
+        discovery.cache.hits, discovery.cache.misses
+    ))
+    return filepaths
+
+
+def get_source_file_coding(path):
+    """* Returns encoding declared in source file, like in python files.
+    @function .get_source_file_coding
+    @param path {{str}} Path to source file.
+    @return {{str|None}} encoding of source file
+    """
+    with open(path, 'r') as f:
+        # encoding must be on 1st or 2nd line in py file
+        head = f.readline() + f.readline()
+        f.close()
+    return get_content_coding(head)
 
 
 def get_py_file_encoding(path):
-    """* Returns file encoding of python file.
+    """* Returns file encoding of python file. Kept for backward compatibility, use
+    {#jscribe.utils.file.get_source_file_coding}.
     @function .get_py_file_encoding
     @param path {{str}} Path to py file.
     @return {{str}} encoding of py file
     """
-    source_coding_re = re.compile(r'coding[:=]\s*(?P<coding>[-\w.]+)')
-    source_coding = None
-    with open(path, 'r') as f:
-        # encoding must be on 1st or 2nd line in py file
-        for i in range(2):
-            match_inst = source_coding_re.search(f.readline())
-            if match_inst is not None:
-                source_coding = match_inst.group('coding')
-                break
-        f.close()
-    return source_coding
\ No newline at end of file
+    return get_source_file_coding(path)
+
+
+def get_content_coding(content):
+    """* Returns encoding declared in content of file, the same way as
+    {#jscribe.utils.file.get_source_file_coding} does it for file.
+    @function .get_content_coding
+    @param content {{str}} Raw content of file (or its beginning).
+    @return {{str|None}} declared encoding
+    """
+    # encoding must be on 1st or 2nd line in py file
+    for line in content.split('\n', 2)[:2]:
+        match_inst = _SOURCE_CODING_REGEX_OBJ.search(line)
+        if match_inst is not None:
+            return match_inst.group('coding')
+    return None
+
+
+def is_binary_content(content):
+    """* Checks if content of file looks like binary data, that is if there is a null byte in its
+    beginning.
+    @function .is_binary_content
+    @param content {{str}} Raw content of file.
+    @return {{boolean}}
+    """
+    return '\0' in content[:BINARY_SNIFF_SIZE]
+
+
+def is_ascii_compatible_encoding(encoding):
+    """* Checks if every ascii character is encoded with given encoding as the same single byte,
+    so ascii text can be searched for in raw content of file.
+    @function .is_ascii_compatible_encoding
+    @param encoding {{str}}
+    @return {{boolean}} - `False` also if encoding is unknown.
+    """
+    compatible = _ascii_compatible_encodings.get(encoding)
+    if compatible is None:
+        try:
+            encoded = codecs.lookup(encoding).encode(_ASCII_CHARACTERS)[0]
+        except (LookupError, UnicodeError, TypeError):
+            encoded = None
+        compatible = encoded == _ASCII_CHARACTERS.encode('ascii')
+        _ascii_compatible_encodings[encoding] = compatible
+    return compatible
+
+
+def decode_file_content(content, encoding):
+    """* Decodes content of file the same way as file opened with `codecs.open` would be decoded.
+    @function .decode_file_content
+    @param content {{str}} Raw content of file.
+    @param encoding {{str|None}} Encoding of file, if `None` then content is returned as it is.
+    @return {{unicode|str}} decoded content
+    """
+    if encoding is None:
+        return content
+    return codecs.getreader(encoding)(io.BytesIO(content)).read()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Source files contents shared by parser and generators, so every file is read and decoded
+only once. Cached content is read again if file was modified in the meantime.
+
+Example usage:
+
+{$python
+from jscribe.utils.filecontent import file_contents
+file_content = file_contents.get('your/path/to/source.js')
+file_content.content  # raw content
+file_content.coding  # declared encoding
+text = file_contents.get_text('your/path/to/source.js')  # decoded content
+$}
+@module jscribe.utils.filecontent
+@author Rafał Łużyński
+"""
+
+import os
+import sys
+from collections import OrderedDict
+
+from jscribe.conf import settings
+from jscribe.utils.file import get_content_coding, decode_file_content
+
+
+class FileContent(object):
+    """* Content of one source file, read once and decoded at first use.
+    @class jscribe.utils.filecontent.FileContent
+    """
+
+    def __init__(self, path, content, signature=None):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param path {{str}}
+        @param content {{str}} - Raw content of file.
+        @param signature=None {{tuple}} - Signature of file when it was read, returned by
+            {#jscribe.utils.filecontent.get_file_signature}.
+        """
+        self.path = path
+        self.content = content
+        self.signature = signature
+        self.coding = get_content_coding(content)
+        self._text = None
+
+    @classmethod
+    def read(cls, path):
+        """* Reads file from given path.
+        @method .read
+        @param cls
+        @param path {{str}}
+        @return {{#jscribe.utils.filecontent.FileContent}}
+        """
+        signature = get_file_signature(path)
+        with open(path, 'rb') as f:
+            content = f.read()
+            f.close()
+        return cls(path, content, signature)
+
+    @property
+    def text(self):
+        """* Content of file decoded with its declared encoding, or raw content if file doesn't
+        declare encoding.
+        @property .text
+        @valtype {{unicode|str}}
+        """
+        if self._text is None:
+            self._text = decode_file_content(self.content, self.coding)
+        return self._text
+
+    @property
+    def size(self):
+        """* Memory taken by raw and decoded content in bytes.
+        @property .size
+        @valtype {{int}}
+        """
+        size = sys.getsizeof(self.content)
+        if self._text is not None and self._text is not self.content:
+            size += sys.getsizeof(self._text)
+        return size
+
+
+class FileContentCache(object):
+    """* Least recently used files contents, limited by memory they take.
+    @class jscribe.utils.filecontent.FileContentCache
+    """
+
+    def __init__(self, max_size=None):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param max_size=None {{int}} - Maximum memory taken by cached contents in bytes, if `None`
+            then it's not limited.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._contents = OrderedDict()
+
+    def get(self, path, keep=True):
+        """* Returns content of file, file is read only if its content is not cached.
+        @method .get
+        @param self
+        @param path {{str}}
+        @param keep=True {{boolean}} - If `False` then content is removed from cache, use it when
+            content is needed for the last time.
+        @return {{#jscribe.utils.filecontent.FileContent}}
+        """
+        file_content = self._pop(path)
+        if file_content is not None and file_content.signature != get_file_signature(path):
+            # file was modified since it was read
+            file_content = None
+        if file_content is None:
+            self.misses += 1
+            file_content = FileContent.read(path)
+        else:
+            self.hits += 1
+        if keep:
+            self._put(file_content)
+        return file_content
+
+    def get_text(self, path, keep=True):
+        """* Returns decoded content of file, file is read and decoded only if its decoded content
+        is not cached.
+        @method .get_text
+        @param self
+        @param path {{str}}
+        @param keep=True {{boolean}} - If `False` then content is removed from cache.
+        @return {{unicode|str}}
+        """
+        file_content = self.get(path, keep=False)
+        text = file_content.text
+        if keep:
+            self._put(file_content)
+        return text
+
+    def discard(self, path):
+        """* Removes content of file from cache.
+        @method .discard
+        @param self
+        @param path {{str}}
+        """
+        self._pop(path)
+
+    def clear(self):
+        """* Removes every content from cache.
+        @method .clear
+        @param self
+        """
+        self._contents.clear()
+        self.size = 0
+
+    def _pop(self, path):
+        entry = self._contents.pop(path, None)
+        if entry is None:
+            return None
+        file_content, size = entry
+        self.size -= size
+        return file_content
+
+    def _put(self, file_content):
+        size = file_content.size
+        self._contents[file_content.path] = (file_content, size)
+        self.size += size
+        # remove least recently used contents
+        while self.max_size is not None and self.size > self.max_size:
+            path, (evicted_content, evicted_size) = self._contents.popitem(last=False)
+            self.size -= evicted_size
+
+
+def get_file_signature(path):
+    """* Returns signature of file that changes when file is modified.
+    @function jscribe.utils.filecontent.get_file_signature
+    @param path {{str}}
+    @return {{tuple}} - Size, modification time and inode of file.
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime, stat.st_ino
+
+
+"""* Contents of source files shared by parser and generators, limited by `FILE_CONTENT_CACHE_SIZE`
+setting (generators set it again after settings are loaded).
+@instance jscribe.utils.filecontent.file_contents
+@valtype {{#jscribe.utils.filecontent.FileContentCache}}
+"""
+file_contents = FileContentCache(settings.FILE_CONTENT_CACHE_SIZE)
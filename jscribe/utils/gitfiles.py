@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Lists files from local git repository, used by git discovery backend (see
+{#jscribe.utils.discovery.FileDiscovery.discover_git}). Only local `git` binary is needed.
+@module jscribe.utils.gitfiles
+@author Rafał Łużyński
+"""
+
+import os
+import subprocess
+
+
+class GitException(Exception):
+    """* Raised when git command fails, i.e. when git is not installed or path is not inside git
+    repository.
+    @exception jscribe.utils.gitfiles.GitException
+    """
+    pass
+
+
+def run_git(args, cwd):
+    """* Runs git command and returns its output.
+    @function jscribe.utils.gitfiles.run_git
+    @param args {{list}} - Arguments of git command.
+    @param cwd {{str}} - Working directory of command.
+    @return {{str}}
+    """
+    try:
+        process = subprocess.Popen(
+            ['git'] + list(args), cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise GitException(u'Can\'t run git: {}'.format(e))
+    output, error_output = process.communicate()
+    if process.returncode != 0:
+        raise GitException(u'Command "git {}" failed in "{}": {}'.format(
+            u' '.join(args), cwd, error_output.decode('utf-8', 'replace').strip()
+        ))
+    return output
+
+
+def _split_paths(output, path):
+    # paths are relative to working directory of command, separated with null bytes
+    return [
+        os.path.join(path, *relative_path.decode('utf-8').split('/'))
+        for relative_path in output.split('\0') if relative_path
+    ]
+
+
+def list_git_files(path):
+    """* Returns paths of files from git index that are inside given directory.
+    @function jscribe.utils.gitfiles.list_git_files
+    @param path {{str}} - Directory inside git repository.
+    @return {{list}} - Paths joined with given directory, in git order (sorted).
+    """
+    return _split_paths(run_git(['ls-files', '-z', '--cached'], path), path)
+
+
+def get_commit(path, revision='HEAD'):
+    """* Returns hash of commit that given revision points to.
+    @function jscribe.utils.gitfiles.get_commit
+    @param path {{str}} - Directory inside git repository.
+    @param revision='HEAD' {{str}} - Git revision, i.e. `HEAD~5` or name of branch.
+    @return {{str}}
+    """
+    return run_git(['rev-parse', '--verify', '{}^{{commit}}'.format(revision)], path).strip()
+
+
+def list_changed_files(path, since):
+    """* Returns paths of files inside given directory that changed since given revision,
+    uncommitted changes and untracked files (that are not ignored) are included.
+    @function jscribe.utils.gitfiles.list_changed_files
+    @param path {{str}} - Directory inside git repository.
+    @param since {{str}} - Git revision, i.e. `HEAD~5` or name of branch.
+    @return {{list}} - Paths joined with given directory.
+    """
+    return _split_paths(
+        run_git(['diff', '--name-only', '-z', '--relative', since, '--'], path), path
+    ) + _split_paths(run_git(['ls-files', '-z', '--others', '--exclude-standard'], path), path)
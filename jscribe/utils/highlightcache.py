@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Highlighted code shared by everything that highlights code with pygments, so the same code
+is highlighted only once, even between runs if cache is saved to file.
+
+Example usage:
+
+{$python
+from jscribe.utils.highlightcache import highlight_cache
+key = highlight_cache.get_key(code, 'javascript', True)
+highlighted_code = highlight_cache.get(key)
+if highlighted_code is None:
+    highlighted_code = highlight(code, lexer, formatter)
+    highlight_cache.set(key, highlighted_code)
+$}
+@module jscribe.utils.highlightcache
+@author Rafał Łużyński
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from pygments import __version__ as pygments_version
+
+from jscribe.utils.outputwriter import write_file
+
+
+class HighlightCache(object):
+    """* Least recently used highlighted code, stored under hash of code and highlighting options
+    and limited by memory it takes. Highlighted code can be loaded from file and saved to it, whole
+    file is ignored if it was saved by other version of library that highlights code.
+
+    Processes started from pool keep highlighted code in their own cache, new entries can be taken
+    from it with {#jscribe.utils.highlightcache.HighlightCache.take_new_entries} and added to
+    cache of main process.
+    @class jscribe.utils.highlightcache.HighlightCache
+    """
+
+    """* Version of cache file format. Increase it whenever format of stored entries changes.
+    @attribute .VERSION
+    @valtype {{int}}
+    """
+    VERSION = 1
+
+    """* Version of library that highlights code, cached code is outdated when it changes.
+    @attribute .LIBRARY_VERSION
+    @valtype {{str}}
+    """
+    LIBRARY_VERSION = pygments_version
+
+    def __init__(self, max_size=None):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param max_size=None {{int}} - Maximum memory taken by highlighted code in bytes, if
+            `None` then it's not limited.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # recorded only in processes of pool, see record_new_entries
+        self._new_keys = None
+        self._taken_hits = 0
+        self._taken_misses = 0
+
+    def get_key(self, code, *options):
+        """* Returns key of highlighted code.
+        @method .get_key
+        @param self
+        @param code {{unicode}}
+        @param options... {{object}} - Everything that has impact on highlighted code, i.e. language.
+        @return {{str}}
+        """
+        key_hash = hashlib.sha1(code.encode('utf-8'))
+        key_hash.update(repr(options))
+        return key_hash.hexdigest()
+
+    def get(self, key):
+        """* Returns highlighted code.
+        @method .get
+        @param self
+        @param key {{str}} - Key returned by {#jscribe.utils.highlightcache.HighlightCache.get_key}.
+        @return {{unicode|None}} - `None` if code is not cached.
+        """
+        highlighted_code = self._entries.pop(key, None)
+        if highlighted_code is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # move to the end, it's most recently used now
+        self._entries[key] = highlighted_code
+        return highlighted_code
+
+    def set(self, key, highlighted_code):
+        """* Stores highlighted code.
+        @method .set
+        @param self
+        @param key {{str}} - Key returned by {#jscribe.utils.highlightcache.HighlightCache.get_key}.
+        @param highlighted_code {{unicode}}
+        """
+        previous_code = self._entries.pop(key, None)
+        if previous_code is not None:
+            self.size -= len(previous_code)
+        self._entries[key] = highlighted_code
+        self.size += len(highlighted_code)
+        if self._new_keys is not None:
+            self._new_keys.append(key)
+        # remove least recently used code
+        while self.max_size is not None and self.size > self.max_size:
+            evicted_key, evicted_code = self._entries.popitem(last=False)
+            self.size -= len(evicted_code)
+
+    def record_new_entries(self):
+        """* Starts recording of entries stored from now on, so they can be taken with
+        {#jscribe.utils.highlightcache.HighlightCache.take_new_entries}. Call it in process of
+        pool, main process doesn't record entries, so their keys don't pile up.
+        @method .record_new_entries
+        @param self
+        """
+        self._new_keys = []
+        # forked process starts with counts of main process
+        self._taken_hits = self.hits
+        self._taken_misses = self.misses
+
+    def take_new_entries(self):
+        """* Returns entries stored since last call, with numbers of hits and misses since last
+        call, i.e. to pass them from process in pool to main process.
+        @method .take_new_entries
+        @param self
+        @return {{tuple}} - List of keys and highlighted code, number of hits, number of misses.
+        """
+        entries = [
+            (key, self._entries[key]) for key in self._new_keys or () if key in self._entries
+        ]
+        if self._new_keys is not None:
+            self._new_keys = []
+        new_entries = entries, self.hits - self._taken_hits, self.misses - self._taken_misses
+        self._taken_hits = self.hits
+        self._taken_misses = self.misses
+        return new_entries
+
+    def add_new_entries(self, new_entries):
+        """* Stores entries and adds numbers of hits and misses returned by
+        {#jscribe.utils.highlightcache.HighlightCache.take_new_entries} in other process.
+        @method .add_new_entries
+        @param self
+        @param new_entries {{tuple}}
+        """
+        entries, hits, misses = new_entries
+        self.add_entries(entries)
+        self.hits += hits
+        self.misses += misses
+
+    def add_entries(self, entries):
+        """* Stores entries, keys and highlighted code.
+        @method .add_entries
+        @param self
+        @param entries {{list}}
+        """
+        for key, highlighted_code in entries:
+            self.set(key, highlighted_code)
+
+    def clear(self):
+        """* Removes every entry from cache.
+        @method .clear
+        @param self
+        """
+        self._entries.clear()
+        if self._new_keys is not None:
+            self._new_keys = []
+        self.size = 0
+
+    def load(self, path):
+        """* Loads highlighted code from file, invalid or outdated file is ignored.
+        @method .load
+        @param self
+        @param path {{str}}
+        """
+        if not os.path.isfile(path):
+            return
+        try:
+            with open(path, 'rb') as f:
+                cache_data = pickle.load(f)
+                f.close()
+        except Exception as e:
+            logging.info('Ignoring invalid cache file "{}": {}'.format(path, e))
+            return
+        if cache_data.get('version') != self.VERSION or \
+                cache_data.get('library_version') != self.LIBRARY_VERSION:
+            return
+        self.clear()
+        # entries are stored from least recently used
+        self.add_entries(cache_data.get('entries', []))
+        if self._new_keys is not None:
+            self._new_keys = []
+
+    def save(self, path):
+        """* Saves highlighted code to file.
+        @method .save
+        @param self
+        @param path {{str}}
+        """
+        cache_data = {
+            'version': self.VERSION,
+            'library_version': self.LIBRARY_VERSION,
+            'entries': self._entries.items(),
+        }
+        write_file(path, pickle.dumps(cache_data, pickle.HIGHEST_PROTOCOL))
+
+
+"""* Highlighted code shared by generators.
+@instance jscribe.utils.highlightcache.highlight_cache
+@valtype {{#jscribe.utils.highlightcache.HighlightCache}}
+"""
+highlight_cache = HighlightCache()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Matcher for gitignore-style pattern files, like `.gitignore` or `.jscribeignore`.
+
+Supported syntax is the same as in git: comments, negation with `!`, patterns for directories
+only (with trailing `/`), patterns anchored to directory of ignore file (with `/` at the beginning
+or in the middle), wildcards `*`, `?`, `[...]` and `**`. Like in git, last matching pattern
+decides, and patterns from ignore files in deeper directories take precedence.
+@module jscribe.utils.ignorefile
+@author Rafał Łużyński
+"""
+
+import re
+import codecs
+
+
+class IgnoreFile(object):
+    """* Patterns from one ignore file. Consecutive patterns of the same kind are compiled into one
+    regex, so usually whole file is matched with one regex.
+    @class jscribe.utils.ignorefile.IgnoreFile
+    """
+
+    def __init__(self, lines):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param lines {{list}} - Lines of ignore file.
+        """
+        # list of: regexes, negated, dir only
+        patterns = []
+        for line in lines:
+            pattern = parse_pattern(line)
+            if pattern is not None:
+                patterns.append(pattern)
+        self._runs = []
+        for regex, negated, dir_only in patterns:
+            if self._runs and self._runs[-1][1:] == [negated, dir_only]:
+                self._runs[-1][0].append(regex)
+            else:
+                self._runs.append([[regex], negated, dir_only])
+        # runs are checked from the last one, since last matching pattern decides
+        self._runs = [
+            (re.compile(u'|'.join(regexes)), negated, dir_only)
+            for regexes, negated, dir_only in reversed(self._runs)
+        ]
+
+    @classmethod
+    def load(cls, path):
+        """* Loads ignore file.
+        @method .load
+        @param cls
+        @param path {{str}}
+        @return {{#jscribe.utils.ignorefile.IgnoreFile}}
+        """
+        with codecs.open(path, 'r', 'utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+            f.close()
+        return cls(lines)
+
+    def match(self, path, is_dir):
+        """* Checks if path is ignored by patterns from this file.
+        @method .match
+        @param self
+        @param path {{str}} - Path relative to directory of ignore file, with `/` as separator.
+        @param is_dir {{boolean}}
+        @return {{boolean|None}} - `True` if path is ignored, `False` if it's explicitly not ignored
+            (by negated pattern), `None` if no pattern matches it.
+        """
+        for regex_obj, negated, dir_only in self._runs:
+            if dir_only and not is_dir:
+                continue
+            if regex_obj.match(path) is not None:
+                return not negated
+        return None
+
+    def __len__(self):
+        return len(self._runs)
+
+
+class IgnoreFilesMatcher(object):
+    """* Ignore files from directory and its parent directories, stacked like in git. Matchers are
+    immutable, matcher for subdirectory is made with
+    {#jscribe.utils.ignorefile.IgnoreFilesMatcher.extend}.
+    @class jscribe.utils.ignorefile.IgnoreFilesMatcher
+    """
+
+    def __init__(self, ignore_files=()):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        @param ignore_files=() {{tuple}} - Tuples: *directory of ignore file*,
+            {#jscribe.utils.ignorefile.IgnoreFile}, ordered from the top directory.
+        """
+        self._ignore_files = tuple(ignore_files)
+
+    def extend(self, dirpath, ignore_file):
+        """* Returns matcher with patterns of ignore file from subdirectory.
+        @method .extend
+        @param self
+        @param dirpath {{str}} - Directory of ignore file.
+        @param ignore_file {{#jscribe.utils.ignorefile.IgnoreFile}}
+        @return {{#jscribe.utils.ignorefile.IgnoreFilesMatcher}}
+        """
+        if not len(ignore_file):
+            return self
+        return IgnoreFilesMatcher(self._ignore_files + ((dirpath, ignore_file), ))
+
+    def is_ignored(self, path, is_dir):
+        """* Checks if path is ignored.
+        @method .is_ignored
+        @param self
+        @param path {{str}} - Path inside directories of ignore files, it must start with the same
+            directory path as these given to matcher.
+        @param is_dir {{boolean}}
+        @return {{boolean}}
+        """
+        # ignore file from the deepest directory decides
+        for dirpath, ignore_file in reversed(self._ignore_files):
+            relative_path = path[len(dirpath):].replace('\\', '/').lstrip('/')
+            ignored = ignore_file.match(relative_path, is_dir)
+            if ignored is not None:
+                return ignored
+        return False
+
+    def __len__(self):
+        return len(self._ignore_files)
+
+
+def parse_pattern(line):
+    """* Parses line of ignore file.
+    @function jscribe.utils.ignorefile.parse_pattern
+    @param line {{str}}
+    @return {{tuple|None}} - Regex matching relative paths, is pattern negated, is pattern only
+        for directories. `None` if line has no pattern.
+    """
+    line = line.rstrip('\r')
+    # trailing spaces are ignored unless escaped
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+    if not line or line.startswith('#'):
+        return None
+    negated = False
+    if line.startswith('!'):
+        negated = True
+        line = line[1:]
+    elif line.startswith('\\!') or line.startswith('\\#'):
+        line = line[1:]
+    dir_only = False
+    if line.endswith('/'):
+        dir_only = True
+        line = line.rstrip('/')
+    if not line:
+        return None
+    # pattern with slash at the beginning or in the middle is relative to ignore file directory
+    anchored = '/' in line
+    line = line.lstrip('/')
+    regex = translate_pattern(line)
+    if not anchored:
+        regex = u'(?:.*/)?' + regex
+    return u'(?:{})$'.format(regex), negated, dir_only
+
+
+def translate_pattern(pattern):
+    """* Translates gitignore wildcard pattern to regex.
+    @function jscribe.utils.ignorefile.translate_pattern
+    @param pattern {{str}}
+    @return {{str}}
+    """
+    regex = []
+    index = 0
+    length = len(pattern)
+    while index < length:
+        char = pattern[index]
+        if pattern.startswith('**', index) and (index == 0 or pattern[index - 1] == '/'):
+            if index + 2 == length:
+                # trailing "/**" matches everything inside
+                regex.append(u'.*')
+                index += 2
+                continue
+            if pattern[index + 2] == '/':
+                # "**/" matches zero or more directories
+                regex.append(u'(?:.*/)?')
+                index += 3
+                continue
+        if char == '*':
+            regex.append(u'[^/]*')
+        elif char == '?':
+            regex.append(u'[^/]')
+        elif char == '[':
+            end = pattern.find(']', index + 2)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                chars = pattern[index + 1:end]
+                if chars[0] in '!^':
+                    chars = u'^' + chars[1:]
+                regex.append(u'[{}]'.format(chars.replace('\\', '\\\\')))
+                index = end
+        elif char == '\\' and index + 1 < length:
+            index += 1
+            regex.append(re.escape(pattern[index]))
+        else:
+            regex.append(re.escape(char))
+        index += 1
+    return u''.join(regex)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Descriptions converted from markdown to html, so the same description is converted only once,
+even between runs if cache is saved to file.
+@module jscribe.utils.markupcache
+@author Rafał Łużyński
+"""
+
+from markdown import version as markdown_version
+
+from jscribe.utils.highlightcache import HighlightCache
+
+
+class MarkupCache(HighlightCache):
+    """* Least recently used html converted from markdown, stored under hash of markup. Whole file
+    is ignored if it was saved by other version of markdown.
+    @class jscribe.utils.markupcache.MarkupCache
+    @inherits {{#jscribe.utils.highlightcache.HighlightCache}}
+    """
+
+    """* Version of markdown, cached html is outdated when it changes.
+    @attribute .LIBRARY_VERSION
+    @valtype {{str}}
+    """
+    LIBRARY_VERSION = markdown_version
+
+
+"""* Html converted from markdown, shared by generators.
+@instance jscribe.utils.markupcache.markup_cache
+@valtype {{#jscribe.utils.markupcache.MarkupCache}}
+"""
+markup_cache = MarkupCache()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+
+"""* Writing of generated documentation files. File whose content didn't change is not touched, so
+its modification time stays the same and tools that synchronize output (i.e. rsync) skip it.
+Changed files are written atomically, they are never seen half written.
+@module jscribe.utils.outputwriter
+@author Rafał Łużyński
+"""
+
+import os
+import json
+import logging
+
+
+class OutputWriter(object):
+    """* Writes files and records which files were written, which were unchanged and which were
+    deleted, so manifest of changes can be saved after generation.
+
+    Example usage:
+
+    {$python
+    writer = OutputWriter()
+    writer.write('docs/index.html', content)
+    writer.save_manifest('docs/manifest.json', 'docs')
+    $}
+    @class jscribe.utils.outputwriter.OutputWriter
+    """
+
+    def __init__(self):
+        """* Initialization.
+        @method .__init__
+        @constructor
+        @param self
+        """
+        self.written = []
+        self.unchanged = []
+        self.deleted = []
+
+    def write(self, filepath, content):
+        """* Writes content to file, unless file already has the same content.
+        @method .write
+        @param self
+        @param filepath {{str}}
+        @param content {{str}} - Encoded content.
+        @return {{boolean}} - `True` if file was written.
+        """
+        if is_file_content_equal(filepath, content):
+            self.unchanged.append(filepath)
+            return False
+        write_file(filepath, content)
+        self.written.append(filepath)
+        return True
+
+    def copy(self, source_path, filepath):
+        """* Copies file, unless destination file already has the same content.
+        @method .copy
+        @param self
+        @param source_path {{str}}
+        @param filepath {{str}} - Path of destination file.
+        @return {{boolean}} - `True` if file was written.
+        """
+        with open(source_path, 'rb') as f:
+            content = f.read()
+            f.close()
+        return self.write(filepath, content)
+
+    def mark_written(self, filepath):
+        """* Records file written by other writer, i.e. in other process.
+        @method .mark_written
+        @param self
+        @param filepath {{str}}
+        """
+        self.written.append(filepath)
+
+    def mark_unchanged(self, filepath):
+        """* Records file that is known to be unchanged without writing it.
+        @method .mark_unchanged
+        @param self
+        @param filepath {{str}}
+        """
+        self.unchanged.append(filepath)
+
+    def mark_deleted(self, filepath):
+        """* Records deleted file.
+        @method .mark_deleted
+        @param self
+        @param filepath {{str}}
+        """
+        self.deleted.append(filepath)
+
+    def get_manifest(self, output_path):
+        """* Returns paths of written, unchanged and deleted files.
+        @method .get_manifest
+        @param self
+        @param output_path {{str}} - Paths are relative to this path.
+        @return {{dict}} - Sorted lists of paths under keys `written`, `unchanged` and `deleted`.
+        """
+        return {
+            'written': _get_relative_paths(self.written, output_path),
+            'unchanged': _get_relative_paths(self.unchanged, output_path),
+            'deleted': _get_relative_paths(self.deleted, output_path),
+        }
+
+    def remove_stale_files(self, manifest_path, output_path):
+        """* Removes files that were written or unchanged in run that saved given manifest, but
+        not in this run (i.e. pages of removed elements), and records them as deleted.
+        @method .remove_stale_files
+        @param self
+        @param manifest_path {{str}} - Manifest of previous run, if it doesn't exist then nothing
+            is removed.
+        @param output_path {{str}} - Paths in manifest are relative to this path.
+        """
+        manifest = load_manifest(manifest_path)
+        if manifest is None:
+            return
+        current_paths = set(_get_relative_paths(self.written + self.unchanged, output_path))
+        previous_paths = set(manifest.get('written', []) + manifest.get('unchanged', []))
+        for relative_path in sorted(previous_paths - current_paths):
+            # manifest can't point outside of output path
+            if os.path.isabs(relative_path) or relative_path.split(os.path.sep)[0] == os.pardir:
+                continue
+            filepath = os.path.join(output_path, relative_path)
+            if os.path.isfile(filepath):
+                os.remove(filepath)
+                self.deleted.append(filepath)
+
+    def save_manifest(self, path, output_path):
+        """* Saves manifest to json file.
+        @method .save_manifest
+        @param self
+        @param path {{str}}
+        @param output_path {{str}} - Paths in manifest are relative to this path.
+        """
+        content = json.dumps(self.get_manifest(output_path), indent=4, sort_keys=True)
+        write_file(path, content)
+
+
+def _get_relative_paths(filepaths, output_path):
+    return sorted(set(os.path.relpath(filepath, output_path) for filepath in filepaths))
+
+
+def load_manifest(path):
+    """* Loads manifest saved by {#jscribe.utils.outputwriter.OutputWriter.save_manifest}.
+    @function jscribe.utils.outputwriter.load_manifest
+    @param path {{str}}
+    @return {{dict|None}} - `None` if file doesn't exist or is invalid.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            manifest = json.load(f)
+            f.close()
+    except ValueError as e:
+        logging.info(u'Ignoring invalid output manifest "{}": {}'.format(path, e))
+        return None
+    return manifest
+
+
+def is_file_content_equal(filepath, content):
+    """* Checks if file has given content, file is read only if its size is the same.
+    @function jscribe.utils.outputwriter.is_file_content_equal
+    @param filepath {{str}}
+    @param content {{str}}
+    @return {{boolean}} - `False` if file doesn't exist.
+    """
+    try:
+        if os.path.getsize(filepath) != len(content):
+            return False
+        with open(filepath, 'rb') as f:
+            file_content = f.read()
+            f.close()
+    except (IOError, OSError):
+        return False
+    return file_content == content
+
+
+def write_file(filepath, content):
+    """* Writes content to temporary file and renames it, so file is replaced at once.
+    @function jscribe.utils.outputwriter.write_file
+    @param filepath {{str}}
+    @param content {{str}} - Encoded content.
+    """
+    temp_path = '{}.{}.tmp'.format(filepath, os.getpid())
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+        f.close()
+    try:
+        os.rename(temp_path, filepath)
+    except OSError:
+        # windows can't rename over existing file
+        os.remove(filepath)
+        os.rename(temp_path, filepath)
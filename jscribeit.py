@@ -16,6 +16,7 @@ import logging
 from jscribe.utils.version import Version
 
 from jscribe.core.docgenerator import DocumentationGenerator
+from jscribe.core.watcher import DocumentationWatcher
 from jscribe.conf import settings
 
 logging.basicConfig(format='%(message)s', level=logging.INFO)
@@ -30,20 +31,63 @@ parser.add_argument(
     type=str,
     help='Settings file path.',
 )
+parser.add_argument(
+    '--jobs',
+    type=int,
+    default=None,
+    help='Number of processes used for parsing source files and rendering pages.',
+)
+parser.add_argument(
+    '--since',
+    type=str,
+    default=None,
+    help=(
+        'Git revision, only files changed since it are read (parse cache must be set, files '
+        'changed since commit recorded in parse cache are read if it differs).'
+    ),
+)
+parser.add_argument(
+    '--watch',
+    action='store_true',
+    help='Generate documentation again whenever source files or settings change.',
+)
+parser.add_argument(
+    '--interval',
+    type=float,
+    default=1.0,
+    help='Seconds between checks for changes in watch mode.',
+)
 args = parser.parse_args()
 
 logging.info('JScribe documentation generator v{}.'.format(repr(version)))
 
-generator = DocumentationGenerator(args.settings)
-generator.generate_documentation()
+if args.watch:
+    watcher = DocumentationWatcher(args.settings, jobs=args.jobs, interval=args.interval)
+    watcher.watch()
+else:
+    generator = DocumentationGenerator(args.settings, jobs=args.jobs, since=args.since)
+    generator.generate_documentation()
 
-logging.info('Documentation created in "{}".'.format(settings.DOCUMENTATION_OUTPUT_PATH))
+    logging.info('Documentation created in "{}".'.format(settings.DOCUMENTATION_OUTPUT_PATH))
 
 # USAGE
 """* Usage, just run it in command line: {$bash python jscribeit.py path/to/your/settings.json $}
 
 Settings file is described here: {#settings}
 
+Big projects can be parsed and rendered by many processes at once:
+{$bash python jscribeit.py path/to/your/settings.json --jobs 8 $}
+
+In CI documentation can be built from git checkout, with parse cache kept between builds, then only
+files changed since given git revision are read again. Parse cache records commit it was saved at,
+if it's not the given revision then files changed since that commit are read, and the first build
+with a new cache reads every file:
+{$bash python jscribeit.py path/to/your/settings.json --since origin/master $}
+
+While writing documentation, watch mode generates it again after every change of source files or
+settings, only changed files are parsed and only changed pages are written:
+{$bash python jscribeit.py path/to/your/settings.json --watch $}
+
 @manual usage "2. Usage"
 """
 
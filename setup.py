@@ -19,6 +19,7 @@ setup(
         'jscribe.generators.html',
         'jscribe.templates', 'jscribe.templates.html', 'jscribe.templates.html.default',
         'jscribe.utils',
+        'jscribe.benchmark',
         'jscribe.test', 'jscribe.test.tests_core', 'jscribe.test.tests_utils'
     ],
     scripts=['jscribeit.py'],
@@ -32,6 +33,8 @@ setup(
             'jscribe/templates/html/default/templates/element_contents.html',
             'jscribe/templates/html/default/templates/list.html',
             'jscribe/templates/html/default/templates/mainframe.html',
+            'jscribe/templates/html/default/templates/navigation.html',
+            'jscribe/templates/html/default/templates/navigationframe.html',
             'jscribe/templates/html/default/templates/sourcefile.html',
         ]),
         ('LICENSE.txt'),
@@ -39,7 +42,7 @@ setup(
     ],
     requires=[
         "Jinja2 (>=2.7.1)",
-        "Markdown (>=2.3.1)",
+        "Markdown (>=3.0)",
         "Pygments (>=1.6)",
         "argparse (>=1.2.1)",
     ],